@@ -1,7 +1,24 @@
+from .nodes import prompt_folding, prompt_sweep, server_hooks, shape_bucketing
+from .nodes.admission_control import install_admission_control
+from .nodes.cached_noise_node import CachedNoise
+from .nodes.cost_estimator_node import GenerationCostEstimator
+from .nodes.dataset_source_node import DatasetParameterSource
+from .nodes.generation_profile_node import GenerationProfile
 from .nodes.height_node import HeightNode
+from .nodes.hires_ladder_node import HiResLadderPlanner
+from .nodes.image_dimensions_node import DimensionsFromFile
+from .nodes.parameter_space_node import ParameterSpaceSampler
+from .nodes.prompt_coalescing import install_prompt_coalescing
+from .nodes.prompt_delta import install_prompt_delta
+from .nodes.prompt_profiling import install_from_env as install_profiling
 from .nodes.random_value_tracker import SeedHistory
+from .nodes.result_cache_node import CachedImage, ResultCacheKey
 from .nodes.sampler_selector import SamplerSelector
 from .nodes.scheduler_selector import SchedulerSelector
+from .nodes.seed_history_store import install_seed_history_routes
+from .nodes.shape_warmup import install_from_env as install_warmup
+from .nodes.validation_cache import install_validation_cache
+from .nodes.width_height_latent_node import WidthHeightLatent
 from .nodes.width_height_node import WidthHeightNode
 from .nodes.width_node import WidthNode
 
@@ -17,6 +34,16 @@ NODE_CLASS_MAPPINGS = {
     "WidthNode": WidthNode,
     "HeightNode": HeightNode,
     "WidthHeightNode": WidthHeightNode,
+    "HiResLadderPlanner": HiResLadderPlanner,
+    "GenerationProfile": GenerationProfile,
+    "ParameterSpaceSampler": ParameterSpaceSampler,
+    "ResultCacheKey": ResultCacheKey,
+    "CachedImage": CachedImage,
+    "DimensionsFromFile": DimensionsFromFile,
+    "WidthHeightLatent": WidthHeightLatent,
+    "GenerationCostEstimator": GenerationCostEstimator,
+    "CachedNoise": CachedNoise,
+    "DatasetParameterSource": DatasetParameterSource,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
@@ -26,6 +53,68 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "WidthNode": "Width",
     "HeightNode": "Height",
     "WidthHeightNode": "Width & Height",
+    "HiResLadderPlanner": "Hi-Res Ladder Planner",
+    "GenerationProfile": "Generation Profile",
+    "ParameterSpaceSampler": "Parameter Space Sampler",
+    "ResultCacheKey": "Result Cache Key",
+    "CachedImage": "Cached Image",
+    "DimensionsFromFile": "Dimensions From File",
+    "WidthHeightLatent": "Width & Height Latent",
+    "GenerationCostEstimator": "Generation Cost Estimator",
+    "CachedNoise": "Cached Noise",
+    "DatasetParameterSource": "Dataset Parameter Source",
 }
 
+
+def _install_server_hooks():
+    """Attach the opt-in server hooks enabled through environment variables."""
+    prompt_server = server_hooks.get_prompt_server()
+    if prompt_server is None:
+        return
+
+    # Enabled by COMFYASSETS_PROMPT_DELTA; first, to cache prompts unfolded
+    install_prompt_delta(prompt_server)
+
+    # Enabled by COMFYASSETS_ADMISSION_MAX_COST / _USER_BUDGET / _BUDGETS
+    install_admission_control(prompt_server)
+
+    # Enabled by COMFYASSETS_COALESCE_PROMPTS
+    install_prompt_coalescing(prompt_server)
+
+    if server_hooks.env_number("COMFYASSETS_FOLD_PROMPTS", 0):
+        prompt_folding.install_prompt_folding(prompt_server)
+
+    bucket_window = server_hooks.env_number("COMFYASSETS_SHAPE_BUCKET_WINDOW", 0)
+    if bucket_window > 1:
+        policy = shape_bucketing.ShapeBucketPolicy(
+            bucket_window,
+            server_hooks.env_number("COMFYASSETS_SHAPE_BUCKET_MAX_SKIPS", 4),
+        )
+        server_hooks.when_queue_ready(
+            prompt_server,
+            lambda queue: shape_bucketing.install_queue_reordering(queue, policy),
+        )
+
+    if server_hooks.env_number("COMFYASSETS_SWEEP_ROUTE", 0):
+        prompt_sweep.install_sweep_route(
+            prompt_server,
+            server_hooks.env_number("COMFYASSETS_SWEEP_MAX_QUEUE_DEPTH", 32),
+            server_hooks.env_number("COMFYASSETS_SWEEP_CONCURRENCY", 4),
+        )
+
+    # Enabled by COMFYASSETS_VALIDATION_CACHE
+    install_validation_cache()
+
+    # Enabled by COMFYASSETS_SEED_HISTORY_DIR
+    install_seed_history_routes(prompt_server)
+
+    # Enabled by COMFYASSETS_PROFILE_FRACTION or COMFYASSETS_PROFILE_ROUTE
+    install_profiling(prompt_server, NODE_CLASS_MAPPINGS)
+
+    # Enabled by COMFYASSETS_WARMUP or COMFYASSETS_WARMUP_ROUTE
+    install_warmup(prompt_server)
+
+
+_install_server_hooks()
+
 __all__ = ["NODE_CLASS_MAPPINGS", "NODE_DISPLAY_NAME_MAPPINGS", "WEB_DIRECTORY"]
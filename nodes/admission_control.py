@@ -0,0 +1,453 @@
+"""Submit-time admission control for prompts built from the selector nodes.
+
+Each submitted prompt is priced before it is queued: the dimension nodes
+(including ``WidthHeightLatent``) are resolved to their output size, as
+are literal ``width``/``height`` inputs of other nodes (e.g.
+``EmptyLatentImage``), and every sampling node (any node with
+``steps`` and ``sampler_name`` inputs, e.g. ``KSampler``) contributes
+``megapixels x steps x model evaluations per step``, with the sampler name
+resolved through ``SamplerSelector`` links. Prompts whose size or sampler
+cannot be resolved are admitted untouched.
+
+Costs are charged against a token bucket per user that refills
+``user_budget`` units every ``window`` seconds. A prompt that exceeds
+``max_prompt_cost`` or its owner's remaining budget is, depending on the
+policy's action:
+
+- ``reject``: refused with HTTP 429 before validation
+- ``deprioritize``: queued behind every normally admitted prompt, so other
+  users' wait does not grow with the abusive traffic
+- ``downscale``: its dimension nodes are rewritten to fit the limit; if
+  that would take a factor below ``MIN_DOWNSCALE_FACTOR`` per side or still
+  not fit, the prompt is left unchanged and deprioritized
+
+Users are identified by the server, never by the client-chosen
+``client_id``: the ComfyUI user when ``--multi-user`` is enabled (the
+``comfy-user`` header, checked by ComfyUI's user manager), otherwise the
+remote address of the request.
+"""
+
+import collections
+import copy
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+try:
+    from . import generation_cost, prompt_resolution, server_hooks
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import generation_cost
+    import prompt_resolution
+    import server_hooks
+
+ACTIONS = ("reject", "deprioritize", "downscale")
+
+# Steps assumed when a sampling node's step count is linked to another node
+DEFAULT_STEPS = 20
+
+# Added to the queue number of deprioritized prompts. ComfyUI serves the
+# lowest number first, so these run after every normally numbered prompt.
+DEPRIORITIZE_OFFSET = 1_000_000_000
+
+MIN_DIMENSION = 64
+
+# Prompts would need shrinking below this fraction of their width and
+# height to fit are deprioritized unchanged rather than rewritten
+MIN_DOWNSCALE_FACTOR = 0.25
+
+# Bucket shared by new users while every per-user bucket is in use
+OVERFLOW_USER = "*"
+
+
+class AdmissionPolicy:
+    """Limits applied by an ``AdmissionGate``.
+
+    Costs are in megapixel-evaluations. ``max_prompt_cost`` caps a single
+    prompt and ``user_budget`` is the spend each user may make per
+    ``window`` seconds; 0 disables either limit. ``budgets`` overrides the
+    budget for specific users (ComfyUI user ids or remote addresses).
+    """
+
+    def __init__(
+        self,
+        action="deprioritize",
+        max_prompt_cost=0.0,
+        user_budget=0.0,
+        window=3600.0,
+        budgets=None,
+    ):
+        if action not in ACTIONS:
+            raise ValueError(f"action must be one of {', '.join(ACTIONS)}")
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self.action = action
+        self.max_prompt_cost = max_prompt_cost
+        self.user_budget = user_budget
+        self.window = window
+        self.budgets = dict(budgets or {})
+
+    def budget_for(self, user):
+        return self.budgets.get(user, self.user_budget)
+
+
+class Decision:
+    """Outcome of pricing one prompt."""
+
+    def __init__(self, action, cost, reason=""):
+        self.action = action
+        self.cost = cost
+        self.reason = reason
+
+    def __repr__(self):
+        return f"Decision({self.action!r}, cost={self.cost!r}, reason={self.reason!r})"
+
+
+def _resolve_input(prompt, value, node_classes):
+    if not prompt_resolution.is_link(value):
+        return value
+    source = prompt.get(value[0])
+    if source is None:
+        return None
+    outputs = prompt_resolution.evaluate_node(source, node_classes)
+    if outputs is None or value[1] >= len(outputs):
+        return None
+    return outputs[value[1]]
+
+
+def sampling_runs(prompt, node_classes=None):
+    """Return ``(sampler_name, steps)`` for every sampling node in ``prompt``.
+
+    Linked sampler names are resolved through the selector nodes; a name
+    that cannot be resolved is returned as None.
+    """
+    if node_classes is None:
+        node_classes = prompt_resolution.default_node_classes()
+
+    runs = []
+    for node_id in sorted(prompt, key=str):
+        inputs = prompt[node_id].get("inputs", {})
+        if "steps" not in inputs or "sampler_name" not in inputs:
+            continue
+        sampler = _resolve_input(prompt, inputs["sampler_name"], node_classes)
+        steps = _resolve_input(prompt, inputs["steps"], node_classes)
+        if not isinstance(steps, int):
+            steps = DEFAULT_STEPS
+        runs.append((sampler if isinstance(sampler, str) else None, steps))
+    return runs
+
+
+def literal_sizes(prompt):
+    """Return ``(width, height)`` of every other node with literal sizes.
+
+    Covers nodes such as ``EmptyLatentImage`` whose ``width`` and ``height``
+    are typed in rather than taken from this package's dimension nodes.
+    """
+    sizes = []
+    for node in prompt.values():
+        if node.get("class_type") in prompt_resolution.DIMENSION_NODES:
+            continue
+        inputs = node.get("inputs", {})
+        width, height = inputs.get("width"), inputs.get("height")
+        if isinstance(width, int) and isinstance(height, int):
+            sizes.append((width, height))
+    return sizes
+
+
+def prompt_cost(prompt, node_classes=None):
+    """Megapixel-evaluations for ``prompt``, or None if it cannot be priced.
+
+    Every sampling run is priced at the largest size, resolved from the
+    dimension nodes or typed into other nodes, since sizes are not traced
+    to the sampler they feed.
+    """
+    if node_classes is None:
+        node_classes = prompt_resolution.default_node_classes()
+
+    sizes = list(prompt_resolution.resolve_dimensions(prompt, node_classes) or ())
+    sizes.extend(literal_sizes(prompt))
+    runs = sampling_runs(prompt, node_classes)
+    if not sizes or not runs:
+        return None
+
+    megapixels = max(width * height for width, height in sizes) / 1_000_000
+    return sum(
+        megapixels * steps * generation_cost.nfe_per_step(sampler)
+        for sampler, steps in runs
+    )
+
+
+def _scaled(value, factor):
+    return max(MIN_DIMENSION, int(value * factor) // 8 * 8)
+
+
+def downscale_prompt(prompt, factor, node_classes=None):
+    """Scale the outputs of every resolvable dimension node by ``factor``.
+
+    The nodes are rewritten to ``custom`` sizes with swapping already
+    applied. Returns the number of nodes changed.
+    """
+    if node_classes is None:
+        node_classes = prompt_resolution.default_node_classes()
+
+    changed = 0
+    for node in prompt.values():
+        class_type = node.get("class_type")
+        if class_type not in prompt_resolution.DIMENSION_NODES:
+            continue
+        outputs = prompt_resolution.evaluate_node(node, node_classes)
+        if outputs is None:
+            continue
+        inputs = node["inputs"]
+        inputs["preset"] = "custom"
+        if class_type == "WidthHeightLatent":
+            outputs = outputs[1:]
+        if len(outputs) == 2:
+            inputs["width"] = _scaled(outputs[0], factor)
+            inputs["height"] = _scaled(outputs[1], factor)
+            inputs["swap_dimensions"] = False
+        elif class_type == "WidthNode":
+            inputs["width"] = _scaled(outputs[0], factor)
+        else:
+            inputs["height"] = _scaled(outputs[0], factor)
+        changed += 1
+    return changed
+
+
+class AdmissionGate:
+    """Price prompts and apply an ``AdmissionPolicy`` per user.
+
+    Buckets for at most ``max_users`` users are kept. Buckets that refilled
+    completely are dropped to make room, since a new bucket would be the
+    same; while every bucket is still in use, new users share one overflow
+    bucket, so churning through users never hands out a full budget.
+    """
+
+    def __init__(
+        self, policy, node_classes=None, clock=time.monotonic, max_users=10000
+    ):
+        if node_classes is None:
+            node_classes = prompt_resolution.default_node_classes()
+        self.policy = policy
+        self.node_classes = node_classes
+        self.clock = clock
+        self.max_users = max_users
+        self.stats = {action: 0 for action in ("admit",) + ACTIONS}
+        self._buckets = collections.OrderedDict()  # user -> (tokens, updated)
+        self._lock = threading.Lock()
+
+    def _bucket(self, user):
+        if user in self._buckets or len(self._buckets) < self.max_users:
+            return user
+        for key in list(self._buckets):
+            if self._tokens(key)[0] >= self.policy.budget_for(key):
+                del self._buckets[key]
+        return user if len(self._buckets) < self.max_users else OVERFLOW_USER
+
+    def _tokens(self, user):
+        budget = self.policy.budget_for(user)
+        now = self.clock()
+        tokens, updated = self._buckets.get(user, (budget, now))
+        tokens = min(budget, tokens + (now - updated) * budget / self.policy.window)
+        return tokens, now
+
+    def remaining(self, user):
+        """Budget ``user`` can still spend, or None without a budget."""
+        if self.policy.budget_for(user) <= 0:
+            return None
+        with self._lock:
+            return self._tokens(user)[0]
+
+    def _limit(self, tokens):
+        limits = []
+        if self.policy.max_prompt_cost > 0:
+            limits.append(self.policy.max_prompt_cost)
+        if tokens is not None:
+            limits.append(tokens)
+        return min(limits) if limits else None
+
+    def _decide(self, prompt, user, tokens):
+        cost = prompt_cost(prompt, self.node_classes)
+        limit = self._limit(tokens)
+        if cost is None or limit is None or cost <= limit:
+            return Decision("admit", cost)
+
+        if self.policy.max_prompt_cost > 0 and cost > self.policy.max_prompt_cost:
+            reason = f"prompt cost {cost:.1f} exceeds the limit of {self.policy.max_prompt_cost:.1f}"
+        else:
+            reason = f"prompt cost {cost:.1f} exceeds the remaining budget of {max(0.0, tokens):.1f}"
+        return Decision(self.policy.action, cost, reason)
+
+    def check(self, json_data, user=None):
+        """Price a ``/prompt`` request body without charging or changing it.
+
+        ``user`` defaults to the sender of the request being handled.
+        """
+        prompt = json_data.get("prompt")
+        if not isinstance(prompt, dict):
+            return Decision("admit", None)
+        if user is None:
+            user = server_hooks.current_requester() or ""
+        with self._lock:
+            user = self._bucket(user)
+            tokens = None
+            if self.policy.budget_for(user) > 0:
+                tokens = self._tokens(user)[0]
+        return self._decide(prompt, user, tokens)
+
+    def admit(self, json_data, prompt_server=None, user=None):
+        """Charge and apply the policy to a ``/prompt`` request body in place.
+
+        Rejected requests lose their ``prompt``; deprioritized ones get a
+        queue ``number`` behind every normal prompt. Either way the decision
+        is recorded under ``json_data["admission"]``. ``user`` defaults to
+        the sender of the request being handled.
+        """
+        prompt = json_data.get("prompt")
+        if not isinstance(prompt, dict):
+            return Decision("admit", None)
+        if user is None:
+            user = server_hooks.current_requester() or ""
+
+        with self._lock:
+            user = self._bucket(user)
+            budget = self.policy.budget_for(user)
+            tokens = now = None
+            if budget > 0:
+                tokens, now = self._tokens(user)
+            decision = self._decide(prompt, user, tokens)
+
+            if decision.action == "downscale":
+                limit = self._limit(tokens)
+                factor = math.sqrt(max(0.0, limit) / decision.cost)
+                decision.action = "deprioritize"
+                if factor >= MIN_DOWNSCALE_FACTOR:
+                    scaled = copy.deepcopy(prompt)
+                    if downscale_prompt(scaled, factor, self.node_classes):
+                        cost = prompt_cost(scaled, self.node_classes)
+                        if cost is not None and cost <= limit:
+                            json_data["prompt"] = scaled
+                            decision.action = "downscale"
+                            decision.cost = cost
+
+            if budget > 0 and decision.action != "reject":
+                self._buckets[user] = (tokens - (decision.cost or 0.0), now)
+            self.stats[decision.action] += 1
+
+        if decision.action == "reject":
+            del json_data["prompt"]
+        elif decision.action == "deprioritize" and prompt_server is not None:
+            json_data["number"] = DEPRIORITIZE_OFFSET + prompt_server.number
+            # ComfyUI only advances the counter for prompts without a number
+            prompt_server.number += 1
+        if decision.action != "admit":
+            json_data["admission"] = {
+                "action": decision.action,
+                "cost": decision.cost,
+                "reason": decision.reason,
+            }
+        return decision
+
+
+def install_admission_control(prompt_server, gate=None):
+    """Apply ``gate`` to every prompt submitted to the server.
+
+    Without a gate, one is built from ``policy_from_env()``; nothing is
+    installed if no limit is configured.
+
+    An on-prompt handler charges budgets and rewrites prompts. A middleware
+    records who sent each request, for the handler to charge, and answers
+    rejected ``POST /prompt`` requests with HTTP 429 and the reason before
+    ComfyUI validates them. Without the middleware (the server already
+    started), every prompt is charged to one shared bucket.
+    """
+
+    if gate is None:
+        policy = policy_from_env()
+        if policy is None:
+            return None
+        gate = AdmissionGate(policy)
+
+    def on_prompt(json_data):
+        decision = gate.admit(json_data, prompt_server)
+        if decision.action != "admit":
+            logging.info(
+                "[ComfyAssets Selectors] %s prompt from %r: %s",
+                decision.action,
+                server_hooks.current_requester(),
+                decision.reason,
+            )
+        return json_data
+
+    prompt_server.add_on_prompt_handler(on_prompt)
+
+    app = getattr(prompt_server, "app", None)
+    if app is None:
+        return gate
+    from aiohttp import web
+
+    @web.middleware
+    async def admission(request, handler):
+        if request.method == "POST" and request.path in server_hooks.PROMPT_PATHS:
+            try:
+                json_data = await server_hooks.prompt_json(request)
+                decision = gate.check(json_data)
+            except (ValueError, TypeError, AttributeError):
+                return await handler(request)
+            if decision.action == "reject":
+                error = {
+                    "type": "admission_rejected",
+                    "message": "Prompt rejected by admission control",
+                    "details": decision.reason,
+                    "extra_info": {"cost": decision.cost},
+                }
+                return web.json_response(
+                    {"error": error, "node_errors": {}}, status=429
+                )
+        return await handler(request)
+
+    try:
+        app.middlewares.append(admission)
+        server_hooks.install_requester_middleware(prompt_server)
+    except RuntimeError:  # the app is already running
+        logging.warning(
+            "[ComfyAssets Selectors] Admission control cannot identify users or "
+            "return 429s once the server has started; all prompts share one "
+            "budget and rejected prompts fail as empty prompts"
+        )
+    return gate
+
+
+def policy_from_env():
+    """Build an ``AdmissionPolicy`` from the environment, or None if unset."""
+    env_number = server_hooks.env_number
+    max_prompt_cost = env_number("COMFYASSETS_ADMISSION_MAX_COST", 0.0, cast=float)
+    user_budget = env_number("COMFYASSETS_ADMISSION_USER_BUDGET", 0.0, cast=float)
+    budgets = {}
+    raw_budgets = os.environ.get("COMFYASSETS_ADMISSION_BUDGETS")
+    if raw_budgets:
+        try:
+            budgets = {str(k): float(v) for k, v in json.loads(raw_budgets).items()}
+        except (ValueError, AttributeError):
+            logging.warning(
+                "[ComfyAssets Selectors] Ignoring invalid COMFYASSETS_ADMISSION_BUDGETS"
+            )
+    if max_prompt_cost <= 0 and user_budget <= 0 and not budgets:
+        return None
+
+    action = os.environ.get("COMFYASSETS_ADMISSION_ACTION", "deprioritize")
+    if action not in ACTIONS:
+        logging.warning(
+            "[ComfyAssets Selectors] Ignoring invalid COMFYASSETS_ADMISSION_ACTION=%r",
+            action,
+        )
+        action = "deprioritize"
+    return AdmissionPolicy(
+        action,
+        max_prompt_cost,
+        user_budget,
+        env_number("COMFYASSETS_ADMISSION_WINDOW", 3600.0, cast=float),
+        budgets,
+    )
@@ -0,0 +1,77 @@
+try:
+    from . import noise_cache
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import noise_cache
+
+
+SEED_MODULUS = 2**64
+
+BATCH_MODES = ["shared", "per_item"]
+
+
+class CachedRandomNoise:
+    """``NOISE`` object for custom samplers, drawn through the noise cache.
+
+    With ``per_item`` each batch item gets its own seed (``seed`` plus its
+    batch index) and its noise does not depend on the rest of the batch.
+    """
+
+    def __init__(self, seed, cache=None, per_item=False):
+        self.seed = seed
+        self.cache = cache
+        self.per_item = per_item
+
+    def generate_noise(self, input_latent):
+        samples = input_latent["samples"]
+        if self.per_item:
+            indices = input_latent.get("batch_index") or range(samples.shape[0])
+            seeds = [(self.seed + int(index)) % SEED_MODULUS for index in indices]
+            return noise_cache.batch_invariant_noise(
+                seeds, samples.shape, samples.dtype
+            )
+
+        cache = self.cache or noise_cache.get_noise_cache()
+        return cache.noise(
+            self.seed,
+            samples.shape,
+            samples.dtype,
+            input_latent.get("batch_index"),
+        )
+
+
+class CachedNoise:
+    """Seeded initial noise that is reused across runs with the same seed."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "seed": (
+                    "INT",
+                    {
+                        "default": 0,
+                        "min": 0,
+                        "max": 0xFFFFFFFFFFFFFFFF,
+                        "tooltip": "Connect the Seed History seed output",
+                    },
+                ),
+            },
+            "optional": {
+                "batch_mode": (
+                    BATCH_MODES,
+                    {
+                        "default": "shared",
+                        "tooltip": "per_item: item i uses seed + i, identical alone or batched (not cached)",
+                    },
+                ),
+            },
+        }
+
+    RETURN_TYPES = ("NOISE",)
+    RETURN_NAMES = ("noise",)
+    FUNCTION = "get_noise"
+    CATEGORY = "comfyassets/Generation"
+
+    def get_noise(self, seed, batch_mode="shared"):
+        """Return a noise source for SamplerCustomAdvanced."""
+        return (CachedRandomNoise(seed, per_item=batch_mode == "per_item"),)
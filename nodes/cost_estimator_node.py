@@ -0,0 +1,114 @@
+import comfy.samplers
+
+from nodes import MAX_RESOLUTION
+
+try:
+    from . import generation_cost
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import generation_cost
+
+
+class GenerationCostEstimator:
+    """Estimate model evaluations and time for a sampler, step count and size."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "sampler_name": (comfy.samplers.KSampler.SAMPLERS,),
+                "scheduler": (comfy.samplers.KSampler.SCHEDULERS,),
+                "steps": ("INT", {"default": 20, "min": 1, "max": 10000}),
+                "width": (
+                    "INT",
+                    {"default": 1024, "min": 16, "max": MAX_RESOLUTION, "step": 8},
+                ),
+                "height": (
+                    "INT",
+                    {"default": 1024, "min": 16, "max": MAX_RESOLUTION, "step": 8},
+                ),
+                "seconds_per_evaluation": (
+                    "FLOAT",
+                    {
+                        "default": 0.1,
+                        "min": 0.0,
+                        "max": 1000.0,
+                        "step": 0.001,
+                        "tooltip": "Measured seconds per model call at one megapixel (calibrate per GPU/model)",
+                    },
+                ),
+            },
+            "optional": {
+                "batch_size": ("INT", {"default": 1, "min": 1, "max": 4096}),
+                "cost_exponent": (
+                    "FLOAT",
+                    {
+                        "default": 1.0,
+                        "min": 0.5,
+                        "max": 3.0,
+                        "step": 0.05,
+                        "tooltip": "Cost growth with pixel count (>1 for attention-heavy models)",
+                    },
+                ),
+                "time_budget": (
+                    "FLOAT",
+                    {
+                        "default": 0.0,
+                        "min": 0.0,
+                        "max": 100000.0,
+                        "step": 0.1,
+                        "tooltip": "Seconds available; suggests a step count that fits (0 = off)",
+                    },
+                ),
+            },
+        }
+
+    RETURN_TYPES = ("INT", "INT", "FLOAT", "INT")
+    RETURN_NAMES = (
+        "model_evaluations",
+        "latent_pixel_steps",
+        "estimated_seconds",
+        "suggested_steps",
+    )
+    FUNCTION = "estimate"
+    CATEGORY = "comfyassets/Sampling"
+
+    def estimate(
+        self,
+        sampler_name,
+        scheduler,
+        steps,
+        width,
+        height,
+        seconds_per_evaluation,
+        batch_size=1,
+        cost_exponent=1.0,
+        time_budget=0.0,
+    ):
+        """Estimate the run's cost and, with a budget, the steps that fit."""
+        cost = generation_cost.estimate_cost(
+            sampler_name,
+            steps,
+            width,
+            height,
+            seconds_per_evaluation,
+            batch_size,
+            cost_exponent,
+        )
+        suggested = steps
+        if time_budget > 0:
+            suggested = generation_cost.steps_for_budget(
+                sampler_name,
+                width,
+                height,
+                seconds_per_evaluation,
+                time_budget,
+                batch_size,
+                cost_exponent,
+            )
+
+        return (
+            cost["evaluations"],
+            cost["latent_pixel_steps"],
+            cost["seconds"],
+            suggested,
+        )
@@ -0,0 +1,145 @@
+"""Random access to rows of large CSV/JSONL parameter files.
+
+Each file gets a sparse index holding the byte offset of every
+``stride``-th data row. Reading row ``k`` seeks to the nearest indexed
+offset and skips at most ``stride - 1`` lines, so access cost does not
+grow with the file and the file is never loaded into memory. The index is
+built with one sequential scan and cached per path, invalidated when the
+file's mtime or size changes.
+
+CSV files need a header row; JSONL files hold one object per line. Either
+way each row is one line (quoted newlines are not supported) with the
+columns ``sampler_name``, ``scheduler``, ``seed``, ``width`` and
+``height``. Blank lines are skipped.
+"""
+
+import array
+import csv
+import functools
+import json
+import os
+
+COLUMNS = ("sampler_name", "scheduler", "seed", "width", "height")
+DEFAULT_STRIDE = 1024
+MAX_SEED = 0xFFFFFFFFFFFFFFFF
+
+
+def file_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Unsupported parameter file (expected .csv or .jsonl): {path}")
+
+
+class RowIndex:
+    """Sparse byte-offset index of the data rows in one file."""
+
+    def __init__(self, path, stride=DEFAULT_STRIDE):
+        self.path = path
+        self.stride = stride
+        self.format = file_format(path)
+        self.header = None
+        self.offsets = array.array("q")
+        self.row_count = 0
+        self._build()
+
+    def _build(self):
+        with open(self.path, "rb") as handle:
+            position = 0
+            if self.format == "csv":
+                for line in handle:
+                    position += len(line)
+                    if line.strip():
+                        self.header = [
+                            name.strip()
+                            for name in next(csv.reader([line.decode("utf-8-sig")]))
+                        ]
+                        break
+                if self.header is None:
+                    raise ValueError(f"CSV file has no header row: {self.path}")
+
+            for line in handle:
+                if line.strip():
+                    if self.row_count % self.stride == 0:
+                        self.offsets.append(position)
+                    self.row_count += 1
+                position += len(line)
+
+    def read_line(self, row):
+        """Return the raw text of data row ``row`` (0-based)."""
+        if not 0 <= row < self.row_count:
+            raise ValueError(f"Row {row} is out of range ({self.row_count} rows)")
+        with open(self.path, "rb") as handle:
+            handle.seek(self.offsets[row // self.stride])
+            skip = row % self.stride
+            for line in handle:
+                if not line.strip():
+                    continue
+                if skip == 0:
+                    return line.decode("utf-8")
+                skip -= 1
+        raise ValueError(f"{self.path} changed while reading row {row}")
+
+    def read_row(self, row):
+        """Return data row ``row`` as a dict of raw column values."""
+        line = self.read_line(row)
+        if self.format == "jsonl":
+            values = json.loads(line)
+            if not isinstance(values, dict):
+                raise ValueError(f"Row {row} is not a JSON object")
+            return values
+        return dict(zip(self.header, next(csv.reader([line]))))
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_index(path, mtime_ns, size, stride):
+    return RowIndex(path, stride)
+
+
+def get_row_index(path, stride=DEFAULT_STRIDE):
+    """Return the cached index for ``path``, rebuilding it if the file changed."""
+    stat = os.stat(path)
+    return _cached_index(os.path.abspath(path), stat.st_mtime_ns, stat.st_size, stride)
+
+
+def parse_row(values, samplers, schedulers, max_resolution, row=None):
+    """Convert raw column values and validate them against the KSampler lists.
+
+    Returns ``(sampler_name, scheduler, seed, width, height)``.
+    """
+    where = f"Row {row}" if row is not None else "Row"
+    missing = [column for column in COLUMNS if column not in values]
+    if missing:
+        raise ValueError(f"{where} is missing columns: {', '.join(missing)}")
+
+    sampler_name = str(values["sampler_name"]).strip()
+    scheduler = str(values["scheduler"]).strip()
+    if sampler_name not in samplers:
+        raise ValueError(f"{where}: unknown sampler '{sampler_name}'")
+    if scheduler not in schedulers:
+        raise ValueError(f"{where}: unknown scheduler '{scheduler}'")
+
+    numbers = {}
+    for column in ("seed", "width", "height"):
+        value = values[column]
+        try:
+            numbers[column] = int(value.strip() if isinstance(value, str) else value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{where}: {column} '{value}' is not an integer")
+    if not 0 <= numbers["seed"] <= MAX_SEED:
+        raise ValueError(f"{where}: seed {numbers['seed']} is out of range")
+    for column in ("width", "height"):
+        if not 16 <= numbers[column] <= max_resolution:
+            raise ValueError(
+                f"{where}: {column} {numbers[column]} must be between 16 and {max_resolution}"
+            )
+
+    return (
+        sampler_name,
+        scheduler,
+        numbers["seed"],
+        numbers["width"],
+        numbers["height"],
+    )
@@ -0,0 +1,71 @@
+import os
+
+import comfy.samplers
+
+from nodes import MAX_RESOLUTION
+
+try:
+    from . import dataset_rows
+    from .input_paths import resolve_input_path
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import dataset_rows
+    from input_paths import resolve_input_path
+
+
+class DatasetParameterSource:
+    """Sampler, scheduler, seed and size from row ``k`` of a CSV/JSONL file."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "path": (
+                    "STRING",
+                    {
+                        "default": "",
+                        "tooltip": "CSV (with header) or JSONL file; relative paths use the input folder",
+                    },
+                ),
+                "row": (
+                    "INT",
+                    {
+                        "default": 0,
+                        "min": 0,
+                        "max": 0xFFFFFFFFFFFFFFFF,
+                        "tooltip": "Data row to read, starting at 0 (set the widget to increment for batch jobs)",
+                    },
+                ),
+            },
+        }
+
+    RETURN_TYPES = (
+        comfy.samplers.KSampler.SAMPLERS,
+        comfy.samplers.KSampler.SCHEDULERS,
+        "INT",
+        "INT",
+        "INT",
+        "INT",
+    )
+    RETURN_NAMES = ("sampler_name", "scheduler", "seed", "width", "height", "row_count")
+    FUNCTION = "read_row"
+    CATEGORY = "comfyassets/Generation"
+
+    @classmethod
+    def IS_CHANGED(cls, path, row):
+        # Re-run when the file is replaced
+        try:
+            return str(os.stat(resolve_input_path(path)).st_mtime_ns)
+        except OSError:
+            return ""
+
+    def read_row(self, path, row):
+        """Read and validate one row without loading the file."""
+        index = dataset_rows.get_row_index(resolve_input_path(path))
+        values = dataset_rows.parse_row(
+            index.read_row(row),
+            comfy.samplers.KSampler.SAMPLERS,
+            comfy.samplers.KSampler.SCHEDULERS,
+            MAX_RESOLUTION,
+            row,
+        )
+        return values + (index.row_count,)
@@ -0,0 +1,98 @@
+"""Kernel-friendly snapping for the dimension nodes.
+
+Latents are 1/8 of the pixel size, so any multiple of 8 is valid, but many
+attention/conv kernels only hit their fast paths (and ``torch.compile`` only
+reuses a graph) when sizes line up with coarser blocks. These helpers round a
+requested size to the nearest alignment for a model family.
+"""
+
+import math
+
+# Pixel alignment per model family.
+SNAP_ALIGNMENTS = {
+    "latent (8)": 8,
+    "sd3/flux (16)": 16,
+    "sd1.x/sdxl (64)": 64,
+    "torch.compile (128)": 128,
+}
+
+SNAP_MODES = ["off"] + list(SNAP_ALIGNMENTS)
+
+DEFAULT_ASPECT_TOLERANCE = 0.02
+
+
+def get_alignment(snap):
+    """Return the pixel alignment for a snap mode, or None when off."""
+    if snap == "off":
+        return None
+    if snap not in SNAP_ALIGNMENTS:
+        raise ValueError(f"Unknown snap mode: {snap}")
+    return SNAP_ALIGNMENTS[snap]
+
+
+def _bounds(alignment, minimum, maximum):
+    low = math.ceil(minimum / alignment) * alignment
+    high = (maximum // alignment) * alignment
+    return low, high
+
+
+def snap_value(value, alignment, minimum=64, maximum=8192):
+    """Round a single dimension to the nearest multiple of ``alignment``."""
+    low, high = _bounds(alignment, minimum, maximum)
+    snapped = int(math.floor(value / alignment + 0.5)) * alignment
+    return max(low, min(high, snapped))
+
+
+def _candidates(value, alignment, low, high):
+    base = (value // alignment) * alignment
+    values = {base + offset * alignment for offset in (-1, 0, 1, 2)}
+    return sorted(v for v in values if low <= v <= high)
+
+
+def snap_dimensions(
+    width,
+    height,
+    alignment,
+    tolerance=DEFAULT_ASPECT_TOLERANCE,
+    minimum=64,
+    maximum=8192,
+):
+    """Snap a width/height pair while keeping the aspect ratio.
+
+    Among nearby aligned sizes, the closest one whose aspect ratio stays
+    within ``tolerance`` (relative error) wins. If none qualifies, the size
+    with the smallest aspect error is used instead.
+    """
+    low, high = _bounds(alignment, minimum, maximum)
+    aspect = width / height
+
+    best = None
+    best_rank = None
+    for w in _candidates(width, alignment, low, high):
+        for h in _candidates(height, alignment, low, high):
+            error = abs(w / h - aspect) / aspect
+            distance = abs(w - width) + abs(h - height)
+            if error <= tolerance:
+                rank = (0, distance, error)
+            else:
+                rank = (1, error, distance)
+            if best_rank is None or rank < best_rank:
+                best, best_rank = (w, h), rank
+
+    if best is None:
+        return snap_value(width, alignment, minimum, maximum), snap_value(
+            height, alignment, minimum, maximum
+        )
+    return best
+
+
+def describe_adjustment(before, after, alignment):
+    """Return a short human readable report of a snapping adjustment."""
+    before_text = "x".join(str(v) for v in before)
+    after_text = "x".join(str(v) for v in after)
+    if tuple(before) == tuple(after):
+        return f"{after_text} already aligned to {alignment}"
+    report = f"{before_text} -> {after_text} (aligned to {alignment})"
+    if len(before) == 2:
+        report += f", aspect {before[0] / before[1]:.3f} -> {after[0] / after[1]:.3f}"
+    return report
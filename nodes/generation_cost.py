@@ -0,0 +1,123 @@
+"""Model-evaluation (NFE) aware cost estimates for a sampling run.
+
+Samplers differ in how many times they call the model per step: ``euler``
+and the multistep solvers (``dpmpp_2m``, ``dpmpp_2m_sde``, ...) call it once,
+while singlestep solvers such as ``heun``, ``dpm_2`` and ``dpmpp_sde`` call
+it two or more times. Costs here are expressed in model evaluations and
+latent pixel-steps; seconds come from a calibrated coefficient (seconds per
+evaluation of a one-megapixel image), scaled by ``cost_exponent`` for
+models whose cost grows faster than the pixel count.
+"""
+
+import math
+
+# Model evaluations per step for ComfyUI's samplers.
+SAMPLER_NFE = {
+    "euler": 1,
+    "euler_cfg_pp": 1,
+    "euler_ancestral": 1,
+    "euler_ancestral_cfg_pp": 1,
+    "heun": 2,
+    "heunpp2": 3,
+    "dpm_2": 2,
+    "dpm_2_ancestral": 2,
+    "lms": 1,
+    "dpm_fast": 1,
+    "dpm_adaptive": 3,  # adaptive; a typical average
+    "dpmpp_2s_ancestral": 2,
+    "dpmpp_2s_ancestral_cfg_pp": 2,
+    "dpmpp_sde": 2,
+    "dpmpp_sde_gpu": 2,
+    "dpmpp_2m": 1,
+    "dpmpp_2m_cfg_pp": 1,
+    "dpmpp_2m_sde": 1,
+    "dpmpp_2m_sde_gpu": 1,
+    "dpmpp_3m_sde": 1,
+    "dpmpp_3m_sde_gpu": 1,
+    "ddpm": 1,
+    "lcm": 1,
+    "ipndm": 1,
+    "ipndm_v": 1,
+    "deis": 1,
+    "res_multistep": 1,
+    "res_multistep_cfg_pp": 1,
+    "gradient_estimation": 1,
+    "er_sde": 1,
+    "seeds_2": 2,
+    "seeds_3": 3,
+    "sa_solver": 1,
+    "ddim": 1,
+    "uni_pc": 1,
+    "uni_pc_bh2": 1,
+}
+
+# Samplers not in the table are assumed to be single-evaluation.
+DEFAULT_NFE = 1
+
+
+def nfe_per_step(sampler_name):
+    """Model evaluations per step for ``sampler_name``."""
+    return SAMPLER_NFE.get(sampler_name, DEFAULT_NFE)
+
+
+def seconds_per_step(
+    sampler_name, width, height, seconds_per_evaluation, batch_size=1, cost_exponent=1.0
+):
+    """Predicted seconds for one sampling step."""
+    megapixels = width * height / 1_000_000
+    evaluation = seconds_per_evaluation * megapixels**cost_exponent
+    return evaluation * nfe_per_step(sampler_name) * batch_size
+
+
+def estimate_cost(
+    sampler_name,
+    steps,
+    width,
+    height,
+    seconds_per_evaluation,
+    batch_size=1,
+    cost_exponent=1.0,
+):
+    """Estimate the cost of sampling ``steps`` steps at ``width x height``.
+
+    Returns a dict with ``evaluations`` (model calls), ``latent_pixel_steps``
+    (latent pixels x evaluations x batch) and predicted ``seconds``.
+    """
+    evaluations = steps * nfe_per_step(sampler_name)
+    latent_pixels = (width // 8) * (height // 8)
+    step_seconds = seconds_per_step(
+        sampler_name,
+        width,
+        height,
+        seconds_per_evaluation,
+        batch_size,
+        cost_exponent,
+    )
+    return {
+        "evaluations": evaluations,
+        "latent_pixel_steps": latent_pixels * evaluations * batch_size,
+        "seconds": step_seconds * steps,
+    }
+
+
+def steps_for_budget(
+    sampler_name,
+    width,
+    height,
+    seconds_per_evaluation,
+    time_budget,
+    batch_size=1,
+    cost_exponent=1.0,
+):
+    """Largest step count whose predicted time fits ``time_budget``."""
+    step_seconds = seconds_per_step(
+        sampler_name,
+        width,
+        height,
+        seconds_per_evaluation,
+        batch_size,
+        cost_exponent,
+    )
+    if step_seconds <= 0:
+        return 0
+    return max(0, math.floor(time_budget / step_seconds + 1e-9))
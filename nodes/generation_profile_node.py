@@ -0,0 +1,75 @@
+import comfy.samplers
+
+try:
+    from . import profile_store
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import profile_store
+
+
+class GenerationProfile:
+    """All common generation parameters from one named profile."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        names = profile_store.get_profile_store().names()
+        return {
+            "required": {
+                "profile": (
+                    names,
+                    {
+                        "default": names[0],
+                        "tooltip": "Named profile with sampler, scheduler, seed, size, steps and cfg",
+                    },
+                ),
+            },
+            "optional": {
+                "seed": (
+                    "INT",
+                    {
+                        "default": -1,
+                        "min": -1,
+                        "max": 0xFFFFFFFFFFFFFFFF,
+                        "tooltip": "Overrides the profile seed when not -1",
+                    },
+                ),
+            },
+        }
+
+    RETURN_TYPES = (
+        comfy.samplers.KSampler.SAMPLERS,
+        comfy.samplers.KSampler.SCHEDULERS,
+        "INT",
+        "INT",
+        "INT",
+        "INT",
+        "FLOAT",
+    )
+    RETURN_NAMES = (
+        "sampler_name",
+        "scheduler",
+        "seed",
+        "width",
+        "height",
+        "steps",
+        "cfg",
+    )
+    FUNCTION = "get_profile"
+    CATEGORY = "comfyassets/Generation"
+
+    @classmethod
+    def IS_CHANGED(cls, profile, seed=-1):
+        # Re-run when the profile file is edited
+        return str(profile_store.get_profile_store().version)
+
+    def get_profile(self, profile, seed=-1):
+        """Output every parameter of the selected profile in one execution."""
+        values = profile_store.get_profile_store().get(profile)
+        return (
+            values["sampler_name"],
+            values["scheduler"],
+            values["seed"] if seed < 0 else seed,
+            values["width"],
+            values["height"],
+            values["steps"],
+            values["cfg"],
+        )
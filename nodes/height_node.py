@@ -1,5 +1,13 @@
 from nodes import MAX_RESOLUTION
 
+try:
+    from . import dimension_snapping as snapping
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import dimension_snapping as snapping
+
+# SDXL/FLUX height presets
+PRESETS = ["640", "768", "832", "896", "1024", "1152", "1216", "1344", "1536"]
+
 
 class HeightNode:
     @classmethod
@@ -17,24 +25,22 @@ class HeightNode:
                     },
                 ),
                 "preset": (
-                    [
-                        "custom",
-                        "640",
-                        "768",
-                        "832",
-                        "896",
-                        "1024",
-                        "1152",
-                        "1216",
-                        "1344",
-                        "1536",
-                    ],
+                    ["custom"] + PRESETS,
                     {
                         "default": "custom",
                         "tooltip": "SDXL/FLUX height presets",
                     },
                 ),
-            }
+            },
+            "optional": {
+                "snap": (
+                    snapping.SNAP_MODES,
+                    {
+                        "default": "off",
+                        "tooltip": "Round to a kernel-friendly multiple for a model family",
+                    },
+                ),
+            },
         }
 
     RETURN_TYPES = ("INT",)
@@ -42,8 +48,15 @@ class HeightNode:
     FUNCTION = "get_height"
     CATEGORY = "comfyassets/Dimensions"
 
-    def get_height(self, height, preset):
+    def get_height(self, height, preset, snap="off"):
         """Get height value, using preset if not custom."""
         if preset != "custom":
             height = int(preset)
-        return (height,)
+
+        alignment = snapping.get_alignment(snap)
+        if alignment is None:
+            return (height,)
+
+        snapped = snapping.snap_value(height, alignment, maximum=MAX_RESOLUTION)
+        report = snapping.describe_adjustment((height,), (snapped,), alignment)
+        return {"ui": {"text": [report]}, "result": (snapped,)}
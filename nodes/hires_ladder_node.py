@@ -0,0 +1,248 @@
+import math
+
+from nodes import MAX_RESOLUTION
+
+try:
+    from . import dimension_snapping as snapping
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import dimension_snapping as snapping
+
+# Keep the search small enough to plan instantly even for huge jumps.
+MAX_CANDIDATES = 256
+
+
+def pass_cost(size, cost_per_megapixel, cost_exponent=1.0, pass_overhead=0.0):
+    """Estimated cost of one sampling pass at ``size``."""
+    megapixels = size[0] * size[1] / 1_000_000
+    return pass_overhead + cost_per_megapixel * megapixels**cost_exponent
+
+
+def _scale(src, dst):
+    return max(dst[0] / src[0], dst[1] / src[1])
+
+
+def plan_ladder(
+    base,
+    target,
+    cost_per_megapixel,
+    max_scale=2.0,
+    alignment=8,
+    cost_exponent=1.0,
+    pass_overhead=0.0,
+):
+    """Find the cheapest ladder of passes from ``base`` to ``target``.
+
+    Intermediate sizes follow the target's aspect ratio and are snapped to
+    ``alignment``. No pass may upscale by more than ``max_scale``. Returns
+    ``(ladder, total_cost)`` where ``ladder`` lists every upscale pass (the
+    last entry is the target) and ``total_cost`` includes the base pass.
+    Raises ValueError if no ladder of aligned sizes stays within
+    ``max_scale``.
+    """
+    if max_scale <= 1.0:
+        raise ValueError("max_scale must be greater than 1")
+
+    def cost(size):
+        return pass_cost(size, cost_per_megapixel, cost_exponent, pass_overhead)
+
+    base = tuple(base)
+    target = tuple(target)
+    base_cost = cost(base)
+    if base == target:
+        return [], base_cost
+
+    low, high = sorted((base[0], target[0]))
+    first = (low // alignment + 1) * alignment
+    count = max(0, (high - first) // alignment)
+    stride = alignment * max(1, math.ceil(count / MAX_CANDIDATES))
+
+    # Start coarse for speed and refine down to every aligned width
+    while True:
+        sizes, best, previous = _shortest_ladder(
+            base, target, first, high, stride, alignment, max_scale, cost
+        )
+        if best[-1] < math.inf or stride == alignment:
+            break
+        stride = max(alignment, stride // alignment // 2 * alignment)
+
+    if best[-1] == math.inf:
+        raise ValueError(
+            f"No ladder from {base[0]}x{base[1]} to {target[0]}x{target[1]} with "
+            f"sizes aligned to {alignment} stays within {max_scale}x per pass; "
+            "raise max_scale_per_pass or use a finer snap"
+        )
+
+    ladder = []
+    index = len(sizes) - 1
+    while index:
+        ladder.append(sizes[index])
+        index = previous[index]
+    ladder.reverse()
+    return ladder, best[-1]
+
+
+def _shortest_ladder(base, target, first, high, stride, alignment, max_scale, cost):
+    aspect = target[1] / target[0]
+    sizes = [base]
+    for width in range(first, high, stride):
+        height = snapping.snap_value(
+            width * aspect, alignment, minimum=alignment, maximum=MAX_RESOLUTION
+        )
+        size = (width, height)
+        if size not in (base, target) and _scale(base, size) > 1.0:
+            sizes.append(size)
+    sizes.sort(key=lambda size: size[0] * size[1])
+    sizes.append(target)
+
+    # Shortest path over sizes ordered by area; an edge is a single pass.
+    best = [math.inf] * len(sizes)
+    previous = [None] * len(sizes)
+    best[0] = cost(base)
+    for i in range(len(sizes)):
+        if best[i] == math.inf:
+            continue
+        for j in range(i + 1, len(sizes)):
+            if _scale(sizes[i], sizes[j]) > max_scale + 1e-9:
+                continue
+            candidate = best[i] + cost(sizes[j])
+            if candidate < best[j]:
+                best[j] = candidate
+                previous[j] = i
+    return sizes, best, previous
+
+
+class HiResLadderPlanner:
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "width": (
+                    "INT",
+                    {
+                        "default": 832,
+                        "min": 64,
+                        "max": MAX_RESOLUTION,
+                        "step": 8,
+                        "tooltip": "Base pass width (e.g. from Width & Height)",
+                    },
+                ),
+                "height": (
+                    "INT",
+                    {
+                        "default": 1216,
+                        "min": 64,
+                        "max": MAX_RESOLUTION,
+                        "step": 8,
+                        "tooltip": "Base pass height (e.g. from Width & Height)",
+                    },
+                ),
+                "target_width": (
+                    "INT",
+                    {
+                        "default": 1664,
+                        "min": 64,
+                        "max": MAX_RESOLUTION,
+                        "step": 8,
+                        "tooltip": "Final output width",
+                    },
+                ),
+                "target_height": (
+                    "INT",
+                    {
+                        "default": 2432,
+                        "min": 64,
+                        "max": MAX_RESOLUTION,
+                        "step": 8,
+                        "tooltip": "Final output height",
+                    },
+                ),
+                "cost_per_megapixel": (
+                    "FLOAT",
+                    {
+                        "default": 1.0,
+                        "min": 0.0,
+                        "max": 10000.0,
+                        "step": 0.01,
+                        "tooltip": "Estimated cost (e.g. seconds) of one pass per megapixel",
+                    },
+                ),
+                "max_scale_per_pass": (
+                    "FLOAT",
+                    {
+                        "default": 1.5,
+                        "min": 1.05,
+                        "max": 8.0,
+                        "step": 0.05,
+                        "tooltip": "Largest upscale factor allowed in a single pass",
+                    },
+                ),
+            },
+            "optional": {
+                "snap": (
+                    snapping.SNAP_MODES,
+                    {
+                        "default": "latent (8)",
+                        "tooltip": "Alignment for intermediate sizes",
+                    },
+                ),
+                "cost_exponent": (
+                    "FLOAT",
+                    {
+                        "default": 1.0,
+                        "min": 0.5,
+                        "max": 3.0,
+                        "step": 0.05,
+                        "tooltip": "Cost growth with pixel count (>1 for attention-heavy models)",
+                    },
+                ),
+                "pass_overhead": (
+                    "FLOAT",
+                    {
+                        "default": 0.0,
+                        "min": 0.0,
+                        "max": 10000.0,
+                        "step": 0.01,
+                        "tooltip": "Fixed cost added to every pass (VAE, upscale model, ...)",
+                    },
+                ),
+            },
+        }
+
+    RETURN_TYPES = ("INT", "INT", "FLOAT", "INT")
+    RETURN_NAMES = ("widths", "heights", "total_cost", "passes")
+    OUTPUT_IS_LIST = (True, True, False, False)
+    FUNCTION = "plan"
+    CATEGORY = "comfyassets/Dimensions"
+
+    def plan(
+        self,
+        width,
+        height,
+        target_width,
+        target_height,
+        cost_per_megapixel,
+        max_scale_per_pass,
+        snap="latent (8)",
+        cost_exponent=1.0,
+        pass_overhead=0.0,
+    ):
+        """Plan the cheapest resolution ladder from the base to the target."""
+        alignment = snapping.get_alignment(snap) or 8
+        ladder, total_cost = plan_ladder(
+            (width, height),
+            (target_width, target_height),
+            cost_per_megapixel,
+            max_scale_per_pass,
+            alignment,
+            cost_exponent,
+            pass_overhead,
+        )
+        if not ladder:
+            # Same size: one refinement pass, so list consumers still run
+            ladder = [(target_width, target_height)]
+            total_cost += pass_cost(
+                ladder[0], cost_per_megapixel, cost_exponent, pass_overhead
+            )
+        widths = [size[0] for size in ladder]
+        heights = [size[1] for size in ladder]
+        return (widths, heights, total_cost, len(ladder))
@@ -0,0 +1,88 @@
+import os
+
+from nodes import MAX_RESOLUTION
+
+try:
+    from . import dimension_snapping as snapping
+    from . import image_header
+    from .input_paths import resolve_input_path
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import dimension_snapping as snapping
+    import image_header
+    from input_paths import resolve_input_path
+
+
+class DimensionsFromFile:
+    """Width and height of a reference image, read from its header only."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "path": (
+                    "STRING",
+                    {
+                        "default": "",
+                        "tooltip": "PNG, JPEG, WebP or GIF file (relative paths use the input folder)",
+                    },
+                ),
+                "swap_dimensions": (
+                    "BOOLEAN",
+                    {"default": False, "tooltip": "Swap width and height values"},
+                ),
+            },
+            "optional": {
+                "snap": (
+                    snapping.SNAP_MODES,
+                    {
+                        "default": "off",
+                        "tooltip": "Round to a kernel-friendly multiple for a model family",
+                    },
+                ),
+                "aspect_tolerance": (
+                    "FLOAT",
+                    {
+                        "default": snapping.DEFAULT_ASPECT_TOLERANCE,
+                        "min": 0.0,
+                        "max": 0.5,
+                        "step": 0.005,
+                        "tooltip": "Allowed relative aspect ratio drift when snapping",
+                    },
+                ),
+            },
+        }
+
+    RETURN_TYPES = ("INT", "INT")
+    RETURN_NAMES = ("width", "height")
+    FUNCTION = "get_dimensions"
+    CATEGORY = "comfyassets/Dimensions"
+
+    @classmethod
+    def IS_CHANGED(cls, path, **kwargs):
+        # Re-run when the referenced file is replaced
+        try:
+            return str(os.stat(resolve_input_path(path)).st_mtime_ns)
+        except OSError:
+            return ""
+
+    def get_dimensions(
+        self,
+        path,
+        swap_dimensions,
+        snap="off",
+        aspect_tolerance=snapping.DEFAULT_ASPECT_TOLERANCE,
+    ):
+        """Read the image size and apply swap and snapping."""
+        width, height = image_header.read_image_size(resolve_input_path(path))
+        if swap_dimensions:
+            width, height = height, width
+
+        alignment = snapping.get_alignment(snap)
+        if alignment is None:
+            return (width, height)
+
+        snapped = snapping.snap_dimensions(
+            width, height, alignment, aspect_tolerance, maximum=MAX_RESOLUTION
+        )
+        report = snapping.describe_adjustment((width, height), snapped, alignment)
+        return {"ui": {"text": [report]}, "result": snapped}
@@ -0,0 +1,131 @@
+"""Read image dimensions from file headers without decoding pixels.
+
+Supports PNG (IHDR), JPEG (SOF markers, honouring EXIF orientation like
+ComfyUI's LoadImage), WebP (VP8, VP8L and VP8X) and GIF. Only the header
+bytes are read: JPEG segments before the frame header are skipped with
+``seek`` rather than read. Results are cached by path, mtime and size.
+"""
+
+import functools
+import os
+import struct
+
+# SOF markers carrying the frame size (excluding DHT, JPG and DAC)
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Markers without a length field
+JPEG_STANDALONE_MARKERS = {0x01, 0xD8} | set(range(0xD0, 0xD8))
+
+# EXIF orientations that rotate the image by 90 degrees
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+# How much of an APP1 segment to read when looking for the orientation tag
+EXIF_READ_LIMIT = 1024
+
+
+class UnsupportedImageError(ValueError):
+    """Raised when a file is not a supported image or its header is bad."""
+
+
+def _exif_orientation(data):
+    """Return the orientation tag from an EXIF APP1 payload, if present."""
+    if not data.startswith(b"Exif\x00\x00") or len(data) < 14:
+        return None
+    tiff = data[6:]
+    order = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if order is None:
+        return None
+    offset = struct.unpack(order + "I", tiff[4:8])[0]
+    if offset + 2 > len(tiff):
+        return None
+    count = struct.unpack(order + "H", tiff[offset : offset + 2])[0]
+    for index in range(count):
+        entry = offset + 2 + index * 12
+        if entry + 12 > len(tiff):
+            return None
+        tag, _, _, value = struct.unpack(order + "HHIH", tiff[entry : entry + 10])
+        if tag == 0x0112:
+            return value
+    return None
+
+
+def _jpeg_size(handle):
+    orientation = None
+    while True:
+        byte = handle.read(1)
+        if not byte:
+            raise UnsupportedImageError("JPEG ended before the frame header")
+        if byte != b"\xff":
+            continue
+        marker = handle.read(1)
+        while marker == b"\xff":  # fill bytes
+            marker = handle.read(1)
+        if not marker:
+            raise UnsupportedImageError("JPEG ended before the frame header")
+        marker = marker[0]
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        length_bytes = handle.read(2)
+        if len(length_bytes) < 2:
+            raise UnsupportedImageError("Truncated JPEG segment")
+        length = struct.unpack(">H", length_bytes)[0]
+        if marker in JPEG_SOF_MARKERS:
+            header = handle.read(5)
+            if len(header) < 5:
+                raise UnsupportedImageError("Truncated JPEG frame header")
+            height, width = struct.unpack(">xHH", header)
+            if orientation in TRANSPOSED_ORIENTATIONS:
+                width, height = height, width
+            return width, height
+        if marker == 0xE1 and orientation is None:
+            start = handle.tell()
+            orientation = _exif_orientation(
+                handle.read(min(length - 2, EXIF_READ_LIMIT))
+            )
+            handle.seek(start)
+        handle.seek(length - 2, os.SEEK_CUR)
+
+
+def _webp_size(header):
+    chunk = header[12:16]
+    if chunk == b"VP8 " and header[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and header[20] == 0x2F:
+        bits = struct.unpack("<I", header[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        width = int.from_bytes(header[24:27], "little") + 1
+        height = int.from_bytes(header[27:30], "little") + 1
+        return width, height
+    raise UnsupportedImageError("Unsupported WebP encoding")
+
+
+def _read_size(path):
+    with open(path, "rb") as handle:
+        header = handle.read(32)
+        if header.startswith(b"\x89PNG\r\n\x1a\n") and header[12:16] == b"IHDR":
+            return struct.unpack(">II", header[16:24])
+        if header[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", header[6:10])
+        if header[:4] == b"RIFF" and header[8:12] == b"WEBP" and len(header) >= 30:
+            return _webp_size(header)
+        if header[:2] == b"\xff\xd8":
+            handle.seek(2)
+            return _jpeg_size(handle)
+    raise UnsupportedImageError(f"Unsupported image format: {path}")
+
+
+@functools.lru_cache(maxsize=65536)
+def _cached_size(path, mtime_ns, size):
+    return tuple(_read_size(path))
+
+
+def read_image_size(path):
+    """Return ``(width, height)`` of the image at ``path``.
+
+    Sizes are cached per path and invalidated when the file's mtime or
+    size changes.
+    """
+    stat = os.stat(path)
+    return _cached_size(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
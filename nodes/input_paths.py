@@ -0,0 +1,15 @@
+"""Paths of files the nodes read from ComfyUI's input folder."""
+
+import os
+
+
+def resolve_input_path(path):
+    """Resolve ``path``, treating relative paths as ComfyUI input files."""
+    path = os.path.expanduser(path.strip())
+    if os.path.isabs(path):
+        return path
+    try:
+        import folder_paths
+    except ImportError:  # outside ComfyUI
+        return os.path.abspath(path)
+    return os.path.join(folder_paths.get_input_directory(), path)
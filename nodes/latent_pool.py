@@ -0,0 +1,107 @@
+"""Pool of reusable zeroed latent buffers.
+
+Empty latents are the same zero tensor every time, so instead of
+allocating a fresh one per prompt the pool hands out a cached buffer keyed
+by ``(shape, dtype, device)``. Buffers are shared the same way ComfyUI
+shares cached node outputs, so consumers must not modify them in place; as
+a safety net, a buffer whose in-place version counter changed since it was
+handed out is zeroed again before reuse. Total pooled bytes are capped and
+the least recently used buffers are evicted first.
+"""
+
+import collections
+import threading
+import time
+
+try:
+    from . import server_hooks
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import server_hooks
+
+DEFAULT_MAX_MB = 256
+
+
+class LatentPool:
+    """LRU pool of zeroed tensors with allocation-time accounting."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (tensor, version when handed out)
+        self._buffers = collections.OrderedDict()
+        self._bytes = 0
+        self._allocated_bytes = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "rezeroed": 0,
+            "evictions": 0,
+            "allocation_seconds": 0.0,
+            "saved_seconds": 0.0,
+        }
+
+    @property
+    def pooled_bytes(self):
+        return self._bytes
+
+    def _estimate_seconds(self, nbytes):
+        """Allocation time for ``nbytes``, from the misses measured so far."""
+        if not self._allocated_bytes:
+            return 0.0
+        return self.stats["allocation_seconds"] * nbytes / self._allocated_bytes
+
+    def zeros(self, shape, dtype=None, device="cpu"):
+        """Return a zeroed tensor of ``shape``, reusing a pooled one if any."""
+        import torch
+
+        dtype = dtype or torch.float32
+        key = (tuple(shape), str(dtype), str(device))
+        with self._lock:
+            entry = self._buffers.get(key)
+            if entry is not None:
+                tensor, version = entry
+                self._buffers.move_to_end(key)
+                if tensor._version != version:
+                    tensor.zero_()
+                    self._buffers[key] = (tensor, tensor._version)
+                    self.stats["rezeroed"] += 1
+                nbytes = tensor.numel() * tensor.element_size()
+                self.stats["hits"] += 1
+                self.stats["saved_seconds"] += self._estimate_seconds(nbytes)
+                return tensor
+
+            start = time.perf_counter()
+            tensor = torch.zeros(shape, dtype=dtype, device=device)
+            elapsed = time.perf_counter() - start
+            nbytes = tensor.numel() * tensor.element_size()
+            self.stats["misses"] += 1
+            self.stats["allocation_seconds"] += elapsed
+            self._allocated_bytes += nbytes
+
+            if nbytes <= self.max_bytes:
+                self._buffers[key] = (tensor, tensor._version)
+                self._bytes += nbytes
+                while self._bytes > self.max_bytes:
+                    _, (evicted, _) = self._buffers.popitem(last=False)
+                    self._bytes -= evicted.numel() * evicted.element_size()
+                    self.stats["evictions"] += 1
+            return tensor
+
+    def clear(self):
+        with self._lock:
+            self._buffers.clear()
+            self._bytes = 0
+
+
+_pool = None
+
+
+def get_latent_pool():
+    """Return the shared latent pool (``COMFYASSETS_LATENT_POOL_MB`` cap)."""
+    global _pool
+    if _pool is None:
+        max_mb = server_hooks.env_number(
+            "COMFYASSETS_LATENT_POOL_MB", DEFAULT_MAX_MB, float
+        )
+        _pool = LatentPool(int(max_mb * 1024**2))
+    return _pool
@@ -0,0 +1,173 @@
+"""Cache of seeded initial noise.
+
+ComfyUI draws a sampling run's initial noise on the CPU from a generator
+seeded with the prompt's seed, so re-running a seed at the same latent
+shape (A/B testing samplers or schedulers) produces the identical tensor
+every time. This cache keeps those tensors keyed by
+``(seed, shape, dtype, generator, batch indices)``. Cached noise is shared,
+so consumers must not modify it in place; as a safety net, a tensor whose
+in-place version counter changed since it was handed out is generated
+again. Total cached bytes are capped and the least recently used tensors
+are evicted first.
+"""
+
+import collections
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from . import server_hooks
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import server_hooks
+
+DEFAULT_MAX_MB = 512
+
+# The generator ComfyUI's prepare_noise uses; the only one supported so far
+CPU_GENERATOR = "torch_cpu"
+
+
+def generate_noise(seed, shape, dtype=None, batch_inds=None):
+    """Draw noise exactly like ``comfy.sample.prepare_noise``.
+
+    A private CPU generator is used instead of the global one, which gives
+    the same values without reseeding torch globally.
+    """
+    import torch
+
+    dtype = dtype or torch.float32
+    generator = torch.Generator(device="cpu").manual_seed(seed)
+    if batch_inds is None:
+        return torch.randn(shape, dtype=dtype, generator=generator, device="cpu")
+
+    # One draw per batch index up to the largest, keeping the used ones
+    unique = sorted(set(batch_inds))
+    drawn = {}
+    for index in range(unique[-1] + 1):
+        noise = torch.randn(
+            [1] + list(shape)[1:], dtype=dtype, generator=generator, device="cpu"
+        )
+        if index in unique:
+            drawn[index] = noise
+    return torch.cat([drawn[index] for index in batch_inds], dim=0)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = server_hooks.env_number(
+                "COMFYASSETS_NOISE_THREADS", min(8, os.cpu_count() or 1)
+            )
+            _executor = ThreadPoolExecutor(max(1, workers), "comfyassets-noise")
+    return _executor
+
+
+def batch_invariant_noise(seeds, shape, dtype=None, executor=None):
+    """Draw a batch whose item ``i`` depends only on ``seeds[i]``.
+
+    Item ``i`` equals ``generate_noise(seeds[i], (1,) + shape[1:])``, so an
+    image gets bit-identical noise alone or in a batch of any size, and
+    prompts with different seeds can be batched together. Items are drawn in
+    parallel (torch releases the GIL while generating) straight into one
+    preallocated tensor.
+    """
+    import torch
+
+    dtype = dtype or torch.float32
+    shape = tuple(shape)
+    if len(seeds) != shape[0]:
+        raise ValueError(f"{len(seeds)} seeds for a batch of {shape[0]}")
+    output = torch.empty(shape, dtype=dtype, device="cpu")
+
+    def draw(index):
+        generator = torch.Generator(device="cpu").manual_seed(seeds[index])
+        torch.randn(
+            (1,) + shape[1:],
+            dtype=dtype,
+            generator=generator,
+            out=output[index : index + 1],
+        )
+
+    if len(seeds) == 1:
+        draw(0)
+    else:
+        # list() re-raises the first error from the pool
+        list((executor or _get_executor()).map(draw, range(len(seeds))))
+    return output
+
+
+class NoiseCache:
+    """LRU cache of generated noise tensors with hit/miss counters."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (tensor, version when handed out)
+        self._tensors = collections.OrderedDict()
+        self._bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "regenerated": 0, "evictions": 0}
+
+    @property
+    def cached_bytes(self):
+        return self._bytes
+
+    def noise(self, seed, shape, dtype=None, batch_inds=None, generator=CPU_GENERATOR):
+        """Return the noise for ``seed`` and ``shape``, generating it on a miss."""
+        import torch
+
+        if generator != CPU_GENERATOR:
+            raise ValueError(f"Unsupported noise generator: {generator}")
+        dtype = dtype or torch.float32
+        if batch_inds is not None:
+            batch_inds = tuple(int(index) for index in batch_inds)
+        key = (int(seed), tuple(shape), str(dtype), generator, batch_inds)
+
+        with self._lock:
+            entry = self._tensors.get(key)
+            if entry is not None:
+                tensor, version = entry
+                self._tensors.move_to_end(key)
+                if tensor._version == version:
+                    self.stats["hits"] += 1
+                    return tensor
+                # Modified in place downstream; drop it and draw it again
+                del self._tensors[key]
+                self._bytes -= tensor.numel() * tensor.element_size()
+                self.stats["regenerated"] += 1
+            else:
+                self.stats["misses"] += 1
+
+            tensor = generate_noise(seed, shape, dtype, batch_inds)
+            nbytes = tensor.numel() * tensor.element_size()
+            if nbytes <= self.max_bytes:
+                self._tensors[key] = (tensor, tensor._version)
+                self._bytes += nbytes
+                while self._bytes > self.max_bytes:
+                    _, (evicted, _) = self._tensors.popitem(last=False)
+                    self._bytes -= evicted.numel() * evicted.element_size()
+                    self.stats["evictions"] += 1
+            return tensor
+
+    def clear(self):
+        with self._lock:
+            self._tensors.clear()
+            self._bytes = 0
+
+
+_cache = None
+
+
+def get_noise_cache():
+    """Return the shared noise cache (``COMFYASSETS_NOISE_CACHE_MB`` cap)."""
+    global _cache
+    if _cache is None:
+        max_mb = server_hooks.env_number(
+            "COMFYASSETS_NOISE_CACHE_MB", DEFAULT_MAX_MB, float
+        )
+        _cache = NoiseCache(int(max_mb * 1024**2))
+    return _cache
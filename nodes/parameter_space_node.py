@@ -0,0 +1,186 @@
+import functools
+import random
+
+import comfy.samplers
+
+try:
+    from . import width_height_node
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import width_height_node
+
+# One prime base per axis: sampler, scheduler, size preset, seed.
+BASES = (2, 3, 5, 7)
+
+# Digits per axis; enough for 2**64 seeds and billions of points.
+DIGITS = (64, 41, 28, 23)
+
+
+@functools.lru_cache(maxsize=16)
+def _digit_permutations(scramble_seed):
+    """Random permutations of all digits, per axis and digit position.
+
+    Permuting 0 too is safe because every axis has a fixed digit count;
+    a separate permutation per position keeps even base 2 (two possible
+    permutations) from repeating across scramble seeds.
+    """
+    rng = random.Random(scramble_seed)
+    permutations = []
+    for base, digits in zip(BASES, DIGITS):
+        axis = []
+        for _ in range(digits):
+            permutation = list(range(base))
+            rng.shuffle(permutation)
+            axis.append(tuple(permutation))
+        permutations.append(tuple(axis))
+    return tuple(permutations)
+
+
+def radical_inverse(index, base, digits, permutation=None):
+    """Return the radical inverse of ``index`` as ``numerator / base**digits``.
+
+    ``permutation`` optionally holds one digit permutation per position.
+    Exact integer arithmetic keeps huge ranges (such as 64-bit seeds) evenly
+    covered. Cost depends only on ``digits``, not on ``index``.
+    """
+    numerator = 0
+    for position in range(digits):
+        index, digit = divmod(index, base)
+        if permutation is not None:
+            digit = permutation[position][digit]
+        numerator = numerator * base + digit
+    return numerator
+
+
+def halton_choice(index, axis, count, permutations=None):
+    """Map point ``index`` on ``axis`` to an integer in ``range(count)``."""
+    base = BASES[axis]
+    digits = DIGITS[axis]
+    permutation = permutations[axis] if permutations else None
+    numerator = radical_inverse(index, base, digits, permutation)
+    return numerator * count // base**digits
+
+
+def parameter_point(
+    index,
+    samplers,
+    schedulers,
+    presets,
+    seed_min,
+    seed_max,
+    scramble_seed=0,
+):
+    """Return the ``index``-th point of a scrambled Halton sequence.
+
+    The point is ``(sampler, scheduler, width, height, seed)``. Each call is
+    independent, so any worker can compute any point. Index 0 is skipped
+    because the unscrambled Halton origin sits on every axis' first choice.
+    """
+    if seed_max < seed_min:
+        raise ValueError("seed_max must not be smaller than seed_min")
+
+    permutations = _digit_permutations(scramble_seed) if scramble_seed else None
+    point = index + 1
+    sampler = samplers[halton_choice(point, 0, len(samplers), permutations)]
+    scheduler = schedulers[halton_choice(point, 1, len(schedulers), permutations)]
+    preset = presets[halton_choice(point, 2, len(presets), permutations)]
+    seed = seed_min + halton_choice(point, 3, seed_max - seed_min + 1, permutations)
+    width, height = (int(value) for value in preset.split("x"))
+    return sampler, scheduler, width, height, seed
+
+
+class ParameterSpaceSampler:
+    """Low-discrepancy exploration of samplers, schedulers, sizes and seeds."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "index": (
+                    "INT",
+                    {
+                        "default": 0,
+                        "min": 0,
+                        "max": 0xFFFFFFFF,
+                        "tooltip": "Point of the sequence to emit (increment per run)",
+                    },
+                ),
+                "seed_min": (
+                    "INT",
+                    {"default": 0, "min": 0, "max": 0xFFFFFFFFFFFFFFFF},
+                ),
+                "seed_max": (
+                    "INT",
+                    {
+                        "default": 0xFFFFFFFF,
+                        "min": 0,
+                        "max": 0xFFFFFFFFFFFFFFFF,
+                    },
+                ),
+                "scramble_seed": (
+                    "INT",
+                    {
+                        "default": 0,
+                        "min": 0,
+                        "max": 0xFFFFFFFF,
+                        "tooltip": "Digit scrambling; 0 keeps the plain Halton sequence",
+                    },
+                ),
+            },
+            "optional": {
+                "shard_index": (
+                    "INT",
+                    {
+                        "default": 0,
+                        "min": 0,
+                        "max": 4096,
+                        "tooltip": "This worker's shard (0-based)",
+                    },
+                ),
+                "shard_count": (
+                    "INT",
+                    {
+                        "default": 1,
+                        "min": 1,
+                        "max": 4096,
+                        "tooltip": "Number of workers sharing the sequence",
+                    },
+                ),
+            },
+        }
+
+    RETURN_TYPES = (
+        comfy.samplers.KSampler.SAMPLERS,
+        comfy.samplers.KSampler.SCHEDULERS,
+        "INT",
+        "INT",
+        "INT",
+        "INT",
+    )
+    RETURN_NAMES = ("sampler_name", "scheduler", "width", "height", "seed", "point")
+    FUNCTION = "sample"
+    CATEGORY = "comfyassets/Generation"
+
+    def sample(
+        self,
+        index,
+        seed_min,
+        seed_max,
+        scramble_seed,
+        shard_index=0,
+        shard_count=1,
+    ):
+        """Emit one point; shards interleave so workers never overlap."""
+        if shard_index >= shard_count:
+            raise ValueError("shard_index must be smaller than shard_count")
+
+        point = index * shard_count + shard_index
+        sampler, scheduler, width, height, seed = parameter_point(
+            point,
+            comfy.samplers.KSampler.SAMPLERS,
+            comfy.samplers.KSampler.SCHEDULERS,
+            width_height_node.PRESETS,
+            seed_min,
+            seed_max,
+            scramble_seed,
+        )
+        return (sampler, scheduler, width, height, seed, point)
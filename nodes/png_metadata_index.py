@@ -0,0 +1,397 @@
+"""Index selector parameters embedded in ComfyUI output PNGs.
+
+Only the PNG text chunks in front of the image data are read (through
+``mmap``), so pixels are never decoded. The ``prompt`` JSON that ComfyUI
+embeds is searched for ``SeedHistory``, ``SamplerSelector``,
+``SchedulerSelector`` and dimension node values (images that only carry a
+``workflow`` chunk fall back to its widget values). Files without readable
+metadata are recorded with no values. Results are stored in an
+SQLite index keyed by path, mtime and size; re-runs skip unchanged files.
+
+Usage::
+
+    python nodes/png_metadata_index.py index outputs/ --db selectors.sqlite
+    python nodes/png_metadata_index.py query --db selectors.sqlite --seed 42
+"""
+
+import argparse
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from . import prompt_resolution
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import prompt_resolution
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS params (
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS params_lookup ON params (kind, value);
+CREATE INDEX IF NOT EXISTS params_path ON params (path);
+"""
+
+
+def _parse_text_chunk(chunk_type, data):
+    keyword, _, rest = data.partition(b"\x00")
+    keyword = keyword.decode("latin-1")
+    if chunk_type == b"tEXt":
+        return keyword, rest.decode("latin-1")
+    if chunk_type == b"zTXt":
+        return keyword, zlib.decompress(rest[1:]).decode("latin-1")
+
+    # iTXt: compression flag, method, language tag, translated keyword, text
+    compressed = rest[0]
+    _, _, rest = rest[2:].partition(b"\x00")
+    _, _, text = rest.partition(b"\x00")
+    if compressed:
+        text = zlib.decompress(text)
+    return keyword, text.decode("utf-8")
+
+
+def read_text_chunks(path):
+    """Return the PNG text chunks that precede the image data.
+
+    Chunks are located by their headers in a read-only memory map; the
+    first ``IDAT`` chunk ends the scan, so pixel data is never touched.
+    """
+    with open(path, "rb") as handle:
+        try:
+            view = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return {}
+        with view:
+            if view[:8] != PNG_SIGNATURE:
+                return {}
+            chunks = {}
+            offset = 8
+            while offset + 8 <= len(view):
+                length, chunk_type = struct.unpack(">I4s", view[offset : offset + 8])
+                start = offset + 8
+                end = start + length
+                if chunk_type in (b"IDAT", b"IEND") or end > len(view):
+                    break
+                if chunk_type in (b"tEXt", b"zTXt", b"iTXt"):
+                    try:
+                        keyword, text = _parse_text_chunk(chunk_type, view[start:end])
+                    except (zlib.error, UnicodeDecodeError, IndexError):
+                        pass
+                    else:
+                        chunks[keyword] = text
+                offset = end + 4
+            return chunks
+
+
+_node_classes = None
+
+
+def _get_node_classes():
+    global _node_classes
+    if _node_classes is None:
+        try:
+            _node_classes = prompt_resolution.default_node_classes()
+        except ImportError:  # outside ComfyUI
+            _node_classes = {}
+    return _node_classes
+
+
+def extract_selector_values(prompt):
+    """Collect this package's selector values from an API-format prompt.
+
+    Returns ``(kind, value)`` pairs with kinds ``seed``, ``sampler``,
+    ``scheduler`` and ``size`` (``"<width>x<height>"``).
+    """
+    values = set()
+    for node in prompt.values():
+        if not isinstance(node, dict):
+            continue
+        class_type = node.get("class_type")
+        inputs = node.get("inputs", {})
+        if class_type == "SeedHistory":
+            kind, value = "seed", inputs.get("seed")
+        elif class_type == "SamplerSelector":
+            kind, value = "sampler", inputs.get("sampler_name")
+        elif class_type == "SchedulerSelector":
+            kind, value = "scheduler", inputs.get("scheduler")
+        else:
+            continue
+        if value is not None and not prompt_resolution.is_link(value):
+            values.add((kind, str(value)))
+    values.update(_size_values(prompt))
+    return sorted(values)
+
+
+def _size_values(prompt):
+    node_classes = _get_node_classes()
+    if node_classes:
+        sizes = prompt_resolution.resolve_dimensions(prompt, node_classes) or ()
+    else:
+        # Without ComfyUI the nodes cannot run; fall back to raw widgets
+        sizes = [
+            (node["inputs"].get("width"), node["inputs"].get("height"))
+            for node in prompt.values()
+            if isinstance(node, dict)
+            and node.get("class_type") == "WidthHeightNode"
+            and node.get("inputs", {}).get("preset") == "custom"
+        ]
+    return {
+        ("size", f"{width}x{height}")
+        for width, height in sizes
+        if isinstance(width, int) and isinstance(height, int)
+    }
+
+
+WORKFLOW_WIDGETS = {
+    "SeedHistory": "seed",
+    "SamplerSelector": "sampler",
+    "SchedulerSelector": "scheduler",
+}
+
+
+def _widget_names(class_type):
+    node_class = _get_node_classes().get(class_type)
+    if node_class is None:
+        # Outside ComfyUI only custom sizes are read, as for prompts
+        return ("width", "height", "preset") if class_type == "WidthHeightNode" else ()
+    input_types = node_class.INPUT_TYPES()
+    return [*input_types.get("required", {}), *input_types.get("optional", {})]
+
+
+def extract_workflow_values(workflow):
+    """Collect selector values from a UI-format workflow's widget values.
+
+    Dimension nodes are rebuilt as API-format nodes from their widgets and
+    resolved like a prompt; nodes with a linked widget are skipped.
+    """
+    values = set()
+    dimension_nodes = {}
+    for node in workflow.get("nodes", []):
+        if not isinstance(node, dict):
+            continue
+        class_type = node.get("type")
+        widgets = node.get("widgets_values")
+        if not isinstance(widgets, list) or not widgets:
+            continue
+        kind = WORKFLOW_WIDGETS.get(class_type)
+        if kind:
+            values.add((kind, str(widgets[0])))
+        elif class_type in prompt_resolution.DIMENSION_NODES and not any(
+            isinstance(item, dict)
+            and item.get("widget")
+            and item.get("link") is not None
+            for item in node.get("inputs") or ()
+        ):
+            inputs = dict(zip(_widget_names(class_type), widgets))
+            dimension_nodes[str(node.get("id"))] = {
+                "class_type": class_type,
+                "inputs": inputs,
+            }
+    values.update(_size_values(dimension_nodes))
+    return sorted(values)
+
+
+def index_file(path):
+    """Read one PNG and return ``(path, mtime_ns, size, values)``.
+
+    Files with unparseable metadata are returned with no values, so they
+    are recorded and skipped until they change. Unreadable files have a
+    None mtime and are tried again on the next run.
+    """
+    try:
+        stat = os.stat(path)
+        chunks = read_text_chunks(path)
+    except OSError:
+        return path, None, None, []
+    values = []
+    try:
+        if "prompt" in chunks:
+            prompt = json.loads(chunks["prompt"])
+            if isinstance(prompt, dict):
+                values = extract_selector_values(prompt)
+        elif "workflow" in chunks:
+            workflow = json.loads(chunks["workflow"])
+            if isinstance(workflow, dict):
+                values = extract_workflow_values(workflow)
+    except (ValueError, TypeError, AttributeError):
+        values = []
+    return path, stat.st_mtime_ns, stat.st_size, values
+
+
+def iter_png_files(roots):
+    """Yield ``(path, stat)`` for every PNG below ``roots``."""
+    stack = [os.path.abspath(root) for root in roots]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+            elif entry.name.lower().endswith(".png"):
+                try:
+                    yield entry.path, entry.stat()
+                except OSError:
+                    continue
+
+
+class MetadataIndex:
+    """Incremental on-disk index of selector parameters in PNG files."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def update(self, roots, workers=None, chunksize=64):
+        """Index new or changed PNGs below ``roots``.
+
+        Files whose mtime and size are unchanged are skipped, and files that
+        disappeared from the scanned roots are dropped. Returns counters.
+        """
+        known = {
+            path: (mtime_ns, size)
+            for path, mtime_ns, size in self.connection.execute(
+                "SELECT path, mtime_ns, size FROM files"
+            )
+        }
+        prefixes = tuple(os.path.join(os.path.abspath(root), "") for root in roots)
+
+        seen = set()
+        changed = []
+        for path, stat in iter_png_files(roots):
+            seen.add(path)
+            if known.get(path) != (stat.st_mtime_ns, stat.st_size):
+                changed.append(path)
+
+        removed = [
+            path for path in known if path.startswith(prefixes) and path not in seen
+        ]
+
+        if workers == 1 or len(changed) < 2:
+            results = map(index_file, changed)
+            self._store(results, removed)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(index_file, changed, chunksize=chunksize)
+                self._store(results, removed)
+
+        return {
+            "scanned": len(seen),
+            "indexed": len(changed),
+            "skipped": len(seen) - len(changed),
+            "removed": len(removed),
+        }
+
+    def _store(self, results, removed):
+        now = time.time()
+        with self.connection:
+            for path in removed:
+                self._delete(path)
+            for path, mtime_ns, size, values in results:
+                self._delete(path)
+                if mtime_ns is None:
+                    continue
+                self.connection.execute(
+                    "INSERT INTO files VALUES (?, ?, ?, ?)", (path, mtime_ns, size, now)
+                )
+                self.connection.executemany(
+                    "INSERT INTO params VALUES (?, ?, ?)",
+                    [(path, kind, value) for kind, value in values],
+                )
+
+    def _delete(self, path):
+        self.connection.execute("DELETE FROM files WHERE path = ?", (path,))
+        self.connection.execute("DELETE FROM params WHERE path = ?", (path,))
+
+    def query(self, seed=None, sampler=None, scheduler=None, size=None):
+        """Return indexed paths matching every given parameter."""
+        filters = [
+            (kind, str(value))
+            for kind, value in (
+                ("seed", seed),
+                ("sampler", sampler),
+                ("scheduler", scheduler),
+                ("size", size),
+            )
+            if value is not None
+        ]
+        if not filters:
+            rows = self.connection.execute("SELECT path FROM files ORDER BY path")
+            return [row[0] for row in rows]
+
+        clauses = " INTERSECT ".join(
+            "SELECT path FROM params WHERE kind = ? AND value = ?" for _ in filters
+        )
+        params = [item for pair in filters for item in pair]
+        rows = self.connection.execute(f"{clauses} ORDER BY path", params)
+        return [row[0] for row in rows]
+
+    def size_counts(self):
+        """Return ``[(size, image count)]``, most frequent size first."""
+        rows = self.connection.execute(
+            "SELECT value, COUNT(*) FROM params WHERE kind = 'size' "
+            "GROUP BY value ORDER BY COUNT(*) DESC, value"
+        )
+        return [(value, count) for value, count in rows]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index selector values in PNGs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = commands.add_parser("index", help="Scan directories")
+    index_parser.add_argument("roots", nargs="+")
+    index_parser.add_argument("--db", required=True)
+    index_parser.add_argument("--workers", type=int, default=None)
+
+    query_parser = commands.add_parser("query", help="Find matching images")
+    query_parser.add_argument("--db", required=True)
+    query_parser.add_argument("--seed")
+    query_parser.add_argument("--sampler")
+    query_parser.add_argument("--scheduler")
+    query_parser.add_argument("--size", help="e.g. 1024x1024")
+
+    args = parser.parse_args(argv)
+    with MetadataIndex(args.db) as index:
+        if args.command == "index":
+            stats = index.update(args.roots, workers=args.workers)
+            print(
+                f"scanned={stats['scanned']} indexed={stats['indexed']} "
+                f"skipped={stats['skipped']} removed={stats['removed']}"
+            )
+        else:
+            for path in index.query(args.seed, args.sampler, args.scheduler, args.size):
+                print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""Named generation profiles for the GenerationProfile node.
+
+Profiles are kept in a dict keyed by name, so looking one up is O(1). They
+come from built-in defaults plus an optional JSON file, which is re-read
+whenever its modification time changes (a file that cannot be read or
+holds an invalid profile is logged and ignored)::
+
+    {
+        "my-profile": {
+            "sampler_name": "dpmpp_2m",
+            "scheduler": "karras",
+            "seed": 42,
+            "width": 1024,
+            "height": 1024,
+            "steps": 30,
+            "cfg": 7.0
+        }
+    }
+"""
+
+import json
+import logging
+import os
+import threading
+
+import comfy.samplers
+
+from nodes import MAX_RESOLUTION
+
+PROFILE_FIELDS = (
+    "sampler_name",
+    "scheduler",
+    "seed",
+    "width",
+    "height",
+    "steps",
+    "cfg",
+)
+
+DEFAULT_PROFILES = {
+    "sdxl-quality": {
+        "sampler_name": "dpmpp_2m",
+        "scheduler": "karras",
+        "seed": 0,
+        "width": 1024,
+        "height": 1024,
+        "steps": 30,
+        "cfg": 7.0,
+    },
+    "sdxl-fast": {
+        "sampler_name": "euler",
+        "scheduler": "normal",
+        "seed": 0,
+        "width": 1024,
+        "height": 1024,
+        "steps": 20,
+        "cfg": 6.0,
+    },
+    "flux-portrait": {
+        "sampler_name": "euler",
+        "scheduler": "simple",
+        "seed": 0,
+        "width": 832,
+        "height": 1216,
+        "steps": 20,
+        "cfg": 1.0,
+    },
+}
+
+DEFAULT_PROFILES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profiles.json"
+)
+
+
+def validate_profile(name, profile):
+    """Check a profile's fields and return a normalized copy."""
+    missing = [field for field in PROFILE_FIELDS if field not in profile]
+    if missing:
+        raise ValueError(f"Profile '{name}' is missing {', '.join(missing)}")
+    if profile["sampler_name"] not in comfy.samplers.KSampler.SAMPLERS:
+        raise ValueError(
+            f"Profile '{name}' has unknown sampler '{profile['sampler_name']}'"
+        )
+    if profile["scheduler"] not in comfy.samplers.KSampler.SCHEDULERS:
+        raise ValueError(
+            f"Profile '{name}' has unknown scheduler '{profile['scheduler']}'"
+        )
+    for field in ("width", "height"):
+        size = int(profile[field])
+        if size % 8 or not 64 <= size <= MAX_RESOLUTION:
+            raise ValueError(
+                f"Profile '{name}' {field} must be a multiple of 8 "
+                f"from 64 to {MAX_RESOLUTION}, got {size}"
+            )
+
+    normalized = {field: profile[field] for field in PROFILE_FIELDS}
+    for field in ("seed", "width", "height", "steps"):
+        normalized[field] = int(normalized[field])
+    normalized["cfg"] = float(normalized["cfg"])
+    return normalized
+
+
+class ProfileStore:
+    """Profiles indexed by name, reloaded when the backing file changes."""
+
+    def __init__(self, path=None, defaults=None):
+        self.path = path
+        self.defaults = DEFAULT_PROFILES if defaults is None else defaults
+        self._lock = threading.Lock()
+        self._profiles = {}
+        self._mtime = None
+        self._load()
+
+    def _file_mtime(self):
+        if self.path is None:
+            return None
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self):
+        profiles = {
+            name: validate_profile(name, profile)
+            for name, profile in self.defaults.items()
+        }
+        mtime = self._file_mtime()
+        if mtime is not None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as handle:
+                    loaded = {
+                        name: validate_profile(name, profile)
+                        for name, profile in json.load(handle).items()
+                    }
+            except (OSError, ValueError, TypeError, AttributeError) as error:
+                # INPUT_TYPES must not fail, or /object_info breaks for everyone
+                logging.warning(
+                    "[ComfyAssets Selectors] Ignoring invalid profile file %s: %s",
+                    self.path,
+                    error,
+                )
+            else:
+                profiles.update(loaded)
+        self._profiles = profiles
+        self._mtime = mtime
+
+    def refresh(self):
+        """Reload the profiles if the backing file changed."""
+        with self._lock:
+            if self._file_mtime() != self._mtime:
+                self._load()
+
+    @property
+    def version(self):
+        """Changes whenever the profile file does."""
+        return self._mtime
+
+    def names(self):
+        self.refresh()
+        return sorted(self._profiles)
+
+    def get(self, name):
+        self.refresh()
+        try:
+            return self._profiles[name]
+        except KeyError:
+            raise ValueError(f"Unknown generation profile: {name}") from None
+
+
+_store = None
+
+
+def get_profile_store():
+    """Return the shared profile store for this package."""
+    global _store
+    if _store is None:
+        path = os.environ.get("COMFYASSETS_PROFILES_PATH", DEFAULT_PROFILES_PATH)
+        _store = ProfileStore(path)
+    return _store
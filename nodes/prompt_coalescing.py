@@ -0,0 +1,286 @@
+"""Coalesce duplicate prompts that are already queued or running.
+
+A prompt's fingerprint is the SHA-256 of its canonical JSON after the
+``SamplerSelector``, ``SchedulerSelector``, ``SeedHistory`` and dimension
+nodes have been folded into their consumers, so cosmetic widget state (a
+preset versus the equal custom size, node titles) does not make two
+prompts differ. When a ``POST /prompt`` matches a prompt that is still in
+flight, it is answered with that prompt's id instead of being queued
+again, and the submitting client is added as a subscriber: every websocket
+message about the prompt is also sent to it.
+
+The table of in-flight prompts is bounded (oldest entries are dropped
+first, as are entries older than ``ttl`` seconds) and shared between the
+event loop and the prompt worker thread behind a lock.
+"""
+
+import asyncio
+import collections
+import hashlib
+import json
+import threading
+import time
+
+try:
+    from . import prompt_folding, prompt_resolution, server_hooks
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import prompt_folding
+    import prompt_resolution
+    import server_hooks
+
+FINGERPRINT_NODES = prompt_resolution.SELECTOR_NODES + ("SeedHistory",)
+
+# Websocket events that end a prompt's execution
+FINISH_EVENTS = ("execution_success", "execution_error", "execution_interrupted")
+
+
+class _SeedValue:
+    """``SeedHistory`` without the history side effect, for folding."""
+
+    FUNCTION = "output_seed"
+
+    def output_seed(self, seed):
+        return (seed,)
+
+
+def _fingerprint_classes():
+    node_classes = prompt_resolution.default_node_classes()
+    node_classes["SeedHistory"] = _SeedValue
+    return node_classes
+
+
+def prompt_fingerprint(prompt, partial_execution_targets=None, node_classes=None):
+    """Return the canonical fingerprint of an API-format prompt."""
+    if node_classes is None:
+        node_classes = _fingerprint_classes()
+
+    folded = prompt_folding.fold_prompt(prompt, FINGERPRINT_NODES, node_classes)
+    canonical = {
+        node_id: {key: value for key, value in node.items() if key != "_meta"}
+        for node_id, node in folded.items()
+    }
+    targets = sorted(partial_execution_targets) if partial_execution_targets else None
+    text = json.dumps(
+        {"prompt": canonical, "targets": targets},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class InFlightEntry:
+    def __init__(self, owner, created, waiter=None):
+        self.owner = owner
+        self.created = created
+        self.prompt_id = None
+        self.number = None
+        self.subscribers = set()
+        self.waiter = waiter
+
+
+class CoalescingTable:
+    """Bounded, thread-safe map of fingerprints of in-flight prompts."""
+
+    def __init__(self, max_entries=1024, ttl=3600.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = {"coalesced": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()  # fingerprint -> InFlightEntry
+        self._by_prompt = {}  # prompt id -> fingerprint
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _drop(self, fingerprint):
+        entry = self._entries.pop(fingerprint)
+        if entry.prompt_id is not None:
+            self._by_prompt.pop(entry.prompt_id, None)
+        if entry.waiter is not None and not entry.waiter.done():
+            entry.waiter.set_result(None)
+        return entry
+
+    def claim(self, fingerprint, owner, waiter=None):
+        """Return ``(entry, created)``; a new entry is owned by ``owner``."""
+        with self._lock:
+            now = self.clock()
+            entry = self._entries.get(fingerprint)
+            if entry is not None and now - entry.created > self.ttl:
+                self._drop(fingerprint)
+                entry = None
+            if entry is not None:
+                return entry, False
+
+            entry = InFlightEntry(owner, now, waiter)
+            self._entries[fingerprint] = entry
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+            return entry, True
+
+    def activate(self, fingerprint, prompt_id, number):
+        """Record the queued prompt id of a claimed fingerprint."""
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                return None
+            entry.prompt_id = prompt_id
+            entry.number = number
+            self._by_prompt[prompt_id] = fingerprint
+            if entry.waiter is not None and not entry.waiter.done():
+                entry.waiter.set_result(prompt_id)
+            return entry
+
+    def discard(self, fingerprint):
+        """Forget a fingerprint whose prompt was not queued."""
+        with self._lock:
+            if fingerprint in self._entries:
+                self._drop(fingerprint)
+
+    def subscribe(self, entry, client_id):
+        with self._lock:
+            self.stats["coalesced"] += 1
+            if client_id and client_id != entry.owner:
+                entry.subscribers.add(client_id)
+
+    def subscribers(self, prompt_id):
+        with self._lock:
+            fingerprint = self._by_prompt.get(prompt_id)
+            if fingerprint is None:
+                return ()
+            return tuple(self._entries[fingerprint].subscribers)
+
+    def finish(self, prompt_id):
+        """Forget a prompt that finished executing."""
+        with self._lock:
+            fingerprint = self._by_prompt.get(prompt_id)
+            if fingerprint is not None:
+                self._drop(fingerprint)
+
+
+def _is_finished(event, data):
+    if event in FINISH_EVENTS:
+        return True
+    return event == "executing" and data.get("node") is None
+
+
+def install_prompt_coalescing(prompt_server, table=None):
+    """Coalesce duplicate ``POST /prompt`` submissions on the server.
+
+    Needs the server's aiohttp app (before it starts) for the middleware,
+    wraps ``send_sync`` to forward messages to subscribers, and wraps the
+    queue's ``delete_queue_item`` and ``wipe_queue`` to forget deleted
+    prompts. Without a table, does nothing unless
+    ``COMFYASSETS_COALESCE_PROMPTS`` is set.
+    """
+    if table is None:
+        if not server_hooks.env_number("COMFYASSETS_COALESCE_PROMPTS", 0):
+            return None
+        table = CoalescingTable(
+            server_hooks.env_number("COMFYASSETS_COALESCE_MAX_ENTRIES", 1024),
+            server_hooks.env_number("COMFYASSETS_COALESCE_TTL", 3600.0, float),
+        )
+
+    from aiohttp import web
+
+    node_classes = _fingerprint_classes()
+
+    original_send_sync = prompt_server.send_sync
+
+    def send_sync(event, data, sid=None):
+        original_send_sync(event, data, sid)
+        if not isinstance(data, dict) or "prompt_id" not in data:
+            return
+        if sid is not None:
+            for subscriber in table.subscribers(data["prompt_id"]):
+                original_send_sync(event, data, subscriber)
+        if _is_finished(event, data):
+            table.finish(data["prompt_id"])
+
+    prompt_server.send_sync = send_sync
+
+    def wrap_queue(prompt_queue):
+        # Deleted pending prompts send no finish event; forget them here
+        def queued_ids():
+            with prompt_queue.mutex:
+                return {item[1] for item in prompt_queue.queue}
+
+        original_delete = prompt_queue.delete_queue_item
+        original_wipe = prompt_queue.wipe_queue
+
+        def delete_queue_item(function):
+            before = queued_ids()
+            result = original_delete(function)
+            for prompt_id in before - queued_ids():
+                table.finish(prompt_id)
+            return result
+
+        def wipe_queue():
+            before = queued_ids()
+            result = original_wipe()
+            for prompt_id in before:
+                table.finish(prompt_id)
+            return result
+
+        prompt_queue.delete_queue_item = delete_queue_item
+        prompt_queue.wipe_queue = wipe_queue
+
+    @web.middleware
+    async def coalesce(request, handler):
+        if request.method != "POST" or request.path not in server_hooks.PROMPT_PATHS:
+            return await handler(request)
+        try:
+            json_data = await server_hooks.prompt_json(request)
+            fingerprint = prompt_fingerprint(
+                json_data["prompt"],
+                json_data.get("partial_execution_targets"),
+                node_classes,
+            )
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return await handler(request)
+
+        client_id = json_data.get("client_id")
+        loop = asyncio.get_running_loop()
+        entry, created = table.claim(fingerprint, client_id, loop.create_future())
+        if not created:
+            if entry.prompt_id is None and entry.waiter is not None:
+                # An identical prompt is being validated right now
+                await asyncio.shield(entry.waiter)
+            if entry.prompt_id is not None:
+                table.subscribe(entry, client_id)
+                return web.json_response(
+                    {
+                        "prompt_id": entry.prompt_id,
+                        "number": entry.number,
+                        "node_errors": {},
+                        "coalesced": True,
+                    }
+                )
+            return await handler(request)
+
+        try:
+            response = await handler(request)
+        except BaseException:
+            table.discard(fingerprint)
+            raise
+        body = None
+        if response.status == 200 and getattr(response, "body", None) is not None:
+            try:
+                body = json.loads(response.body)
+            except (ValueError, TypeError):
+                body = None
+        if isinstance(body, dict) and body.get("prompt_id"):
+            table.activate(fingerprint, body["prompt_id"], body.get("number"))
+        else:
+            table.discard(fingerprint)
+        return response
+
+    try:
+        prompt_server.app.middlewares.append(coalesce)
+    except RuntimeError:  # the app is already running
+        prompt_server.send_sync = original_send_sync
+        return None
+    server_hooks.when_queue_ready(prompt_server, wrap_queue)
+    return table
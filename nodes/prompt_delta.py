@@ -0,0 +1,238 @@
+"""Resubmit a queued prompt with a small patch of selector values.
+
+``POST /comfyassets/prompt_delta`` takes the id of a previously queued
+prompt and new values for its selector nodes::
+
+    {
+        "prompt_id": "...",
+        "client_id": "...",
+        "patch": {"seed": 1234, "sampler_name": "dpmpp_2m", "preset": "832x1216"}
+    }
+
+Every queued prompt is kept in a bounded cache (least recently queued
+dropped first, entries expire after ``ttl`` seconds) together with the user
+who queued it; only that user may patch it. The patch is applied to a copy
+of the cached prompt that shares every unpatched node, the patched values
+are checked against the selector nodes' own input lists and ranges, and the
+result is queued like ``POST /prompt`` (on-prompt handlers, validation), so
+the rest of the graph is never re-sent. The new prompt belongs to the
+``client_id`` of the delta request, not to the one of the cached prompt.
+
+The prompt is cached as submitted, before later on-prompt handlers (e.g.
+prompt folding, which removes the selector nodes) rewrite it, so the hook
+must be installed before them.
+"""
+
+import collections
+import logging
+import threading
+import time
+
+try:
+    from . import prompt_resolution, prompt_sweep, server_hooks
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import prompt_resolution
+    import prompt_sweep
+    import server_hooks
+
+# patch key -> [(class_type, input name)] it overrides
+PATCH_FIELDS = {
+    "seed": [("SeedHistory", "seed")],
+    "sampler_name": [("SamplerSelector", "sampler_name")],
+    "scheduler": [("SchedulerSelector", "scheduler")],
+    "preset": [("WidthHeightNode", "preset")],
+    "width": [("WidthHeightNode", "width"), ("WidthNode", "width")],
+    "height": [("WidthHeightNode", "height"), ("HeightNode", "height")],
+    "swap_dimensions": [("WidthHeightNode", "swap_dimensions")],
+}
+
+# extra_data key carrying the prompt as submitted to the queue wrapper
+SUBMITTED_PROMPT_KEY = "comfyassets_submitted_prompt"
+
+
+class PromptCache:
+    """Bounded, expiring map of prompt id to ``(prompt, owner)``."""
+
+    def __init__(self, max_entries=256, ttl=3600.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, prompt_id, prompt, owner):
+        with self._lock:
+            self._entries[prompt_id] = (self.clock(), prompt, owner)
+            self._entries.move_to_end(prompt_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, prompt_id):
+        """Return ``(prompt, owner)`` or None if unknown or expired."""
+        with self._lock:
+            entry = self._entries.get(prompt_id)
+            if entry is None:
+                return None
+            if self.clock() - entry[0] > self.ttl:
+                del self._entries[prompt_id]
+                return None
+            return entry[1:]
+
+
+def _allowed_values(node_classes, class_type, input_name):
+    spec = node_classes[class_type].INPUT_TYPES()
+    for section in ("required", "optional"):
+        if input_name in spec.get(section, {}):
+            return spec[section][input_name]
+    return None
+
+
+def _check_value(key, value, spec):
+    kind = spec[0]
+    options = spec[1] if len(spec) > 1 else {}
+    if isinstance(kind, (list, tuple)):
+        if value not in kind:
+            raise ValueError(f"'{value}' is not a valid {key}")
+    elif kind == "INT":
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(f"{key} must be an integer")
+        if not options.get("min", value) <= value <= options.get("max", value):
+            raise ValueError(f"{key} {value} is out of range")
+    elif kind == "BOOLEAN" and not isinstance(value, bool):
+        raise ValueError(f"{key} must be true or false")
+
+
+def apply_patch(prompt, patch, node_classes=None):
+    """Return a copy of ``prompt`` with ``patch`` applied.
+
+    Only the patched nodes are copied; all other nodes are shared with
+    ``prompt``. Values are validated against the nodes' input definitions.
+    """
+    if node_classes is None:
+        node_classes = prompt_resolution.default_node_classes()
+    if not isinstance(patch, dict) or not patch:
+        raise ValueError("patch must be a non-empty object")
+    unknown = set(patch) - set(PATCH_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown patch keys: {', '.join(sorted(unknown))}")
+
+    patched = dict(prompt)
+    copied = set()
+    for key, value in patch.items():
+        matched = False
+        for class_type, input_name in PATCH_FIELDS[key]:
+            spec = _allowed_values(node_classes, class_type, input_name)
+            for node_id, node in prompt.items():
+                if node.get("class_type") != class_type:
+                    continue
+                _check_value(key, value, spec)
+                if node_id not in copied:
+                    patched[node_id] = dict(node, inputs=dict(node.get("inputs", {})))
+                    copied.add(node_id)
+                patched[node_id]["inputs"][input_name] = value
+                if key in ("width", "height") and class_type == "WidthHeightNode":
+                    patched[node_id]["inputs"]["preset"] = patch.get("preset", "custom")
+                matched = True
+        if not matched:
+            classes = " or ".join(class_type for class_type, _ in PATCH_FIELDS[key])
+            raise ValueError(f"Patching '{key}' needs a {classes} node in the prompt")
+    return patched
+
+
+def install_prompt_delta(prompt_server, cache=None, make_submitter=None):
+    """Cache queued prompts and register ``POST /comfyassets/prompt_delta``.
+
+    Install before other on-prompt handlers that rewrite prompts, such as
+    prompt folding. Without a cache, does nothing unless
+    ``COMFYASSETS_PROMPT_DELTA`` is set.
+    """
+    if cache is None:
+        if not server_hooks.env_number("COMFYASSETS_PROMPT_DELTA", 0):
+            return None
+        cache = PromptCache(
+            server_hooks.env_number("COMFYASSETS_PROMPT_DELTA_CACHE", 256),
+            server_hooks.env_number("COMFYASSETS_PROMPT_DELTA_TTL", 3600.0, float),
+        )
+
+    from aiohttp import web
+
+    if make_submitter is None:
+        make_submitter = prompt_sweep.make_queue_submitter
+
+    node_classes = prompt_resolution.default_node_classes()
+
+    def on_prompt(json_data):
+        # Runs before folding; the queue wrapper below takes it back out
+        prompt = json_data.get("prompt")
+        extra_data = json_data.setdefault("extra_data", {})
+        if isinstance(prompt, dict) and isinstance(extra_data, dict):
+            extra_data[SUBMITTED_PROMPT_KEY] = prompt
+        return json_data
+
+    prompt_server.add_on_prompt_handler(on_prompt)
+
+    def wrap_put(prompt_queue):
+        original_put = prompt_queue.put
+
+        def put(item):
+            submitted = item[2]
+            if isinstance(item[3], dict) and SUBMITTED_PROMPT_KEY in item[3]:
+                extra_data = dict(item[3])
+                submitted = extra_data.pop(SUBMITTED_PROMPT_KEY)
+                item = item[:3] + (extra_data,) + item[4:]
+            # Called from the request queueing the prompt
+            cache.put(item[1], submitted, server_hooks.current_requester())
+            return original_put(item)
+
+        prompt_queue.put = put
+
+    server_hooks.when_queue_ready(prompt_server, wrap_put)
+
+    if not server_hooks.install_requester_middleware(prompt_server):
+        logging.warning(
+            "[ComfyAssets Selectors] Prompt delta cannot identify users; "
+            "cached prompts cannot be patched"
+        )
+
+    @prompt_server.routes.post("/comfyassets/prompt_delta")
+    async def prompt_delta(request):
+        try:
+            data = await request.json()
+            source_id = data["prompt_id"]
+            patch = data["patch"]
+        except (ValueError, KeyError, TypeError):
+            return web.json_response(
+                {"error": "expected {'prompt_id': ..., 'patch': {...}}"}, status=400
+            )
+
+        cached = cache.get(source_id)
+        if cached is None:
+            return web.json_response(
+                {"error": f"Prompt {source_id} is not cached (expired or unknown)"},
+                status=404,
+            )
+        prompt, owner = cached
+        user = server_hooks.request_user(request, prompt_server)
+        if user is None or user != owner:
+            return web.json_response(
+                {"error": f"Prompt {source_id} was queued by another user"},
+                status=403,
+            )
+        try:
+            prompt = apply_patch(prompt, patch, node_classes)
+        except ValueError as error:
+            return web.json_response({"error": str(error)}, status=400)
+
+        submit = make_submitter(prompt_server, data.get("client_id"))
+        try:
+            prompt_id = await submit(prompt)
+        except prompt_sweep.AdmissionRejected as error:
+            return web.json_response({"error": str(error)}, status=429)
+        except ValueError as error:  # invalid prompt
+            return web.json_response({"error": str(error)}, status=400)
+        return web.json_response({"prompt_id": prompt_id, "node_errors": {}})
+
+    return cache
@@ -0,0 +1,163 @@
+"""Constant-fold selector nodes out of API-format prompts.
+
+``SamplerSelector``, ``SchedulerSelector``, ``WidthNode``, ``HeightNode``
+and ``WidthHeightNode`` are pure functions of their widget values. Folding
+evaluates them with their own logic (presets, swaps, snapping), writes the
+results straight into the inputs of the nodes that consume them and drops
+the folded nodes, so the executor has fewer nodes to validate and run. The
+workflow (UI graph) is untouched, so the original graph stays editable.
+
+Queue hooks that look at the dimension or selector nodes (shape bucketing,
+sampled profiling) find what folding removed in the queued prompt's
+``extra_data[FOLDED_KEY]``: the sizes the prompt resolved to and the class
+types of the folded nodes.
+
+Run as a script with ComfyUI on ``PYTHONPATH``::
+
+    python nodes/prompt_folding.py prompt.json -o folded.json
+"""
+
+import argparse
+import copy
+import json
+import sys
+
+try:
+    from . import prompt_resolution
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import prompt_resolution
+
+FOLDED_KEY = "comfyassets_folded"
+
+
+def fold_prompt(
+    prompt, class_types=prompt_resolution.SELECTOR_NODES, node_classes=None
+):
+    """Return a copy of ``prompt`` with foldable selector nodes inlined.
+
+    Nodes whose inputs are links to other foldable nodes are folded once
+    those have been resolved. Nodes that cannot be evaluated are kept.
+    """
+    if node_classes is None:
+        node_classes = prompt_resolution.default_node_classes()
+
+    result = copy.deepcopy(prompt)
+
+    # consumers[source_id] -> [(consumer_inputs, input_name, output_index)]
+    consumers = {}
+    for node in result.values():
+        inputs = node.get("inputs", {})
+        for name, value in inputs.items():
+            if prompt_resolution.is_link(value):
+                consumers.setdefault(value[0], []).append((inputs, name, value[1]))
+
+    pending = [
+        node_id
+        for node_id, node in result.items()
+        if node.get("class_type") in class_types
+    ]
+    folded = set()
+    progress = True
+    while progress:
+        progress = False
+        for node_id in pending:
+            if node_id in folded:
+                continue
+            outputs = prompt_resolution.evaluate_node(result[node_id], node_classes)
+            if outputs is None:
+                continue
+            links = consumers.get(node_id, [])
+            if any(index >= len(outputs) for _, _, index in links):
+                continue
+            for inputs, name, index in links:
+                inputs[name] = outputs[index]
+            folded.add(node_id)
+            progress = True
+
+    for node_id in folded:
+        del result[node_id]
+    return result
+
+
+def folding_record(prompt, folded, node_classes=None):
+    """Describe what folding ``prompt`` into ``folded`` removed.
+
+    Returns ``{"shapes": [[width, height], ...] or None, "class_types":
+    [...]}`` with the sizes ``prompt`` resolves to and the class types of
+    the nodes missing from ``folded``.
+    """
+    shapes = prompt_resolution.resolve_dimensions(prompt, node_classes)
+    return {
+        "shapes": [list(shape) for shape in shapes] if shapes else None,
+        "class_types": sorted(
+            {prompt[node_id].get("class_type") for node_id in prompt}
+            - {folded[node_id].get("class_type") for node_id in folded}
+            - {None}
+        ),
+    }
+
+
+def recorded_folding(extra_data):
+    """Return the :func:`folding_record` kept in ``extra_data``, or None."""
+    if not isinstance(extra_data, dict):
+        return None
+    record = extra_data.get(FOLDED_KEY)
+    return record if isinstance(record, dict) else None
+
+
+def install_prompt_folding(prompt_server, node_classes=None):
+    """Fold selector nodes in every prompt submitted to the server.
+
+    What the folding removed is recorded in the prompt's ``extra_data``
+    (see :func:`folding_record`) for the queue hooks.
+    """
+
+    def on_prompt(json_data):
+        prompt = json_data.get("prompt")
+        if isinstance(prompt, dict):
+            folded = fold_prompt(prompt, node_classes=node_classes)
+            extra_data = json_data.setdefault("extra_data", {})
+            if isinstance(extra_data, dict):
+                extra_data[FOLDED_KEY] = folding_record(prompt, folded, node_classes)
+            json_data["prompt"] = folded
+        return json_data
+
+    prompt_server.add_on_prompt_handler(on_prompt)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Fold selector nodes into their consumers in a prompt."
+    )
+    parser.add_argument("input", help="API-format prompt JSON ('-' for stdin)")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.input == "-":
+        data = json.load(sys.stdin)
+    else:
+        with open(args.input, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+
+    # Accept both a bare prompt and a /prompt request body
+    if isinstance(data.get("prompt"), dict):
+        before = len(data["prompt"])
+        data["prompt"] = fold_prompt(data["prompt"])
+        after = len(data["prompt"])
+    else:
+        before = len(data)
+        data = fold_prompt(data)
+        after = len(data)
+
+    text = json.dumps(data, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+    print(f"Folded {before - after} of {before} nodes", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
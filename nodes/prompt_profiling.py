@@ -0,0 +1,226 @@
+"""Sampled ``cProfile`` capture of prompt executions.
+
+A configurable fraction of the prompts that contain this package's nodes
+are run under ``cProfile``. The profile covers the whole execution in
+ComfyUI's prompt worker thread, from the moment the prompt leaves the
+queue until it is marked done. Each profile is written to a ``.pstats``
+file (only the newest ``keep`` files are kept) and merged into an
+aggregated summary of the hottest functions.
+
+Unsampled prompts only pay for a scan of their class types and one random
+number.
+"""
+
+import cProfile
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+
+try:
+    from . import prompt_folding, server_hooks
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import prompt_folding
+    import server_hooks
+
+DEFAULT_PROFILE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profiles"
+)
+DEFAULT_KEEP = 50
+SORT_KEYS = ("tottime", "cumtime", "calls")
+
+
+class PromptProfiler:
+    """Decide which prompts to profile and collect their results."""
+
+    def __init__(
+        self, directory, class_types, fraction=0.0, keep=DEFAULT_KEEP, rng=None
+    ):
+        self.directory = directory
+        self.class_types = frozenset(class_types)
+        self.fraction = fraction
+        self.keep = keep
+        self.profiled = 0
+        self._random = rng or random.random
+        self._lock = threading.Lock()
+        self._aggregate = None
+        self._active = {}  # thread id -> (prompt_id, profile)
+
+    def should_profile(self, prompt, extra_data=None):
+        """Sample prompts with this package's nodes, counting folded ones."""
+        if self.fraction <= 0 or not isinstance(prompt, dict):
+            return False
+        record = prompt_folding.recorded_folding(extra_data) or {}
+        if self.class_types.isdisjoint(record.get("class_types", ())) and not any(
+            isinstance(node, dict) and node.get("class_type") in self.class_types
+            for node in prompt.values()
+        ):
+            return False
+        return self._random() < self.fraction
+
+    def start(self, prompt_id):
+        """Start profiling the current thread for ``prompt_id``."""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # another profiler is already active
+            return False
+        self._active[threading.get_ident()] = (prompt_id, profile)
+        return True
+
+    def stop(self):
+        """Stop profiling the current thread; returns the profile, if any."""
+        entry = self._active.pop(threading.get_ident(), None)
+        if entry is None:
+            return None
+        prompt_id, profile = entry
+        profile.disable()
+        return prompt_id, profile
+
+    def record(self, prompt_id, profile):
+        """Write ``profile`` to disk and merge it into the summary."""
+        os.makedirs(self.directory, exist_ok=True)
+        safe_id = re.sub(r"[^A-Za-z0-9_-]", "_", str(prompt_id))[:64]
+        # Millisecond timestamps keep names in capture order for rotation
+        name = f"{int(time.time() * 1000):013d}-{safe_id}.pstats"
+        profile.dump_stats(os.path.join(self.directory, name))
+
+        with self._lock:
+            stats = pstats.Stats(profile)
+            if self._aggregate is None:
+                self._aggregate = stats
+            else:
+                self._aggregate.add(stats)
+            self.profiled += 1
+        self._rotate()
+        return name
+
+    def files(self):
+        """``.pstats`` files on disk, oldest first."""
+        try:
+            names = [n for n in os.listdir(self.directory) if n.endswith(".pstats")]
+        except FileNotFoundError:
+            return []
+        return sorted(names)
+
+    def _rotate(self):
+        names = self.files()
+        for name in names[: max(0, len(names) - self.keep)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def summary(self, limit=30, sort="tottime"):
+        """The hottest functions across every profile taken so far."""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+        with self._lock:
+            rows = []
+            if self._aggregate is not None:
+                for (path, line, name), entry in self._aggregate.stats.items():
+                    primitive, calls, tottime, cumtime = entry[:4]
+                    rows.append(
+                        {
+                            "function": f"{path}:{line}({name})",
+                            "calls": calls,
+                            "primitive_calls": primitive,
+                            "tottime": tottime,
+                            "cumtime": cumtime,
+                        }
+                    )
+        rows.sort(key=lambda row: row[sort], reverse=True)
+        return {
+            "fraction": self.fraction,
+            "profiled": self.profiled,
+            "files": self.files(),
+            "functions": rows[:limit],
+        }
+
+
+def install_prompt_profiling(prompt_queue, profiler):
+    """Wrap ``prompt_queue.get``/``task_done`` to profile sampled prompts.
+
+    Both are called from the prompt worker thread, so the profile spans the
+    execution of the prompt in between.
+    """
+    original_get = prompt_queue.get
+    original_task_done = prompt_queue.task_done
+
+    def get(*args, **kwargs):
+        result = original_get(*args, **kwargs)
+        if result is not None:
+            item = result[0]
+            if profiler.should_profile(item[2], item[3] if len(item) > 3 else None):
+                profiler.start(item[1])
+        return result
+
+    def task_done(*args, **kwargs):
+        finished = profiler.stop()
+        try:
+            return original_task_done(*args, **kwargs)
+        finally:
+            if finished is not None:
+                try:
+                    profiler.record(*finished)
+                except OSError as error:
+                    logging.warning(
+                        "[ComfyAssets Selectors] Could not save profile: %s", error
+                    )
+
+    prompt_queue.get = get
+    prompt_queue.task_done = task_done
+    return prompt_queue
+
+
+def install_profile_routes(prompt_server, profiler):
+    """Serve ``GET /comfyassets/profiles`` and sampling control via ``POST``."""
+    from aiohttp import web
+
+    @prompt_server.routes.get("/comfyassets/profiles")
+    async def get_profiles(request):
+        try:
+            limit = int(request.query.get("limit", 30))
+            summary = profiler.summary(limit, request.query.get("sort", "tottime"))
+        except ValueError as error:
+            return web.json_response({"error": str(error)}, status=400)
+        return web.json_response(summary)
+
+    @prompt_server.routes.post("/comfyassets/profiles")
+    async def set_fraction(request):
+        try:
+            fraction = float((await request.json())["fraction"])
+        except (ValueError, KeyError, TypeError):
+            return web.json_response(
+                {"error": "expected {'fraction': 0..1}"}, status=400
+            )
+        profiler.fraction = min(1.0, max(0.0, fraction))
+        return web.json_response({"fraction": profiler.fraction})
+
+
+def install_from_env(prompt_server, class_types):
+    """Enable sampled profiling from ``COMFYASSETS_PROFILE_*`` settings.
+
+    ``COMFYASSETS_PROFILE_FRACTION`` starts sampling right away;
+    ``COMFYASSETS_PROFILE_ROUTE=1`` alone installs the hook with sampling
+    off, to be switched on through the route.
+    """
+    fraction = server_hooks.env_number("COMFYASSETS_PROFILE_FRACTION", 0.0, float)
+    if fraction <= 0 and not server_hooks.env_number("COMFYASSETS_PROFILE_ROUTE", 0):
+        return None
+
+    profiler = PromptProfiler(
+        os.environ.get("COMFYASSETS_PROFILE_DIR", DEFAULT_PROFILE_DIR),
+        class_types,
+        min(1.0, max(0.0, fraction)),
+        server_hooks.env_number("COMFYASSETS_PROFILE_KEEP", DEFAULT_KEEP),
+    )
+    server_hooks.when_queue_ready(
+        prompt_server,
+        lambda queue: install_prompt_profiling(queue, profiler),
+    )
+    install_profile_routes(prompt_server, profiler)
+    return profiler
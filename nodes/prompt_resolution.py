@@ -0,0 +1,134 @@
+"""Resolve this package's selector nodes inside API-format prompts.
+
+API-format prompts map node ids to ``{"class_type": ..., "inputs": {...}}``.
+Inputs are either literal widget values or links of the form
+``[source_node_id, output_index]``. The selector nodes are pure functions of
+their widget values, so whenever all of a node's inputs are literals its
+outputs can be computed up front with the node's own logic.
+"""
+
+SELECTOR_NODES = (
+    "SamplerSelector",
+    "SchedulerSelector",
+    "WidthNode",
+    "HeightNode",
+    "WidthHeightNode",
+)
+
+DIMENSION_NODES = ("WidthNode", "HeightNode", "WidthHeightNode", "WidthHeightLatent")
+
+# Functions used instead of FUNCTION for nodes whose outputs include tensors:
+# they resolve the other outputs and return None for the tensors
+SIZE_FUNCTIONS = {"WidthHeightLatent": "get_size"}
+
+
+def default_node_classes():
+    """Return this package's node classes keyed by class type."""
+    try:
+        from .height_node import HeightNode
+        from .random_value_tracker import SeedHistory
+        from .sampler_selector import SamplerSelector
+        from .scheduler_selector import SchedulerSelector
+        from .width_height_latent_node import WidthHeightLatent
+        from .width_height_node import WidthHeightNode
+        from .width_node import WidthNode
+    except ImportError:  # loaded as a top-level module (tests, CLI)
+        from height_node import HeightNode
+        from random_value_tracker import SeedHistory
+        from sampler_selector import SamplerSelector
+        from scheduler_selector import SchedulerSelector
+        from width_height_latent_node import WidthHeightLatent
+        from width_height_node import WidthHeightNode
+        from width_node import WidthNode
+
+    return {
+        "SamplerSelector": SamplerSelector,
+        "SchedulerSelector": SchedulerSelector,
+        "SeedHistory": SeedHistory,
+        "WidthNode": WidthNode,
+        "HeightNode": HeightNode,
+        "WidthHeightNode": WidthHeightNode,
+        "WidthHeightLatent": WidthHeightLatent,
+    }
+
+
+def is_link(value):
+    """Return True if an input value is a link to another node's output."""
+    return (
+        isinstance(value, list)
+        and len(value) == 2
+        and isinstance(value[0], str)
+        and isinstance(value[1], int)
+    )
+
+
+def literal_inputs(node):
+    """Return a node's inputs if none of them are links, else None."""
+    inputs = node.get("inputs", {})
+    if any(is_link(value) for value in inputs.values()):
+        return None
+    return inputs
+
+
+def evaluate_node(node, node_classes=None):
+    """Run a node's own function on its literal inputs.
+
+    Returns the output tuple, or None if the node is unknown, has linked
+    inputs or rejects its widget values. Nodes in ``SIZE_FUNCTIONS`` run
+    their size-only function instead, so no tensors are allocated.
+    """
+    if node_classes is None:
+        node_classes = default_node_classes()
+
+    class_type = node.get("class_type")
+    node_class = node_classes.get(class_type)
+    inputs = literal_inputs(node)
+    if node_class is None or inputs is None:
+        return None
+
+    function = SIZE_FUNCTIONS.get(class_type, node_class.FUNCTION)
+    try:
+        result = getattr(node_class(), function)(**inputs)
+    except (TypeError, ValueError, KeyError):
+        return None
+
+    if isinstance(result, dict):
+        result = result["result"]
+    return tuple(result)
+
+
+def resolve_dimensions(prompt, node_classes=None):
+    """Return the sorted (width, height) pairs produced by a prompt.
+
+    ``WidthHeightNode`` and ``WidthHeightLatent`` outputs are used directly
+    (without allocating the latent); ``WidthNode`` and
+    ``HeightNode`` outputs are paired up in node id order. Returns None when
+    the prompt has no resolvable dimension nodes.
+    """
+    if node_classes is None:
+        node_classes = default_node_classes()
+
+    pairs = []
+    widths = []
+    heights = []
+    for node_id in sorted(prompt, key=str):
+        node = prompt[node_id]
+        class_type = node.get("class_type")
+        if class_type not in DIMENSION_NODES:
+            continue
+        outputs = evaluate_node(node, node_classes)
+        if outputs is None:
+            continue
+        if class_type == "WidthHeightNode":
+            pairs.append(outputs)
+        elif class_type == "WidthHeightLatent":
+            pairs.append(outputs[1:])
+        elif class_type == "WidthNode":
+            widths.append(outputs[0])
+        else:
+            heights.append(outputs[0])
+
+    pairs.extend(zip(widths, heights))
+    if not pairs:
+        return None
+    return tuple(sorted(set(pairs)))
@@ -0,0 +1,255 @@
+"""Expand one prompt into a parameter sweep on the server.
+
+``POST /comfyassets/sweep`` takes an API-format prompt plus a sweep spec
+over the selector nodes' inputs::
+
+    {
+        "prompt": {...},
+        "client_id": "...",
+        "sweep": {
+            "samplers": ["euler", "dpmpp_2m"],
+            "schedulers": ["normal", "karras"],
+            "presets": ["1024x1024", "832x1216"],
+            "seeds": {"start": 1, "count": 50}
+        }
+    }
+
+Every combination is generated lazily and enqueued with bounded
+concurrency; submission pauses while the prompt queue is deeper than
+``max_queue_depth``. Progress streams back as newline-delimited JSON, one
+line per queued prompt plus a final summary.
+"""
+
+import asyncio
+import copy
+import inspect
+import json
+import uuid
+
+# sweep key -> (class_type, input name) it overrides
+SWEEP_AXES = {
+    "samplers": ("SamplerSelector", "sampler_name"),
+    "schedulers": ("SchedulerSelector", "scheduler"),
+    "presets": ("WidthHeightNode", "preset"),
+    "seeds": ("SeedHistory", "seed"),
+}
+
+
+class AdmissionRejected(ValueError):
+    """A prompt was refused by an on_prompt handler (admission control)."""
+
+
+def _axis_values(key, values):
+    if key == "seeds" and isinstance(values, dict):
+        start = int(values.get("start", 0))
+        count = int(values["count"])
+        step = int(values.get("step", 1))
+        return range(start, start + count * step, step)
+    if not isinstance(values, list) or not values:
+        raise ValueError(f"sweep '{key}' must be a non-empty list")
+    return values
+
+
+def sweep_axes(prompt, sweep):
+    """Return ``[(key, [(node_id, input_name)], values)]`` for a sweep spec."""
+    unknown = set(sweep) - set(SWEEP_AXES)
+    if unknown:
+        raise ValueError(f"Unknown sweep keys: {', '.join(sorted(unknown))}")
+
+    axes = []
+    for key, (class_type, input_name) in SWEEP_AXES.items():
+        if key not in sweep:
+            continue
+        targets = [
+            (node_id, input_name)
+            for node_id, node in prompt.items()
+            if node.get("class_type") == class_type
+        ]
+        if not targets:
+            raise ValueError(f"Sweeping '{key}' needs a {class_type} node")
+        axes.append((key, targets, _axis_values(key, sweep[key])))
+    if not axes:
+        raise ValueError("Sweep spec is empty")
+    return axes
+
+
+def sweep_size(axes):
+    size = 1
+    for _, _, values in axes:
+        size *= len(values)
+    return size
+
+
+def expand_sweep(prompt, axes):
+    """Lazily yield ``(index, values, prompt)`` for every combination.
+
+    Combinations follow ``itertools.product`` order (last axis fastest) but
+    are decoded from the index, so even seed ranges of billions stay lazy.
+    """
+    for index in range(sweep_size(axes)):
+        expanded = copy.deepcopy(prompt)
+        values = {}
+        remainder = index
+        for key, targets, axis_values in reversed(axes):
+            remainder, position = divmod(remainder, len(axis_values))
+            value = axis_values[position]
+            values[key] = value
+            for node_id, input_name in targets:
+                expanded[node_id]["inputs"][input_name] = value
+        yield index, values, expanded
+
+
+async def _submit_one(submit, index, values, prompt):
+    try:
+        prompt_id = await submit(prompt)
+    except ValueError as error:
+        return {"index": index, "values": values, "error": str(error)}
+    return {"index": index, "values": values, "prompt_id": prompt_id}
+
+
+async def run_sweep(
+    items,
+    submit,
+    queue_depth,
+    max_queue_depth=32,
+    concurrency=4,
+    poll_interval=0.25,
+):
+    """Submit ``items`` and yield one progress event per prompt.
+
+    At most ``concurrency`` submissions run at once, and no new prompt is
+    started while ``queue_depth()`` plus in-flight submissions would reach
+    ``max_queue_depth``. ``items`` is only advanced when a slot is free, so
+    huge sweeps are never materialized.
+    """
+    pending = set()
+
+    async def wait_one():
+        done, rest = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        pending.intersection_update(rest)
+        return [task.result() for task in done]
+
+    try:
+        for index, values, prompt in items:
+            while (
+                len(pending) >= concurrency
+                or queue_depth() + len(pending) >= max_queue_depth
+            ):
+                if pending:
+                    for event in await wait_one():
+                        yield event
+                else:
+                    await asyncio.sleep(poll_interval)
+            pending.add(
+                asyncio.ensure_future(_submit_one(submit, index, values, prompt))
+            )
+        while pending:
+            for event in await wait_one():
+                yield event
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def make_queue_submitter(prompt_server, client_id=None):
+    """Return an async ``submit(prompt)`` that queues like ``POST /prompt``."""
+    import execution
+
+    parameters = inspect.signature(execution.validate_prompt).parameters
+
+    async def submit(prompt):
+        json_data = {"prompt": prompt}
+        if client_id:
+            json_data["client_id"] = client_id
+        # Let other on_prompt handlers (e.g. prompt folding) see the prompt
+        json_data = prompt_server.trigger_on_prompt(json_data)
+        if "prompt" not in json_data:  # refused by admission control
+            reason = json_data.get("admission", {}).get("reason", "rejected")
+            raise AdmissionRejected(reason)
+        prompt = json_data["prompt"]
+
+        prompt_id = str(uuid.uuid4())
+        if len(parameters) >= 3:
+            valid = execution.validate_prompt(prompt_id, prompt, None)
+        elif len(parameters) == 2:
+            valid = execution.validate_prompt(prompt_id, prompt)
+        else:
+            valid = execution.validate_prompt(prompt)
+        if inspect.isawaitable(valid):
+            valid = await valid
+        if not valid[0]:
+            error = valid[1]
+            if isinstance(error, dict):
+                error = error.get("message", error)
+            raise ValueError(str(error))
+
+        if "number" in json_data:  # e.g. deprioritized by admission control
+            number = float(json_data["number"])
+        else:
+            number = prompt_server.number
+            prompt_server.number += 1
+        # Like /prompt, queue the extra_data left by the on_prompt handlers
+        extra_data = dict(json_data.get("extra_data") or {})
+        if client_id:
+            extra_data["client_id"] = client_id
+        item = (number, prompt_id, prompt, extra_data, valid[2])
+        if hasattr(execution, "SENSITIVE_EXTRA_DATA_KEYS"):
+            item += ({},)
+        prompt_server.prompt_queue.put(item)
+        return prompt_id
+
+    return submit
+
+
+def install_sweep_route(
+    prompt_server, max_queue_depth=32, concurrency=4, make_submitter=None
+):
+    """Register ``POST /comfyassets/sweep`` on the server."""
+    from aiohttp import web
+
+    if make_submitter is None:
+        make_submitter = make_queue_submitter
+
+    def queue_depth():
+        return prompt_server.prompt_queue.get_tasks_remaining()
+
+    @prompt_server.routes.post("/comfyassets/sweep")
+    async def sweep(request):
+        try:
+            data = await request.json()
+            prompt = data["prompt"]
+            axes = sweep_axes(prompt, data["sweep"])
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            return web.json_response({"error": f"Invalid sweep: {error}"}, status=400)
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+
+        async def send(event):
+            await response.write((json.dumps(event) + "\n").encode("utf-8"))
+
+        total = sweep_size(axes)
+        await send({"total": total})
+        queued = errors = 0
+        events = run_sweep(
+            expand_sweep(prompt, axes),
+            make_submitter(prompt_server, data.get("client_id")),
+            queue_depth,
+            max_queue_depth,
+            concurrency,
+        )
+        try:
+            async for event in events:
+                if "error" in event:
+                    errors += 1
+                else:
+                    queued += 1
+                event["done"] = queued + errors
+                event["total"] = total
+                await send(event)
+        finally:
+            # Stop expanding (and cancel submissions) if the client went away
+            await events.aclose()
+        await send({"finished": True, "queued": queued, "errors": errors})
+        await response.write_eof()
+        return response
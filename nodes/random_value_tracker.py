@@ -1,3 +1,9 @@
+try:
+    from . import seed_history_store
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import seed_history_store
+
+
 class SeedHistory:
     """A seed node with history tracking capabilities."""
 
@@ -24,4 +30,9 @@ class SeedHistory:
 
     def output_seed(self, seed):
         """Output the seed value for use in other nodes."""
+        # Server-side history is opt-in (COMFYASSETS_SEED_HISTORY_DIR)
+        store = seed_history_store.get_seed_history_store()
+        namespace = seed_history_store.current_namespace()
+        if store is not None and namespace is not None:
+            store.append(namespace, seed)
         return (seed,)
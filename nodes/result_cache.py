@@ -0,0 +1,148 @@
+"""Content-addressed on-disk cache for generation results.
+
+Keys are SHA-256 hashes of the resolved selector parameters plus declared
+extra keys (model, prompt text, ...). Values are opaque bytes stored under
+``<root>/<key[:2]>/<key>.bin``; an SQLite index in the same directory tracks
+their sizes and last access so the cache survives restarts and is evicted
+least-recently-used first once it grows past ``max_bytes``.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+try:
+    from . import server_hooks
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import server_hooks
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "result_cache"
+)
+DEFAULT_MAX_GB = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+"""
+
+
+def cache_key(params, extra=None):
+    """Hash selector parameters and extra keys into a stable hex digest."""
+    payload = {"params": params, "extra": extra or {}}
+    text = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Size-bounded LRU store of byte blobs keyed by content hash."""
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            os.path.join(root, "index.sqlite"), check_same_thread=False
+        )
+        self.connection.executescript(SCHEMA)
+
+    def path_for(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.bin")
+
+    def _forget(self, key):
+        self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def contains(self, key):
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None and os.path.exists(self.path_for(key))
+
+    def get(self, key):
+        """Return the cached bytes for ``key`` or None, marking it used."""
+        with self._lock:
+            try:
+                with open(self.path_for(key), "rb") as handle:
+                    data = handle.read()
+            except OSError:
+                with self.connection:
+                    self._forget(key)
+                return None
+            with self.connection:
+                self.connection.execute(
+                    "UPDATE entries SET last_access = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+            return data
+
+    def put(self, key, data):
+        """Store ``data`` under ``key`` and evict old entries if needed."""
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see partial data
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+                (key, len(data), time.time()),
+            )
+            self._evict()
+
+    def total_bytes(self):
+        with self._lock:
+            row = self.connection.execute("SELECT SUM(size) FROM entries").fetchone()
+        return row[0] or 0
+
+    def _evict(self):
+        total = self.connection.execute("SELECT SUM(size) FROM entries").fetchone()[0]
+        total = total or 0
+        if total <= self.max_bytes:
+            return
+        rows = self.connection.execute(
+            "SELECT key, size FROM entries ORDER BY last_access"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self.path_for(key))
+            except OSError:
+                pass
+            self._forget(key)
+            total -= size
+
+
+_cache = None
+
+
+def get_result_cache():
+    """Return the shared result cache for this package."""
+    global _cache
+    if _cache is None:
+        root = os.environ.get("COMFYASSETS_RESULT_CACHE_DIR", DEFAULT_CACHE_DIR)
+        max_gb = server_hooks.env_number(
+            "COMFYASSETS_RESULT_CACHE_MAX_GB", DEFAULT_MAX_GB, float
+        )
+        _cache = ResultCache(root, int(max_gb * 1024**3))
+    return _cache
@@ -0,0 +1,126 @@
+import io
+
+import comfy.samplers
+
+from nodes import MAX_RESOLUTION
+
+try:
+    from . import result_cache
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import result_cache
+
+
+class ResultCacheKey:
+    """Hash resolved selector values and extra keys into a cache key."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "sampler_name": (comfy.samplers.KSampler.SAMPLERS,),
+                "scheduler": (comfy.samplers.KSampler.SCHEDULERS,),
+                "seed": ("INT", {"default": 0, "min": 0, "max": 0xFFFFFFFFFFFFFFFF}),
+                "width": ("INT", {"default": 1024, "min": 16, "max": MAX_RESOLUTION}),
+                "height": ("INT", {"default": 1024, "min": 16, "max": MAX_RESOLUTION}),
+            },
+            "optional": {
+                "model": (
+                    "STRING",
+                    {"default": "", "tooltip": "Model name or hash"},
+                ),
+                "positive": ("STRING", {"default": "", "multiline": True}),
+                "negative": ("STRING", {"default": "", "multiline": True}),
+                "extra": (
+                    "STRING",
+                    {
+                        "default": "",
+                        "tooltip": "Anything else that changes the result (steps, cfg, LoRAs, ...)",
+                    },
+                ),
+            },
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("cache_key",)
+    FUNCTION = "make_key"
+    CATEGORY = "comfyassets/Generation"
+
+    def make_key(
+        self,
+        sampler_name,
+        scheduler,
+        seed,
+        width,
+        height,
+        model="",
+        positive="",
+        negative="",
+        extra="",
+    ):
+        params = {
+            "sampler_name": sampler_name,
+            "scheduler": scheduler,
+            "seed": seed,
+            "width": width,
+            "height": height,
+        }
+        extras = {
+            "model": model,
+            "positive": positive,
+            "negative": negative,
+            "extra": extra,
+        }
+        return (result_cache.cache_key(params, extras),)
+
+
+class CachedImage:
+    """Return a cached image for the key, or cache the freshly generated one.
+
+    ``image`` is a lazy input: on a cache hit the sampler and VAE decode
+    feeding it never run. The hit is read while deciding, so an eviction
+    before execution cannot lose it.
+    """
+
+    def __init__(self):
+        # cache_key -> bytes read by check_lazy_status for get_image
+        self._hits = {}
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "cache_key": ("STRING", {"forceInput": True}),
+                "image": ("IMAGE", {"lazy": True}),
+            },
+        }
+
+    RETURN_TYPES = ("IMAGE",)
+    RETURN_NAMES = ("image",)
+    FUNCTION = "get_image"
+    CATEGORY = "comfyassets/Generation"
+
+    def check_lazy_status(self, cache_key, image=None):
+        if image is not None or cache_key in self._hits:
+            return []
+        data = result_cache.get_result_cache().get(cache_key)
+        if data is None:
+            return ["image"]
+        self._hits[cache_key] = data
+        return []
+
+    def get_image(self, cache_key, image=None):
+        import torch
+
+        cache = result_cache.get_result_cache()
+        if image is None:
+            data = self._hits.pop(cache_key, None) or cache.get(cache_key)
+            if data is not None:
+                return (torch.load(io.BytesIO(data), weights_only=True),)
+            raise ValueError(
+                f"Result cache entry {cache_key} was evicted; queue the prompt again"
+            )
+
+        buffer = io.BytesIO()
+        torch.save(image.detach().cpu().contiguous(), buffer)
+        cache.put(cache_key, buffer.getvalue())
+        return (image,)
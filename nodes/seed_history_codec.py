@@ -0,0 +1,98 @@
+"""Compact encoding of seed history for workflow/PNG metadata.
+
+The history used to be stored as a JSON array of ``{"seed", "timestamp",
+"dateString"}`` objects. The compact form is ``"sh1:"`` followed by
+unpadded base64url of::
+
+    varint(count)
+    repeated count times:
+        varint(seed)
+        zigzag varint(timestamp - previous timestamp)
+
+Seeds are stored as unsigned 64-bit values, so negative seeds wrap around
+(``-1`` is stored as ``2**64 - 1``). Timestamps are milliseconds since the
+epoch; the first delta is taken from zero. This mirrors ``encodeSeedHistory``/``decodeSeedHistory`` in
+``web/seed_history_ui.js``.
+"""
+
+import base64
+
+PREFIX = "sh1:"
+SEED_MASK = (1 << 64) - 1
+
+
+def _write_varint(out, value):
+    if value < 0:
+        raise ValueError("varint values must not be negative")
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(data, offset):
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("truncated seed history data")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    return value // 2 if not value & 1 else -(value + 1) // 2
+
+
+def encode_history(entries):
+    """Encode history entries (dicts with seed and timestamp) compactly."""
+    out = bytearray()
+    _write_varint(out, len(entries))
+    previous = 0
+    for entry in entries:
+        timestamp = int(entry.get("timestamp", 0))
+        # Same wrapping as BigInt.asUintN(64, ...) in the frontend
+        _write_varint(out, int(entry["seed"]) & SEED_MASK)
+        _write_varint(out, _zigzag(timestamp - previous))
+        previous = timestamp
+    return PREFIX + base64.urlsafe_b64encode(bytes(out)).decode("ascii").rstrip("=")
+
+
+def decode_history(data):
+    """Decode compact or legacy (JSON array) seed history.
+
+    Returns a list of ``{"seed": int, "timestamp": int}`` dicts.
+    """
+    if data is None:
+        return []
+    if isinstance(data, list):
+        return [
+            {"seed": int(entry["seed"]), "timestamp": int(entry.get("timestamp", 0))}
+            for entry in data
+        ]
+    if not isinstance(data, str) or not data.startswith(PREFIX):
+        raise ValueError("unrecognized seed history format")
+
+    payload = data[len(PREFIX) :]
+    raw = base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+    count, offset = _read_varint(raw, 0)
+    entries = []
+    timestamp = 0
+    for _ in range(count):
+        seed, offset = _read_varint(raw, offset)
+        delta, offset = _read_varint(raw, offset)
+        timestamp += _unzigzag(delta)
+        entries.append({"seed": seed, "timestamp": timestamp})
+    return entries
@@ -0,0 +1,269 @@
+"""Server-side seed history, partitioned into per-user namespaces.
+
+Each namespace (a client id of the user who submitted the prompt, see
+:func:`namespace_for`) keeps its seeds in an ordered
+dict keyed by seed, so appending, re-using a seed and trimming to the
+per-namespace cap are all O(1), matching the browser history (a re-used
+seed moves to the front). Namespaces themselves are kept in LRU order; once
+the total number of entries in memory exceeds ``max_entries``, the coldest
+namespaces are written to ``directory`` in the compact ``sh1:`` encoding
+and dropped from RAM. They are read back transparently on next access.
+"""
+
+import atexit
+import collections
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+
+try:
+    from . import seed_history_codec, server_hooks
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import seed_history_codec
+    import server_hooks
+
+# Largest browser history (MAX_HISTORY_LIMIT in web/seed_history_ui.js)
+DEFAULT_NAMESPACE_CAP = 5000
+DEFAULT_MAX_ENTRIES = 1_000_000
+
+# extra_data key of the user who submitted a queued prompt
+USER_KEY = "comfyassets_user"
+
+# Submitter of the prompt being executed, set when the worker takes it
+_executing = {"user": None, "client_id": None}
+
+
+class SeedHistoryStore:
+    """Per-namespace seed histories with a global in-memory entry bound."""
+
+    def __init__(
+        self,
+        directory,
+        namespace_cap=DEFAULT_NAMESPACE_CAP,
+        max_entries=DEFAULT_MAX_ENTRIES,
+    ):
+        self.directory = directory
+        self.namespace_cap = namespace_cap
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # namespace -> OrderedDict(seed -> timestamp), oldest first
+        self._namespaces = collections.OrderedDict()
+        self._dirty = set()
+        self._entries = 0
+
+    def _path(self, namespace):
+        digest = hashlib.sha256(namespace.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.sh1")
+
+    def _load(self, namespace):
+        """Return the namespace's history, reading it from disk if cold."""
+        history = self._namespaces.get(namespace)
+        if history is not None:
+            self._namespaces.move_to_end(namespace)
+            return history
+
+        history = collections.OrderedDict()
+        try:
+            with open(self._path(namespace), "r", encoding="ascii") as handle:
+                entries = seed_history_codec.decode_history(handle.read())
+        except (OSError, ValueError):
+            entries = []
+        for entry in entries[-self.namespace_cap :]:
+            history[entry["seed"]] = entry["timestamp"]
+        self._namespaces[namespace] = history
+        self._entries += len(history)
+        self._evict(keep=namespace)
+        return history
+
+    def _write(self, namespace):
+        entries = [
+            {"seed": seed, "timestamp": timestamp}
+            for seed, timestamp in self._namespaces[namespace].items()
+        ]
+        fd, temp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, "w", encoding="ascii") as handle:
+            handle.write(seed_history_codec.encode_history(entries))
+        os.replace(temp_path, self._path(namespace))
+        self._dirty.discard(namespace)
+
+    def _evict(self, keep):
+        """Spill least recently used namespaces until under the bound."""
+        while self._entries > self.max_entries and len(self._namespaces) > 1:
+            namespace = next(iter(self._namespaces))
+            if namespace == keep:
+                self._namespaces.move_to_end(namespace)
+                continue
+            if namespace in self._dirty:
+                self._write(namespace)
+            self._entries -= len(self._namespaces.pop(namespace))
+
+    def append(self, namespace, seed, timestamp=None):
+        """Record ``seed`` as the most recent entry of ``namespace``."""
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        with self._lock:
+            history = self._load(namespace)
+            if seed in history:
+                del history[seed]
+                self._entries -= 1
+            history[seed] = timestamp
+            self._entries += 1
+            if len(history) > self.namespace_cap:
+                history.popitem(last=False)
+                self._entries -= 1
+            self._dirty.add(namespace)
+            self._evict(keep=namespace)
+
+    def history(self, namespace, limit=None):
+        """Return up to ``limit`` entries of ``namespace``, newest first."""
+        with self._lock:
+            if namespace not in self._namespaces and not os.path.exists(
+                self._path(namespace)
+            ):
+                return []
+            history = self._load(namespace)
+            entries = []
+            for seed in reversed(history):
+                if limit is not None and len(entries) >= limit:
+                    break
+                entries.append({"seed": seed, "timestamp": history[seed]})
+            return entries
+
+    def clear(self, namespace):
+        with self._lock:
+            history = self._load(namespace)
+            self._entries -= len(history)
+            history.clear()
+            self._dirty.add(namespace)
+
+    def flush(self):
+        """Write every modified in-memory namespace to disk."""
+        with self._lock:
+            for namespace in list(self._dirty):
+                self._write(namespace)
+
+    @property
+    def entries_in_memory(self):
+        return self._entries
+
+    @property
+    def namespaces_in_memory(self):
+        return len(self._namespaces)
+
+
+def namespace_for(user, client_id):
+    """Namespace of ``client_id`` as seen by ``user``."""
+    return f"{user}/{client_id or ''}"
+
+
+def record_executing(prompt_queue):
+    """Wrap ``prompt_queue.get`` to remember who submitted the running prompt.
+
+    The submitter comes from the prompt's own ``extra_data`` (stamped at
+    submit time), so it survives any number of clients and is never
+    guessed from the client id.
+    """
+    original_get = prompt_queue.get
+
+    def get(*args, **kwargs):
+        result = original_get(*args, **kwargs)
+        if result is not None:
+            extra_data = result[0][3] if len(result[0]) > 3 else None
+            if not isinstance(extra_data, dict):
+                extra_data = {}
+            _executing["user"] = extra_data.get(USER_KEY)
+            _executing["client_id"] = extra_data.get("client_id")
+        return result
+
+    prompt_queue.get = get
+    return prompt_queue
+
+
+def current_namespace():
+    """Namespace of the prompt being executed, or None if its user is unknown."""
+    if not _executing["user"]:
+        return None
+    return namespace_for(_executing["user"], _executing["client_id"])
+
+
+_store = None
+
+
+def get_seed_history_store():
+    """Return the shared store, or None unless a directory is configured."""
+    global _store
+    directory = os.environ.get("COMFYASSETS_SEED_HISTORY_DIR")
+    if _store is None and directory:
+        _store = SeedHistoryStore(
+            directory,
+            server_hooks.env_number(
+                "COMFYASSETS_SEED_HISTORY_CAP", DEFAULT_NAMESPACE_CAP
+            ),
+            server_hooks.env_number(
+                "COMFYASSETS_SEED_HISTORY_MAX_ENTRIES", DEFAULT_MAX_ENTRIES
+            ),
+        )
+        atexit.register(_store.flush)
+    return _store
+
+
+def install_seed_history_routes(prompt_server, store=None):
+    """Serve ``GET``/``DELETE /comfyassets/seed_history?client_id=...``.
+
+    Does nothing unless server-side history is configured. Every queued
+    prompt carries the user who submitted it (see
+    ``server_hooks.request_user``) and the routes only serve the requesting
+    user's namespaces, so a client id alone does not give access to another
+    user's history. Prompts from unknown users are not recorded.
+    """
+    if store is None:
+        store = get_seed_history_store()
+        if store is None:
+            return
+
+    from aiohttp import web
+
+    def on_prompt(json_data):
+        extra_data = json_data.get("extra_data")
+        if not isinstance(extra_data, dict):
+            extra_data = json_data["extra_data"] = {}
+        # Never trust a submitter sent by the client
+        extra_data.pop(USER_KEY, None)
+        user = server_hooks.current_requester()
+        if user:
+            extra_data[USER_KEY] = user
+        return json_data
+
+    prompt_server.add_on_prompt_handler(on_prompt)
+    server_hooks.when_queue_ready(prompt_server, record_executing)
+
+    if not server_hooks.install_requester_middleware(prompt_server):
+        logging.warning(
+            "[ComfyAssets Selectors] Seed history cannot identify users; "
+            "executed seeds are not recorded"
+        )
+
+    def namespace_of(request):
+        user = server_hooks.request_user(request, prompt_server)
+        if user is None:
+            raise web.HTTPForbidden(reason="Unknown user")
+        return namespace_for(user, request.query.get("client_id"))
+
+    @prompt_server.routes.get("/comfyassets/seed_history")
+    async def get_history(request):
+        try:
+            limit = int(request.query.get("limit", DEFAULT_NAMESPACE_CAP))
+        except ValueError:
+            return web.json_response({"error": "invalid limit"}, status=400)
+        return web.json_response(
+            {"history": store.history(namespace_of(request), limit)}
+        )
+
+    @prompt_server.routes.delete("/comfyassets/seed_history")
+    async def clear_history(request):
+        store.clear(namespace_of(request))
+        return web.json_response({"history": []})
@@ -0,0 +1,122 @@
+"""Small helpers for attaching opt-in hooks to the running ComfyUI server."""
+
+import contextvars
+import logging
+import os
+
+# Routes ComfyUI queues prompts on
+PROMPT_PATHS = ("/prompt", "/api/prompt")
+
+# Request key of the parsed /prompt body shared by the middlewares
+PROMPT_JSON_KEY = "comfyassets_prompt_json"
+
+# Who sent the request being handled, set by the requester middleware
+_requester = contextvars.ContextVar("comfyassets_requester", default=None)
+
+
+def get_prompt_server():
+    """Return the running ``PromptServer`` instance, or None outside ComfyUI."""
+    try:
+        import server
+    except ImportError:
+        return None
+    return getattr(server.PromptServer, "instance", None)
+
+
+def env_number(name, default, cast=int):
+    """Read a numeric setting from the environment."""
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        logging.warning("[ComfyAssets Selectors] Ignoring invalid %s=%r", name, value)
+        return default
+
+
+def when_queue_ready(prompt_server, callback):
+    """Call ``callback(prompt_queue)`` once the server's prompt queue exists.
+
+    Custom nodes can be loaded before ComfyUI creates its ``PromptQueue``.
+    In that case the callback runs on the first submitted prompt instead.
+    """
+    prompt_queue = getattr(prompt_server, "prompt_queue", None)
+    if prompt_queue is not None:
+        callback(prompt_queue)
+        return
+
+    state = {"done": False}
+
+    def on_prompt(json_data):
+        if not state["done"] and getattr(prompt_server, "prompt_queue", None):
+            state["done"] = True
+            callback(prompt_server.prompt_queue)
+        return json_data
+
+    prompt_server.add_on_prompt_handler(on_prompt)
+
+
+def request_user(request, prompt_server=None):
+    """Return who sent ``request``, or None if ComfyUI rejects the user.
+
+    With ``--multi-user`` this is the ComfyUI user (the ``comfy-user``
+    header, checked by ComfyUI's user manager), otherwise the remote
+    address of the request. Clients never pick it themselves.
+    """
+    user_manager = getattr(prompt_server, "user_manager", None)
+    try:
+        user = user_manager.get_request_user_id(request)
+    except AttributeError:  # no user manager
+        user = None
+    except KeyError:  # unknown user
+        return None
+    if user and user != "default":
+        return user
+    return request.remote or ""
+
+
+def current_requester():
+    """Return :func:`request_user` of the request being handled, if any."""
+    return _requester.get()
+
+
+def install_requester_middleware(prompt_server):
+    """Record the sender of every request for :func:`current_requester`.
+
+    Installed once per server, ahead of every other middleware. Returns
+    False if the server's app is missing or already running.
+    """
+    app = getattr(prompt_server, "app", None)
+    if app is None:
+        return False
+    if getattr(prompt_server, "_comfyassets_requester", False):
+        return True
+
+    from aiohttp import web
+
+    @web.middleware
+    async def identify(request, handler):
+        token = _requester.set(request_user(request, prompt_server))
+        try:
+            return await handler(request)
+        finally:
+            _requester.reset(token)
+
+    try:
+        app.middlewares.insert(0, identify)
+    except RuntimeError:  # the app is already running
+        return False
+    prompt_server._comfyassets_requester = True
+    return True
+
+
+async def prompt_json(request):
+    """Return the parsed ``POST /prompt`` body, parsed once per request.
+
+    The body is shared by every middleware, so it must not be modified;
+    ComfyUI's own handler still reads the raw body.
+    """
+    if PROMPT_JSON_KEY not in request:
+        request[PROMPT_JSON_KEY] = await request.json()
+    return request[PROMPT_JSON_KEY]
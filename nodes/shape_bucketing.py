@@ -0,0 +1,235 @@
+"""Shape-bucketed reordering of the ComfyUI prompt queue.
+
+Every change of latent shape between consecutive prompts costs
+recompilation, autotuning and allocator churn. This module lets the queue
+prefer pending prompts whose resolved dimensions match the prompt that ran
+last, within a bounded fairness window so no prompt is starved.
+
+It can also be run as a script to replay a queue trace on CPU::
+
+    python nodes/shape_bucketing.py trace.jsonl --window 8 --max-skips 4
+
+Each trace line is ``{"arrival": <seconds>, "width": <int>, "height": <int>}``.
+"""
+
+import argparse
+import heapq
+import json
+import sys
+
+try:
+    from . import prompt_folding, prompt_resolution
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import prompt_folding
+    import prompt_resolution
+
+
+class ShapeBucketPolicy:
+    """Pick the next prompt, preferring the shape that ran last.
+
+    Only the first ``window`` pending prompts are considered, and no prompt
+    is ever bypassed more than ``max_skips`` times.
+    """
+
+    def __init__(self, window=8, max_skips=4):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        if max_skips < 0:
+            raise ValueError("max_skips must not be negative")
+        self.window = window
+        self.max_skips = max_skips
+        self._skips = {}
+
+    def select(self, pending, current_shape):
+        """Return the index of the next item to run.
+
+        ``pending`` is a list of ``(key, shape)`` tuples in queue order.
+        """
+        if not pending:
+            raise ValueError("no pending items")
+
+        if len(self._skips) > len(pending) + self.window:
+            keys = {key for key, _ in pending}
+            self._skips = {k: v for k, v in self._skips.items() if k in keys}
+
+        chosen = 0
+        head_key, head_shape = pending[0]
+        if (
+            current_shape is not None
+            and head_shape != current_shape
+            and self._skips.get(head_key, 0) < self.max_skips
+        ):
+            for index in range(1, min(self.window, len(pending))):
+                key, shape = pending[index]
+                if shape == current_shape:
+                    chosen = index
+                    break
+                # Everything ahead of a match gets bypassed, so stop at the
+                # first item that has already waited long enough.
+                if self._skips.get(key, 0) >= self.max_skips:
+                    break
+
+        for key, _ in pending[:chosen]:
+            self._skips[key] = self._skips.get(key, 0) + 1
+        self._skips.pop(pending[chosen][0], None)
+        return chosen
+
+
+def _reorder_heap(prompt_queue, policy, current_shape, shape_of):
+    """Move the item chosen by ``policy`` to the front of the queue heap.
+
+    Queue items are ``(number, prompt_id, prompt, ...)`` tuples ordered by
+    number. The chosen item takes the head's number and the bypassed items
+    move back by one slot, so the heap order stays consistent.
+    """
+    head = heapq.nsmallest(policy.window, prompt_queue.queue)
+    pending = [(item[1], shape_of(item)) for item in head]
+    index = policy.select(pending, current_shape)
+    if index == 0:
+        return
+
+    moved = head[: index + 1]
+    numbers = [item[0] for item in moved]
+    reordered = [moved[index]] + moved[:index]
+    replaced = {id(item) for item in moved}
+    queue = [item for item in prompt_queue.queue if id(item) not in replaced]
+    queue.extend((number,) + item[1:] for number, item in zip(numbers, reordered))
+    heapq.heapify(queue)
+    prompt_queue.queue[:] = queue
+
+
+def install_queue_reordering(prompt_queue, policy, node_classes=None):
+    """Wrap ``prompt_queue.get`` so it serves prompts in shape buckets.
+
+    Shapes of folded prompts come from their folding record.
+    """
+    if node_classes is None:
+        node_classes = prompt_resolution.default_node_classes()
+
+    original_get = prompt_queue.get
+    state = {"shape": None}
+    shapes = {}
+
+    def shape_of(item):
+        prompt_id = item[1]
+        if prompt_id not in shapes:
+            # Folded prompts no longer have dimension nodes; use the record
+            record = prompt_folding.recorded_folding(item[3] if len(item) > 3 else None)
+            if record is None:
+                shape = prompt_resolution.resolve_dimensions(item[2], node_classes)
+            elif record.get("shapes"):
+                shape = tuple(tuple(size) for size in record["shapes"])
+            else:
+                shape = None
+            shapes[prompt_id] = shape
+        return shapes[prompt_id]
+
+    def get(*args, **kwargs):
+        with prompt_queue.mutex:
+            if len(prompt_queue.queue) > 1:
+                _reorder_heap(prompt_queue, policy, state["shape"], shape_of)
+        result = original_get(*args, **kwargs)
+        if result is not None:
+            item = result[0]
+            state["shape"] = shape_of(item)
+            shapes.pop(item[1], None)
+            if len(shapes) > 4 * policy.window:
+                shapes.clear()
+        return result
+
+    prompt_queue.get = get
+    return prompt_queue
+
+
+def simulate(trace, policy=None, service_time=1.0, switch_penalty=0.0):
+    """Replay a queue trace with a single worker.
+
+    ``trace`` is a list of ``(arrival, shape)`` tuples. Each prompt takes
+    ``service_time``, plus ``switch_penalty`` whenever its shape differs
+    from the previous one. ``policy=None`` replays plain FIFO order.
+    """
+    arrivals = sorted(enumerate(trace), key=lambda entry: (entry[1][0], entry[0]))
+    pending = []
+    order = []
+    waits = []
+    switches = 0
+    clock = 0.0
+    shape = None
+    position = 0
+
+    while position < len(arrivals) or pending:
+        if not pending and arrivals[position][1][0] > clock:
+            clock = arrivals[position][1][0]
+        while position < len(arrivals) and arrivals[position][1][0] <= clock:
+            index, (arrival, item_shape) = arrivals[position]
+            pending.append((index, arrival, item_shape))
+            position += 1
+
+        if policy is None:
+            chosen = 0
+        else:
+            candidates = [(index, item_shape) for index, _, item_shape in pending]
+            chosen = policy.select(candidates, shape)
+        index, arrival, item_shape = pending.pop(chosen)
+
+        if shape is not None and item_shape != shape:
+            switches += 1
+            clock += switch_penalty
+        shape = item_shape
+        waits.append(clock - arrival)
+        clock += service_time
+        order.append(index)
+
+    return {
+        "order": order,
+        "switches": switches,
+        "makespan": clock,
+        "mean_wait": sum(waits) / len(waits) if waits else 0.0,
+        "max_wait": max(waits) if waits else 0.0,
+    }
+
+
+def load_trace(path):
+    """Load a JSON lines queue trace into ``(arrival, shape)`` tuples."""
+    trace = []
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            trace.append((float(entry["arrival"]), (entry["width"], entry["height"])))
+    return trace
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a prompt queue trace.")
+    parser.add_argument("trace", help="JSON lines file with arrival/width/height")
+    parser.add_argument("--window", type=int, default=8)
+    parser.add_argument("--max-skips", type=int, default=4)
+    parser.add_argument("--service-time", type=float, default=1.0)
+    parser.add_argument("--switch-penalty", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    trace = load_trace(args.trace)
+    results = {
+        "fifo": simulate(trace, None, args.service_time, args.switch_penalty),
+        "bucketed": simulate(
+            trace,
+            ShapeBucketPolicy(args.window, args.max_skips),
+            args.service_time,
+            args.switch_penalty,
+        ),
+    }
+    for name, result in results.items():
+        print(
+            f"{name:>9}: switches={result['switches']} "
+            f"makespan={result['makespan']:.2f} "
+            f"mean_wait={result['mean_wait']:.2f} "
+            f"max_wait={result['max_wait']:.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
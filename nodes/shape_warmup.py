@@ -0,0 +1,331 @@
+"""Warm up per-shape caches for the dimension presets in the background.
+
+The first prompt at a new size pays one-off costs: allocator growth,
+kernel autotuning, compilation. A warm-up run calls every registered
+warm-up callback once per shape, in a background thread, before users ask
+for those sizes. Shapes come from ``WidthHeightNode``'s presets, optionally
+ranked by how often each size appears in the output index
+(``png_metadata_index``) and cut to the most used ones.
+
+Callbacks are registered by name with :func:`register_warmup` and called
+as ``callback(width, height)``. The built-in ``latent_pool`` callback
+pre-allocates the pooled empty latent for each shape. A run can be
+cancelled and stops once its time budget is spent; both take effect
+between callbacks, as a running callback is never interrupted.
+"""
+
+import collections
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    from . import latent_pool, server_hooks
+    from .width_height_node import PRESETS, WidthHeightNode
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import latent_pool
+    import server_hooks
+    from width_height_node import PRESETS, WidthHeightNode
+
+DEFAULT_BUDGET = 120.0
+PROGRESS_EVENT = "comfyassets.warmup"
+
+_callbacks = collections.OrderedDict()
+_callbacks_lock = threading.Lock()
+
+
+def register_warmup(name, callback):
+    """Register ``callback(width, height)`` to run for every warm-up shape."""
+    with _callbacks_lock:
+        _callbacks[name] = callback
+
+
+def unregister_warmup(name):
+    with _callbacks_lock:
+        _callbacks.pop(name, None)
+
+
+def registered_warmups():
+    """Return the registered callbacks as ``[(name, callback)]``."""
+    with _callbacks_lock:
+        return list(_callbacks.items())
+
+
+def check_shape(width, height):
+    """Return ``(width, height)`` if ``WidthHeightNode`` accepts the size.
+
+    Raises ValueError otherwise, so requests cannot warm (and allocate)
+    arbitrary sizes.
+    """
+    inputs = WidthHeightNode.INPUT_TYPES()["required"]
+    for name, value in (("width", width), ("height", height)):
+        options = inputs[name][1]
+        low, high, step = options["min"], options["max"], options["step"]
+        if not low <= value <= high or value % step:
+            raise ValueError(
+                f"{name} must be a multiple of {step} from {low} to {high}, "
+                f"got {value}"
+            )
+    return width, height
+
+
+def warm_latent_pool(width, height, channels=4):
+    """Pre-allocate the pooled empty latent for one shape."""
+    check_shape(width, height)
+    try:
+        from .width_height_latent_node import latent_device
+    except ImportError:  # loaded as a top-level module (tests, CLI)
+        from width_height_latent_node import latent_device
+
+    latent_pool.get_latent_pool().zeros(
+        (1, channels, height // 8, width // 8), device=latent_device()
+    )
+
+
+register_warmup("latent_pool", warm_latent_pool)
+
+
+def parse_size(size):
+    """Parse ``"<width>x<height>"`` into a checked ``(width, height)``."""
+    width, height = size.lower().split("x")
+    return check_shape(int(width), int(height))
+
+
+def preset_shapes(index_path=None, limit=0):
+    """Return ``WidthHeightNode``'s presets as ``[(width, height)]``.
+
+    With an output index, presets are ordered by how many indexed images
+    have that size (ties keep preset order). ``limit`` keeps the first N.
+    """
+    shapes = [parse_size(preset) for preset in PRESETS]
+    if index_path and not os.path.exists(index_path):
+        logging.warning(
+            "[ComfyAssets Selectors] Output index not found: %s", index_path
+        )
+    elif index_path:
+        try:
+            from .png_metadata_index import MetadataIndex
+        except ImportError:  # loaded as a top-level module (tests, CLI)
+            from png_metadata_index import MetadataIndex
+
+        try:
+            with MetadataIndex(index_path) as index:
+                counts = dict(index.size_counts())
+        except sqlite3.Error as error:
+            logging.warning(
+                "[ComfyAssets Selectors] Cannot rank presets by %s: %s",
+                index_path,
+                error,
+            )
+            counts = {}
+        shapes.sort(key=lambda shape: -counts.get(f"{shape[0]}x{shape[1]}", 0))
+    return shapes[:limit] if limit > 0 else shapes
+
+
+class WarmupRun:
+    """One background pass of warm-up callbacks over a list of shapes."""
+
+    def __init__(
+        self,
+        shapes,
+        callbacks=None,
+        budget=DEFAULT_BUDGET,
+        on_progress=None,
+        clock=time.monotonic,
+    ):
+        self.shapes = [tuple(shape) for shape in shapes]
+        self.callbacks = list(registered_warmups() if callbacks is None else callbacks)
+        self.budget = budget
+        self.on_progress = on_progress
+        self.clock = clock
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._started = None
+        self._state = "pending"
+        self._done = 0
+        self._current = None
+        self._errors = []
+
+    @property
+    def total(self):
+        return len(self.shapes) * len(self.callbacks)
+
+    def progress(self):
+        with self._lock:
+            elapsed = 0.0 if self._started is None else self.clock() - self._started
+            return {
+                "state": self._state,
+                "done": self._done,
+                "total": self.total,
+                "current": self._current,
+                "elapsed": round(elapsed, 3),
+                "budget": self.budget,
+                "errors": list(self._errors),
+            }
+
+    def _update(self, **changes):
+        with self._lock:
+            for name, value in changes.items():
+                setattr(self, "_" + name, value)
+        if self.on_progress is not None:
+            try:
+                self.on_progress(self.progress())
+            except Exception:
+                logging.exception("[ComfyAssets Selectors] Warm-up progress failed")
+
+    def run(self):
+        """Run every callback for every shape in the calling thread."""
+        self._started = self.clock()
+        self._update(state="running")
+        done = 0
+        for width, height in self.shapes:
+            for name, callback in self.callbacks:
+                if self._cancelled.is_set():
+                    self._update(state="cancelled", current=None)
+                    return
+                if self.budget and self.clock() - self._started >= self.budget:
+                    self._update(state="out_of_budget", current=None)
+                    return
+                self._update(current={"name": name, "width": width, "height": height})
+                try:
+                    callback(width, height)
+                except Exception as error:
+                    logging.warning(
+                        "[ComfyAssets Selectors] Warm-up %s failed for %dx%d: %s",
+                        name,
+                        width,
+                        height,
+                        error,
+                    )
+                    with self._lock:
+                        self._errors.append(f"{name} {width}x{height}: {error}")
+                done += 1
+                self._update(done=done)
+        self._update(state="finished", current=None)
+
+    def start(self):
+        """Run in a daemon thread and return immediately."""
+        self._thread = threading.Thread(
+            target=self.run, name="comfyassets-warmup", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def wait(self, timeout=None):
+        """Wait for the background thread; returns True once it has ended."""
+        if self._thread is None:
+            return self._state != "running"
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    @property
+    def active(self):
+        return self._thread is not None and self._thread.is_alive()
+
+
+class WarmupController:
+    """Start, cancel and report the server's warm-up runs (one at a time)."""
+
+    def __init__(self, index_path=None, limit=0, budget=DEFAULT_BUDGET, send=None):
+        self.index_path = index_path
+        self.limit = limit
+        self.budget = budget
+        self.send = send
+        self.run = None
+        self._lock = threading.Lock()
+
+    def start(self, shapes=None, limit=None, budget=None):
+        """Start a run unless one is active; returns ``(run, started)``."""
+        with self._lock:
+            if self.run is not None and self.run.active:
+                return self.run, False
+            if shapes is None:
+                shapes = preset_shapes(
+                    self.index_path, self.limit if limit is None else limit
+                )
+            self.run = WarmupRun(
+                shapes,
+                budget=self.budget if budget is None else budget,
+                on_progress=self.send,
+            ).start()
+            return self.run, True
+
+    def cancel(self):
+        with self._lock:
+            if self.run is not None:
+                self.run.cancel()
+            return self.run
+
+    def progress(self):
+        run = self.run
+        return {"state": "idle"} if run is None else run.progress()
+
+
+def install_warmup_routes(prompt_server, controller):
+    """Serve ``GET``/``POST``/``DELETE /comfyassets/warmup``."""
+    from aiohttp import web
+
+    @prompt_server.routes.get("/comfyassets/warmup")
+    async def get_warmup(request):
+        return web.json_response(controller.progress())
+
+    @prompt_server.routes.post("/comfyassets/warmup")
+    async def start_warmup(request):
+        try:
+            data = await request.json() if request.can_read_body else {}
+            shapes = data.get("shapes")
+            if shapes is not None:
+                shapes = [parse_size(shape) for shape in shapes]
+            limit = data.get("limit")
+            budget = data.get("budget")
+            limit = None if limit is None else int(limit)
+            budget = None if budget is None else float(budget)
+            if limit is not None and limit < 0:
+                raise ValueError("limit must not be negative")
+            if budget is not None and not budget >= 0:
+                raise ValueError("budget must not be negative")
+        except ValueError as error:
+            return web.json_response({"error": f"Invalid warm-up: {error}"}, status=400)
+        except (TypeError, AttributeError):
+            return web.json_response(
+                {"error": "expected {'shapes': ['1024x1024', ...], 'budget': seconds}"},
+                status=400,
+            )
+        run, started = controller.start(shapes, limit, budget)
+        return web.json_response(run.progress(), status=202 if started else 409)
+
+    @prompt_server.routes.delete("/comfyassets/warmup")
+    async def cancel_warmup(request):
+        controller.cancel()
+        return web.json_response(controller.progress())
+
+
+def install_from_env(prompt_server):
+    """Enable warm-up from ``COMFYASSETS_WARMUP_*`` settings.
+
+    ``COMFYASSETS_WARMUP=1`` starts a run when the package loads;
+    ``COMFYASSETS_WARMUP_ROUTE=1`` installs the routes to run it on demand.
+    """
+    at_startup = server_hooks.env_number("COMFYASSETS_WARMUP", 0)
+    if not at_startup and not server_hooks.env_number("COMFYASSETS_WARMUP_ROUTE", 0):
+        return None
+
+    def send(progress):
+        prompt_server.send_sync(PROGRESS_EVENT, progress)
+
+    controller = WarmupController(
+        os.environ.get("COMFYASSETS_WARMUP_INDEX") or None,
+        server_hooks.env_number("COMFYASSETS_WARMUP_LIMIT", 0),
+        server_hooks.env_number("COMFYASSETS_WARMUP_BUDGET", DEFAULT_BUDGET, float),
+        send,
+    )
+    install_warmup_routes(prompt_server, controller)
+    if at_startup:
+        controller.start()
+    return controller
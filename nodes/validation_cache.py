@@ -0,0 +1,529 @@
+"""Skip re-validating the unchanged parts of resubmitted prompts.
+
+ComfyUI validates every prompt from scratch: each output node's whole
+upstream graph is walked and every node's ``INPUT_TYPES`` is rebuilt and
+checked. When a workflow is resubmitted with only a new seed, sampler or
+size, almost all of that work repeats.
+
+Each node gets a structure hash covering its class type, its literal
+inputs and the hashes of the nodes it links to, so an output node's hash
+covers its whole upstream subgraph. The literal inputs of the selector and
+``SeedHistory`` nodes are left out of the hash and checked instead against
+frozensets of the ``KSampler`` sampler and scheduler lists and the preset
+lists and integer ranges, precomputed once from the nodes' own
+``INPUT_TYPES``. Output nodes whose hash validated before are accepted
+without calling ComfyUI's validator; only the remaining outputs (those with
+a changed subgraph) are passed to it, as partial execution targets where
+ComfyUI supports them. Anything the fast checks reject goes through the
+full validator, so error messages are unchanged.
+
+The cache of validated hashes is bounded (least recently used dropped
+first) and entries expire after ``ttl`` seconds, e.g. to notice model
+files that were deleted from disk.
+"""
+
+import argparse
+import collections
+import functools
+import hashlib
+import inspect
+import sys
+import threading
+import time
+
+try:
+    from . import prompt_resolution, server_hooks
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import prompt_resolution
+    import server_hooks
+
+CHECKED_NODES = prompt_resolution.SELECTOR_NODES + ("SeedHistory",)
+
+
+def input_checks(node_class):
+    """Return ``{input name: (required, check)}`` for a node class.
+
+    ``check`` is a frozenset of allowed values, an ``(kind, min, max)``
+    range, or None for inputs without a cheap check.
+    """
+    checks = {}
+    spec = node_class.INPUT_TYPES()
+    for section in ("required", "optional"):
+        for name, definition in spec.get(section, {}).items():
+            kind = definition[0]
+            options = definition[1] if len(definition) > 1 else {}
+            if isinstance(kind, (list, tuple)):
+                check = frozenset(kind)
+            elif kind in ("INT", "FLOAT"):
+                check = (kind, options.get("min"), options.get("max"))
+            elif kind == "BOOLEAN":
+                check = (kind, None, None)
+            else:
+                check = None
+            checks[name] = (section == "required", check)
+    return checks
+
+
+def _value_ok(check, value):
+    if isinstance(check, frozenset):
+        try:
+            return value in check
+        except TypeError:  # unhashable
+            return False
+    kind, low, high = check
+    if kind == "BOOLEAN":
+        return isinstance(value, bool)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    if kind == "INT" and not isinstance(value, int):
+        return False
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+def literals_valid(node, checks):
+    """Return True if a checked node's inputs pass the precomputed checks."""
+    inputs = node.get("inputs")
+    if not isinstance(inputs, dict):
+        return False
+    for name, (required, check) in checks.items():
+        if name not in inputs:
+            if required:
+                return False
+            continue
+        value = inputs[name]
+        if prompt_resolution.is_link(value):
+            continue
+        if check is None or not _value_ok(check, value):
+            return False
+    return True
+
+
+def structure_hashes(prompt, checked_classes=CHECKED_NODES):
+    """Return ``{node id: hash}`` of every node's definition and upstream subgraph.
+
+    Literal inputs of ``checked_classes`` are left out. Nodes with dangling
+    links or on a cycle get None.
+    """
+    hashes = {}
+    visiting = set()
+
+    def node_hash(node_id):
+        if node_id in hashes:
+            return hashes[node_id]
+        node = prompt.get(node_id)
+        if not isinstance(node, dict) or node_id in visiting:
+            return None
+        visiting.add(node_id)
+        class_type = node.get("class_type")
+        inputs = node.get("inputs", {})
+        parts = [class_type]
+        result = None
+        if isinstance(inputs, dict):
+            result = ""
+            for name in sorted(inputs):
+                value = inputs[name]
+                if prompt_resolution.is_link(value):
+                    upstream = node_hash(value[0])
+                    if upstream is None:
+                        result = None
+                        break
+                    parts.append((name, upstream, value[1]))
+                elif class_type in checked_classes:
+                    parts.append((name,))
+                else:
+                    parts.append((name, value))
+        if result is not None:
+            # repr is stable for the JSON values a prompt holds; a dict
+            # input in a different key order only costs a cache miss
+            text = repr(parts).encode("utf-8")
+            result = hashlib.blake2b(text, digest_size=16).hexdigest()
+        visiting.discard(node_id)
+        hashes[node_id] = result
+        return result
+
+    for node_id in prompt:
+        node_hash(node_id)
+    return hashes
+
+
+def checked_classes():
+    """Return this package's node classes whose literals are checked."""
+    node_classes = prompt_resolution.default_node_classes()
+    return {class_type: node_classes[class_type] for class_type in CHECKED_NODES}
+
+
+class ValidationCache:
+    """Bounded, expiring set of structure hashes of validated output nodes."""
+
+    def __init__(self, max_entries=4096, ttl=600.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()  # hash -> time validated
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, structure_hash):
+        with self._lock:
+            validated = self._entries.get(structure_hash)
+            if validated is not None and self.clock() - validated > self.ttl:
+                del self._entries[structure_hash]
+                validated = None
+            if validated is None:
+                self.stats["misses"] += 1
+                return False
+            self._entries.move_to_end(structure_hash)
+            self.stats["hits"] += 1
+            return True
+
+    def add(self, structure_hash):
+        with self._lock:
+            self._entries[structure_hash] = self.clock()
+            self._entries.move_to_end(structure_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class IncrementalValidator:
+    """Wrap a ComfyUI-style ``validate_prompt`` with a :class:`ValidationCache`.
+
+    ``node_classes`` maps every class type that may appear in prompts to its
+    node class (``nodes.NODE_CLASS_MAPPINGS`` inside ComfyUI).
+    """
+
+    def __init__(self, validate_prompt, cache, node_classes):
+        self.validate_prompt = validate_prompt
+        self.cache = cache
+        self.node_classes = node_classes
+        self.signature = inspect.signature(validate_prompt)
+        self.partial = "partial_execution_targets" in self.signature.parameters
+        # Precomputed once; this package's classes may not be registered yet
+        self.checks = {
+            class_type: input_checks(node_class)
+            for class_type, node_class in checked_classes().items()
+        }
+
+    def plan(self, args, kwargs):
+        """Return ``(bound, hashes, cached, missing)``, or None to validate normally."""
+        try:
+            bound = self.signature.bind(*args, **kwargs)
+        except TypeError:
+            return None
+        prompt = bound.arguments.get("prompt")
+        targets = bound.arguments.get("partial_execution_targets")
+        if not isinstance(prompt, dict):
+            return None
+
+        outputs = []
+        for node_id, node in prompt.items():
+            if not isinstance(node, dict):
+                return None
+            node_class = self.node_classes.get(node.get("class_type"))
+            if node_class is None:
+                return None  # let ComfyUI report the unknown node
+            checks = self.checks.get(node["class_type"])
+            if checks is not None and not literals_valid(node, checks):
+                return None
+            if getattr(node_class, "OUTPUT_NODE", False):
+                if targets is None or node_id in targets:
+                    outputs.append(node_id)
+        if not outputs:
+            return None
+
+        hashes = structure_hashes(prompt, tuple(self.checks))
+        cached, missing = [], []
+        for node_id in outputs:
+            if hashes[node_id] is not None and hashes[node_id] in self.cache:
+                cached.append(node_id)
+            else:
+                missing.append(node_id)
+        if missing and cached and not self.partial:
+            cached, missing = [], outputs  # cannot validate a subset
+        return bound, hashes, cached, missing
+
+    def partial_call(self, bound, missing):
+        """Return ``(args, kwargs)`` validating only the ``missing`` outputs."""
+        arguments = dict(bound.arguments)
+        arguments["partial_execution_targets"] = list(missing)
+        call = self.signature.bind(**arguments)
+        return call.args, call.kwargs
+
+    def merge(self, result, hashes, cached):
+        """Record validated outputs and add the cached ones to ``result``."""
+        valid, error, good_outputs, node_errors = result[:4]
+        for node_id in good_outputs if valid else ():
+            if hashes.get(node_id) is not None:
+                self.cache.add(hashes[node_id])
+        if not cached:
+            return result
+        if valid:
+            good_outputs = cached + [
+                node_id for node_id in good_outputs if node_id not in cached
+            ]
+        else:
+            # The outputs that did validate keep the prompt runnable
+            valid, error, good_outputs = True, None, list(cached)
+        return (valid, error, good_outputs, node_errors) + tuple(result[4:])
+
+    def wrap(self):
+        """Return the caching replacement for ``validate_prompt``."""
+        validate_prompt = self.validate_prompt
+
+        if inspect.iscoroutinefunction(validate_prompt):
+
+            @functools.wraps(validate_prompt)
+            async def wrapper(*args, **kwargs):
+                plan = self.plan(args, kwargs)
+                if plan is None:
+                    return await validate_prompt(*args, **kwargs)
+                bound, hashes, cached, missing = plan
+                if not missing:
+                    return (True, None, cached, {})
+                if cached:
+                    args, kwargs = self.partial_call(bound, missing)
+                result = await validate_prompt(*args, **kwargs)
+                return self.merge(result, hashes, cached)
+
+        else:
+
+            @functools.wraps(validate_prompt)
+            def wrapper(*args, **kwargs):
+                plan = self.plan(args, kwargs)
+                if plan is None:
+                    return validate_prompt(*args, **kwargs)
+                bound, hashes, cached, missing = plan
+                if not missing:
+                    return (True, None, cached, {})
+                if cached:
+                    args, kwargs = self.partial_call(bound, missing)
+                result = validate_prompt(*args, **kwargs)
+                return self.merge(result, hashes, cached)
+
+        wrapper.validation_cache = self.cache
+        return wrapper
+
+
+def install_validation_cache(cache=None, execution_module=None, node_classes=None):
+    """Replace ``execution.validate_prompt`` with a caching wrapper.
+
+    Without a cache, does nothing unless ``COMFYASSETS_VALIDATION_CACHE`` is set.
+    """
+    if cache is None:
+        if not server_hooks.env_number("COMFYASSETS_VALIDATION_CACHE", 0):
+            return None
+        cache = ValidationCache(
+            server_hooks.env_number("COMFYASSETS_VALIDATION_CACHE_SIZE", 4096),
+            server_hooks.env_number("COMFYASSETS_VALIDATION_CACHE_TTL", 600.0, float),
+        )
+    if execution_module is None:
+        import execution as execution_module
+    if node_classes is None:
+        import nodes
+
+        node_classes = nodes.NODE_CLASS_MAPPINGS
+
+    original = execution_module.validate_prompt
+    if hasattr(original, "validation_cache"):
+        return original.validation_cache  # already installed
+    validator = IncrementalValidator(original, cache, node_classes)
+    execution_module.validate_prompt = validator.wrap()
+    return cache
+
+
+# Benchmark ---------------------------------------------------------------
+
+
+class _BenchLoader:
+    """Stand-in for a model loader whose choices are listed from disk."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        names = [f"model_{index:04d}.safetensors" for index in range(500)]
+        return {"required": {"ckpt_name": (names,)}}
+
+    RETURN_TYPES = ("MODEL",)
+
+
+class _BenchSampler:
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "model": ("MODEL",),
+                "seed": ("INT", {"min": 0, "max": 0xFFFFFFFFFFFFFFFF}),
+                "sampler_name": ("SAMPLER",),
+                "scheduler": ("SCHEDULER",),
+                "width": ("INT", {"min": 16, "max": 16384}),
+                "height": ("INT", {"min": 16, "max": 16384}),
+                "steps": ("INT", {"min": 1, "max": 10000}),
+                "cfg": ("FLOAT", {"min": 0.0, "max": 100.0}),
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE",)
+
+
+class _BenchOutput:
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {"required": {"images": ("IMAGE",), "filename_prefix": ("STRING",)}}
+
+    RETURN_TYPES = ()
+    OUTPUT_NODE = True
+
+
+def reference_validate(node_classes):
+    """Return a full validator in the shape of ComfyUI's ``validate_prompt``.
+
+    Like ComfyUI, it rebuilds ``INPUT_TYPES`` and checks every input of every
+    node upstream of each output; used as the benchmark baseline.
+    """
+
+    def validate_prompt(prompt_id, prompt, partial_execution_targets=None):
+        validated = {}
+
+        def validate_node(node_id):
+            if node_id in validated:
+                return validated[node_id]
+            node = prompt[node_id]
+            spec = node_classes[node["class_type"]].INPUT_TYPES()
+            ok = True
+            for section in ("required", "optional"):
+                for name, definition in spec.get(section, {}).items():
+                    if name not in node["inputs"]:
+                        ok = ok and section == "optional"
+                        continue
+                    value = node["inputs"][name]
+                    if prompt_resolution.is_link(value):
+                        ok = validate_node(value[0]) and ok
+                    elif isinstance(definition[0], list):
+                        ok = ok and value in definition[0]
+                    elif definition[0] in ("INT", "FLOAT"):
+                        options = definition[1] if len(definition) > 1 else {}
+                        ok = ok and options.get("min", value) <= value
+                        ok = ok and value <= options.get("max", value)
+            validated[node_id] = ok
+            return ok
+
+        outputs = []
+        for node_id, node in prompt.items():
+            if not getattr(node_classes[node["class_type"]], "OUTPUT_NODE", False):
+                continue
+            if partial_execution_targets is not None:
+                if node_id not in partial_execution_targets:
+                    continue
+            if validate_node(node_id):
+                outputs.append(node_id)
+        if not outputs:
+            return (False, {"message": "Prompt outputs failed validation"}, [], {})
+        return (True, None, outputs, {})
+
+    return validate_prompt
+
+
+def benchmark_workflow(branches):
+    """Return ``(node classes, prompt)`` with ``branches`` sampler/output chains."""
+    node_classes = prompt_resolution.default_node_classes()
+    node_classes.update(
+        {"Loader": _BenchLoader, "Sampler": _BenchSampler, "Output": _BenchOutput}
+    )
+    prompt = {}
+    for branch in range(branches):
+        base = branch * 7
+        ids = [str(base + offset) for offset in range(7)]
+        prompt[ids[0]] = {
+            "class_type": "Loader",
+            "inputs": {"ckpt_name": f"model_{branch % 500:04d}.safetensors"},
+        }
+        prompt[ids[1]] = {
+            "class_type": "SamplerSelector",
+            "inputs": {"sampler_name": "euler"},
+        }
+        prompt[ids[2]] = {
+            "class_type": "SchedulerSelector",
+            "inputs": {"scheduler": "karras"},
+        }
+        prompt[ids[3]] = {
+            "class_type": "WidthHeightNode",
+            "inputs": {
+                "preset": "custom",
+                "width": 1024,
+                "height": 1024,
+                "swap_dimensions": False,
+            },
+        }
+        prompt[ids[4]] = {"class_type": "SeedHistory", "inputs": {"seed": branch}}
+        prompt[ids[5]] = {
+            "class_type": "Sampler",
+            "inputs": {
+                "model": [ids[0], 0],
+                "seed": [ids[4], 0],
+                "sampler_name": [ids[1], 0],
+                "scheduler": [ids[2], 0],
+                "width": [ids[3], 0],
+                "height": [ids[3], 1],
+                "steps": 20,
+                "cfg": 7.0,
+            },
+        }
+        prompt[ids[6]] = {
+            "class_type": "Output",
+            "inputs": {"images": [ids[5], 0], "filename_prefix": "bench"},
+        }
+    return node_classes, prompt
+
+
+def benchmark(branches=200, submissions=50, clock=time.perf_counter):
+    """Time validating ``submissions`` seed-only changes of a large workflow.
+
+    Returns ``{"full": seconds, "cached": seconds}`` per submission.
+    """
+    node_classes, prompt = benchmark_workflow(branches)
+    full = reference_validate(node_classes)
+    cached = IncrementalValidator(full, ValidationCache(), node_classes).wrap()
+
+    def variants():
+        for submission in range(submissions):
+            variant = dict(prompt)
+            for node_id, node in prompt.items():
+                if node["class_type"] == "SeedHistory":
+                    inputs = {"seed": node["inputs"]["seed"] + submission}
+                    variant[node_id] = dict(node, inputs=inputs)
+            yield variant
+
+    timings = {}
+    for name, validate_prompt in (("full", full), ("cached", cached)):
+        started = clock()
+        for variant in variants():
+            if not validate_prompt("bench", variant, None)[0]:
+                raise RuntimeError("benchmark workflow failed validation")
+        timings[name] = (clock() - started) / submissions
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark cached prompt validation on a synthetic workflow."
+    )
+    parser.add_argument("--branches", type=int, default=200)
+    parser.add_argument("--submissions", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    timings = benchmark(args.branches, args.submissions)
+    print(f"nodes: {args.branches * 7}, seed-only resubmissions: {args.submissions}")
+    for name, seconds in timings.items():
+        print(f"{name:>7}: {seconds * 1000:.2f} ms per prompt")
+    print(f"speedup: {timings['full'] / timings['cached']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
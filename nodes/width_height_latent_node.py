@@ -0,0 +1,98 @@
+try:
+    from . import dimension_snapping as snapping
+    from . import latent_pool
+    from .width_height_node import WidthHeightNode
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import dimension_snapping as snapping
+    import latent_pool
+    from width_height_node import WidthHeightNode
+
+
+def latent_device():
+    """Device ComfyUI uses for empty latents (CPU outside ComfyUI)."""
+    try:
+        import comfy.model_management
+    except ImportError:
+        return "cpu"
+    return comfy.model_management.intermediate_device()
+
+
+class WidthHeightLatent(WidthHeightNode):
+    """Width & Height that also outputs the empty LATENT for that size."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        inputs = super().INPUT_TYPES()
+        inputs["required"]["batch_size"] = (
+            "INT",
+            {"default": 1, "min": 1, "max": 4096},
+        )
+        inputs["required"]["channels"] = (
+            "INT",
+            {
+                "default": 4,
+                "min": 1,
+                "max": 128,
+                "tooltip": "Latent channels (4: SD1.x/SDXL, 16: SD3/FLUX)",
+            },
+        )
+        return inputs
+
+    RETURN_TYPES = ("LATENT", "INT", "INT")
+    RETURN_NAMES = ("latent", "width", "height")
+    FUNCTION = "get_latent"
+
+    def get_size(
+        self,
+        width,
+        height,
+        preset,
+        swap_dimensions,
+        batch_size,
+        channels,
+        snap="off",
+        aspect_tolerance=snapping.DEFAULT_ASPECT_TOLERANCE,
+    ):
+        """Resolve the outputs except the latent (None), without allocating."""
+        output = self.get_dimensions(
+            width, height, preset, swap_dimensions, snap, aspect_tolerance
+        )
+        if isinstance(output, dict):
+            output = output["result"]
+        return (None,) + tuple(output)
+
+    def get_latent(
+        self,
+        width,
+        height,
+        preset,
+        swap_dimensions,
+        batch_size,
+        channels,
+        snap="off",
+        aspect_tolerance=snapping.DEFAULT_ASPECT_TOLERANCE,
+    ):
+        """Resolve the size like WidthHeightNode and emit a pooled latent."""
+        output = self.get_dimensions(
+            width, height, preset, swap_dimensions, snap, aspect_tolerance
+        )
+        report = []
+        if isinstance(output, dict):
+            report = output["ui"]["text"]
+            output = output["result"]
+        width, height = output
+
+        pool = latent_pool.get_latent_pool()
+        hits = pool.stats["hits"]
+        samples = pool.zeros(
+            (batch_size, channels, height // 8, width // 8),
+            device=latent_device(),
+        )
+        source = "pooled" if pool.stats["hits"] > hits else "allocated"
+        saved_ms = pool.stats["saved_seconds"] * 1000
+        report.append(f"latent {source}, saved {saved_ms:.1f} ms so far")
+
+        return {
+            "ui": {"text": [" | ".join(report)]},
+            "result": ({"samples": samples}, width, height),
+        }
@@ -1,5 +1,23 @@
 from nodes import MAX_RESOLUTION
 
+try:
+    from . import dimension_snapping as snapping
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import dimension_snapping as snapping
+
+# SDXL/FLUX resolution presets; every preset's transpose is also a preset.
+PRESETS = [
+    "1024x1024",
+    "1152x896",
+    "896x1152",
+    "1216x832",
+    "832x1216",
+    "1344x768",
+    "768x1344",
+    "1536x640",
+    "640x1536",
+]
+
 
 class WidthHeightNode:
     @classmethod
@@ -27,18 +45,7 @@ class WidthHeightNode:
                     },
                 ),
                 "preset": (
-                    [
-                        "custom",
-                        "1024x1024",
-                        "1152x896",
-                        "896x1152",
-                        "1216x832",
-                        "832x1216",
-                        "1344x768",
-                        "768x1344",
-                        "1536x640",
-                        "640x1536",
-                    ],
+                    ["custom"] + PRESETS,
                     {
                         "default": "custom",
                         "tooltip": "SDXL/FLUX resolution presets",
@@ -48,7 +55,26 @@ class WidthHeightNode:
                     "BOOLEAN",
                     {"default": False, "tooltip": "Swap width and height values"},
                 ),
-            }
+            },
+            "optional": {
+                "snap": (
+                    snapping.SNAP_MODES,
+                    {
+                        "default": "off",
+                        "tooltip": "Round to a kernel-friendly multiple for a model family",
+                    },
+                ),
+                "aspect_tolerance": (
+                    "FLOAT",
+                    {
+                        "default": snapping.DEFAULT_ASPECT_TOLERANCE,
+                        "min": 0.0,
+                        "max": 0.5,
+                        "step": 0.005,
+                        "tooltip": "Allowed relative aspect ratio drift when snapping",
+                    },
+                ),
+            },
         }
 
     RETURN_TYPES = ("INT", "INT")
@@ -56,7 +82,15 @@ class WidthHeightNode:
     FUNCTION = "get_dimensions"
     CATEGORY = "comfyassets/Dimensions"
 
-    def get_dimensions(self, width, height, preset, swap_dimensions):
+    def get_dimensions(
+        self,
+        width,
+        height,
+        preset,
+        swap_dimensions,
+        snap="off",
+        aspect_tolerance=snapping.DEFAULT_ASPECT_TOLERANCE,
+    ):
         """Get width and height values with preset and swap support."""
         # Mapping for swapped presets
         swap_mapping = {
@@ -85,4 +119,12 @@ class WidthHeightNode:
             # Only swap custom dimensions
             width, height = height, width
 
-        return (width, height)
+        alignment = snapping.get_alignment(snap)
+        if alignment is None:
+            return (width, height)
+
+        snapped = snapping.snap_dimensions(
+            width, height, alignment, aspect_tolerance, maximum=MAX_RESOLUTION
+        )
+        report = snapping.describe_adjustment((width, height), snapped, alignment)
+        return {"ui": {"text": [report]}, "result": snapped}
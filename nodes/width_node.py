@@ -1,5 +1,13 @@
 from nodes import MAX_RESOLUTION
 
+try:
+    from . import dimension_snapping as snapping
+except ImportError:  # loaded as a top-level module (tests, CLI)
+    import dimension_snapping as snapping
+
+# SDXL/FLUX width presets
+PRESETS = ["640", "768", "832", "896", "1024", "1152", "1216", "1344", "1536"]
+
 
 class WidthNode:
     @classmethod
@@ -17,24 +25,22 @@ class WidthNode:
                     },
                 ),
                 "preset": (
-                    [
-                        "custom",
-                        "640",
-                        "768",
-                        "832",
-                        "896",
-                        "1024",
-                        "1152",
-                        "1216",
-                        "1344",
-                        "1536",
-                    ],
+                    ["custom"] + PRESETS,
                     {
                         "default": "custom",
                         "tooltip": "SDXL/FLUX width presets",
                     },
                 ),
-            }
+            },
+            "optional": {
+                "snap": (
+                    snapping.SNAP_MODES,
+                    {
+                        "default": "off",
+                        "tooltip": "Round to a kernel-friendly multiple for a model family",
+                    },
+                ),
+            },
         }
 
     RETURN_TYPES = ("INT",)
@@ -42,8 +48,15 @@ class WidthNode:
     FUNCTION = "get_width"
     CATEGORY = "comfyassets/Dimensions"
 
-    def get_width(self, width, preset):
+    def get_width(self, width, preset, snap="off"):
         """Get width value, using preset if not custom."""
         if preset != "custom":
             width = int(preset)
-        return (width,)
+
+        alignment = snapping.get_alignment(snap)
+        if alignment is None:
+            return (width,)
+
+        snapped = snapping.snap_value(width, alignment, maximum=MAX_RESOLUTION)
+        report = snapping.describe_adjustment((width,), (snapped,), alignment)
+        return {"ui": {"text": [report]}, "result": (snapped,)}
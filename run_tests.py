@@ -158,6 +158,16 @@ def test_main_module():
         "WidthNode",
         "HeightNode",
         "WidthHeightNode",
+        "HiResLadderPlanner",
+        "GenerationProfile",
+        "ParameterSpaceSampler",
+        "ResultCacheKey",
+        "CachedImage",
+        "DimensionsFromFile",
+        "WidthHeightLatent",
+        "GenerationCostEstimator",
+        "CachedNoise",
+        "DatasetParameterSource",
     }
     assert set(node_classes.keys()) == expected_nodes
 
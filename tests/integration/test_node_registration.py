@@ -183,3 +183,30 @@ def test_web_directory_configuration():
     # Check if our UI file exists
     ui_file = os.path.join(web_dir, "seed_history_ui.js")
     assert os.path.exists(ui_file), "seed_history_ui.js should exist for SeedHistory UI"
+
+
+def test_web_extensions_register_once():
+    """Test each frontend extension and dimension node is set up by one file."""
+    import os
+    import re
+
+    web_dir = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "web"
+    )
+    extension_names = []
+    dimension_files = []
+    for root, _, files in os.walk(web_dir):
+        for name in files:
+            if not name.endswith(".js"):
+                continue
+            with open(os.path.join(root, name), encoding="utf-8") as handle:
+                source = handle.read()
+            extension_names += re.findall(
+                r'registerExtension\(\{\s*name:\s*"([^"]+)"', source
+            )
+            if "WidthHeightNode" in source:
+                dimension_files.append(name)
+
+    assert extension_names
+    assert len(extension_names) == len(set(extension_names))
+    assert dimension_files == ["dimension_selectors.js"]
@@ -0,0 +1,106 @@
+"""
+Integration tests for the server hooks enabled together.
+"""
+
+import heapq
+import threading
+
+
+def sized_prompt(width, height):
+    """Build an API-format prompt whose size comes from a WidthHeightNode."""
+    return {
+        "1": {"class_type": "SamplerSelector", "inputs": {"sampler_name": "euler"}},
+        "2": {
+            "class_type": "WidthHeightNode",
+            "inputs": {
+                "width": width,
+                "height": height,
+                "preset": "custom",
+                "swap_dimensions": False,
+            },
+        },
+        "3": {
+            "class_type": "EmptyLatentImage",
+            "inputs": {"width": ["2", 0], "height": ["2", 1], "batch_size": 1},
+        },
+        "4": {
+            "class_type": "KSampler",
+            "inputs": {"sampler_name": ["1", 0], "latent_image": ["3", 0]},
+        },
+    }
+
+
+class StandInServer:
+    """Runs on-prompt handlers and queues prompts like ComfyUI's POST /prompt."""
+
+    def __init__(self):
+        self.handlers = []
+        self.prompt_queue = StandInQueue()
+        self.number = 0
+
+    def add_on_prompt_handler(self, handler):
+        self.handlers.append(handler)
+
+    def post(self, prompt_id, prompt):
+        json_data = {"prompt": prompt}
+        for handler in self.handlers:
+            json_data = handler(json_data)
+        item = (self.number, prompt_id, json_data["prompt"])
+        self.prompt_queue.put(item + (json_data.get("extra_data", {}), []))
+        self.number += 1
+
+
+class StandInQueue:
+    """Minimal stand-in for ComfyUI's PromptQueue."""
+
+    def __init__(self):
+        self.mutex = threading.RLock()
+        self.queue = []
+        self.done = []
+
+    def put(self, item):
+        with self.mutex:
+            heapq.heappush(self.queue, item)
+
+    def get(self, timeout=None):
+        with self.mutex:
+            if not self.queue:
+                return None
+            return heapq.heappop(self.queue), len(self.done)
+
+    def task_done(self, item_id, history_result, status=None):
+        self.done.append(item_id)
+
+
+def test_folding_keeps_bucketing_and_profiling(tmp_path):
+    """Test folded prompts are still bucketed by shape and sampled."""
+    import prompt_folding
+    import prompt_profiling
+    import shape_bucketing
+
+    server = StandInServer()
+    prompt_folding.install_prompt_folding(server)
+    shape_bucketing.install_queue_reordering(
+        server.prompt_queue, shape_bucketing.ShapeBucketPolicy(window=4)
+    )
+    profiler = prompt_profiling.PromptProfiler(
+        str(tmp_path), ["SamplerSelector", "WidthHeightNode"], fraction=1.0
+    )
+    prompt_profiling.install_prompt_profiling(server.prompt_queue, profiler)
+
+    server.post("a", sized_prompt(1024, 1024))
+    server.post("b", sized_prompt(512, 512))
+    server.post("c", sized_prompt(1024, 1024))
+
+    order = []
+    while True:
+        result = server.prompt_queue.get(timeout=0)
+        if result is None:
+            break
+        item = result[0]
+        assert "2" not in item[2]  # folded
+        order.append(item[1])
+        server.prompt_queue.task_done(result[1], {})
+
+    assert order == ["a", "c", "b"]
+    assert profiler.profiled == 3
@@ -0,0 +1,436 @@
+"""
+Unit tests for submit-time admission control.
+"""
+
+import asyncio
+import contextvars
+import heapq
+
+import pytest
+
+
+def sampling_prompt(width=1024, height=1024, sampler="euler", steps=20):
+    """Build an API-format prompt with selector nodes feeding a KSampler."""
+    return {
+        "1": {"class_type": "SamplerSelector", "inputs": {"sampler_name": sampler}},
+        "2": {"class_type": "SchedulerSelector", "inputs": {"scheduler": "normal"}},
+        "3": {
+            "class_type": "WidthHeightNode",
+            "inputs": {
+                "width": width,
+                "height": height,
+                "preset": "custom",
+                "swap_dimensions": False,
+            },
+        },
+        "4": {
+            "class_type": "KSampler",
+            "inputs": {
+                "sampler_name": ["1", 0],
+                "scheduler": ["2", 0],
+                "steps": steps,
+            },
+        },
+    }
+
+
+class StandInServer:
+    """Stand-in for the numbering and queueing done by ComfyUI's POST /prompt."""
+
+    def __init__(self):
+        self.number = 0
+        self.handlers = []
+        self.queue = []
+
+    def add_on_prompt_handler(self, handler):
+        self.handlers.append(handler)
+
+    def post(self, json_data, user=""):
+        """Run the handlers as for a request the middleware attributed to ``user``."""
+        import server_hooks
+
+        context = contextvars.copy_context()
+        context.run(server_hooks._requester.set, user)
+        for handler in self.handlers:
+            json_data = context.run(handler, json_data)
+        if "prompt" not in json_data:
+            return None
+        if "number" in json_data:
+            number = float(json_data["number"])
+        else:
+            number = self.number
+            self.number += 1
+        heapq.heappush(self.queue, (number, len(self.queue), json_data))
+        return number
+
+    def drain(self):
+        order = []
+        while self.queue:
+            order.append(heapq.heappop(self.queue)[2]["client_id"])
+        return order
+
+
+class TestPromptCost:
+    """Test pricing prompts from resolved selector nodes."""
+
+    def test_cost_uses_size_steps_and_nfe(self):
+        """Test megapixels x steps x evaluations per step."""
+        from admission_control import prompt_cost
+
+        assert prompt_cost(sampling_prompt(1000, 1000, "euler", 20)) == 20.0
+        assert prompt_cost(sampling_prompt(1000, 1000, "heun", 20)) == 40.0
+        assert prompt_cost(sampling_prompt(2000, 1000, "euler", 10)) == 20.0
+
+    def test_unpriceable_prompts(self):
+        """Test prompts without resolvable size or sampler nodes are not priced."""
+        from admission_control import prompt_cost
+
+        prompt = sampling_prompt()
+        del prompt["3"]
+        assert prompt_cost(prompt) is None
+
+        prompt = sampling_prompt()
+        del prompt["4"]
+        assert prompt_cost(prompt) is None
+
+    def test_latent_node_is_priced(self):
+        """Test WidthHeightLatent is priced like WidthHeightNode, without allocating."""
+        import admission_control as admission
+        import latent_pool
+
+        plain = sampling_prompt(8192, 8192, "heun", 150)
+        prompt = sampling_prompt(8192, 8192, "heun", 150)
+        prompt["3"]["class_type"] = "WidthHeightLatent"
+        prompt["3"]["inputs"].update(batch_size=1, channels=4)
+        misses = latent_pool.get_latent_pool().stats["misses"]
+
+        assert admission.prompt_cost(prompt) == admission.prompt_cost(plain)
+        assert latent_pool.get_latent_pool().stats["misses"] == misses
+        policy = admission.AdmissionPolicy("reject", max_prompt_cost=1000.0)
+        gate = admission.AdmissionGate(policy)
+        assert gate.admit({"prompt": prompt}).action == "reject"
+
+    def test_literal_sizes_are_priced(self):
+        """Test sizes typed into other nodes, e.g. EmptyLatentImage, are priced."""
+        from admission_control import prompt_cost
+
+        prompt = sampling_prompt(steps=10)
+        prompt["3"] = {
+            "class_type": "EmptyLatentImage",
+            "inputs": {"width": 2000, "height": 1000, "batch_size": 1},
+        }
+
+        assert prompt_cost(prompt) == 20.0
+
+    def test_linked_steps_use_default(self):
+        """Test steps linked to an unknown node fall back to the default."""
+        from admission_control import DEFAULT_STEPS, sampling_runs
+
+        prompt = sampling_prompt()
+        prompt["4"]["inputs"]["steps"] = ["9", 0]
+
+        assert sampling_runs(prompt) == [("euler", DEFAULT_STEPS)]
+
+    def test_downscale_prompt(self):
+        """Test dimension nodes are rewritten as swapped-in custom sizes."""
+        from admission_control import downscale_prompt
+
+        prompt = sampling_prompt()
+        prompt["3"]["inputs"].update(preset="832x1216", swap_dimensions=True)
+
+        assert downscale_prompt(prompt, 0.5) == 1
+        assert prompt["3"]["inputs"] == {
+            "width": 608,
+            "height": 416,
+            "preset": "custom",
+            "swap_dimensions": False,
+        }
+
+    def test_downscale_latent_node(self):
+        """Test WidthHeightLatent is rewritten like WidthHeightNode."""
+        from admission_control import downscale_prompt
+
+        prompt = sampling_prompt(2048, 1024)
+        prompt["3"]["class_type"] = "WidthHeightLatent"
+        prompt["3"]["inputs"].update(batch_size=1, channels=4)
+
+        assert downscale_prompt(prompt, 0.5) == 1
+        assert prompt["3"]["inputs"]["width"] == 1024
+        assert prompt["3"]["inputs"]["height"] == 512
+
+
+class TestAdmissionGate:
+    """Test policy enforcement per client id."""
+
+    def test_policy_validation(self):
+        """Test unknown actions are rejected."""
+        from admission_control import AdmissionPolicy
+
+        with pytest.raises(ValueError):
+            AdmissionPolicy("drop")
+
+    def test_reject_over_prompt_limit(self):
+        """Test an oversized prompt loses its prompt and records the reason."""
+        from admission_control import AdmissionGate, AdmissionPolicy
+
+        gate = AdmissionGate(AdmissionPolicy("reject", max_prompt_cost=10.0))
+        json_data = {"prompt": sampling_prompt(1000, 1000), "client_id": "a"}
+
+        decision = gate.admit(json_data)
+
+        assert decision.action == "reject"
+        assert "prompt" not in json_data
+        assert "exceeds the limit" in json_data["admission"]["reason"]
+        assert gate.admit({"prompt": sampling_prompt(500, 500)}).action == "admit"
+
+    def test_downscale_fits_limit(self):
+        """Test downscaling rewrites the prompt to fit the per-prompt limit."""
+        from admission_control import AdmissionGate, AdmissionPolicy
+        from prompt_resolution import resolve_dimensions
+
+        gate = AdmissionGate(AdmissionPolicy("downscale", max_prompt_cost=10.0))
+        json_data = {"prompt": sampling_prompt(2048, 2048), "client_id": "a"}
+
+        decision = gate.admit(json_data)
+
+        assert decision.action == "downscale"
+        assert decision.cost <= 10.0
+        assert resolve_dimensions(json_data["prompt"]) == ((704, 704),)
+
+    def test_downscale_with_exhausted_budget(self):
+        """Test an exhausted budget deprioritizes instead of shrinking to 64x64."""
+        from admission_control import AdmissionGate, AdmissionPolicy
+        from prompt_resolution import resolve_dimensions
+
+        gate = AdmissionGate(AdmissionPolicy("downscale", user_budget=100.0))
+        server = StandInServer()
+
+        def submit():
+            json_data = {"prompt": sampling_prompt(2048, 2048), "client_id": "a"}
+            decision = gate.admit(json_data, server)
+            return decision.action, resolve_dimensions(json_data["prompt"])
+
+        assert submit() == ("admit", ((2048, 2048),))
+        action, sizes = submit()
+        assert action == "downscale" and 64 < sizes[0][0] < 2048
+        assert submit() == ("deprioritize", ((2048, 2048),))
+
+    def test_budget_refills_over_window(self):
+        """Test a user's spend is limited per window and refills."""
+        from admission_control import AdmissionGate, AdmissionPolicy
+
+        now = [0.0]
+        gate = AdmissionGate(
+            AdmissionPolicy("reject", user_budget=50.0, window=100.0),
+            clock=lambda: now[0],
+        )
+
+        def submit(user):
+            json_data = {"prompt": sampling_prompt(1000, 1000), "client_id": "c"}
+            return gate.admit(json_data, user=user).action
+
+        assert [submit("a") for _ in range(3)] == ["admit", "admit", "reject"]
+        assert submit("b") == "admit"  # budgets are per user
+        now[0] = 40.0  # refills 20 of the 10 left
+        assert submit("a") == "admit"
+        assert gate.remaining("a") == pytest.approx(10.0)
+        assert gate.stats["reject"] == 1
+
+    def test_per_user_overrides(self):
+        """Test budgets can be raised for specific users."""
+        from admission_control import AdmissionGate, AdmissionPolicy
+
+        gate = AdmissionGate(
+            AdmissionPolicy("reject", user_budget=10.0, budgets={"vip": 1000.0})
+        )
+
+        assert gate.check({"prompt": sampling_prompt()}, "x").action == "reject"
+        assert gate.check({"prompt": sampling_prompt()}, "vip").action == "admit"
+
+    def test_check_does_not_charge(self):
+        """Test check() leaves the budget and prompt untouched."""
+        from admission_control import AdmissionGate, AdmissionPolicy
+
+        gate = AdmissionGate(AdmissionPolicy("reject", user_budget=25.0))
+        json_data = {"prompt": sampling_prompt(1000, 1000), "client_id": "a"}
+
+        for _ in range(3):
+            assert gate.check(json_data, "a").action == "admit"
+        assert gate.remaining("a") == 25.0
+
+    def test_client_id_does_not_select_budget(self):
+        """Test rotating client ids from one user shares one budget."""
+        from admission_control import AdmissionGate, AdmissionPolicy
+
+        gate = AdmissionGate(AdmissionPolicy("reject", user_budget=50.0))
+
+        actions = [
+            gate.admit(
+                {"prompt": sampling_prompt(1000, 1000), "client_id": f"id-{index}"},
+                user="10.0.0.7",
+            ).action
+            for index in range(3)
+        ]
+
+        assert actions == ["admit", "admit", "reject"]
+
+    def test_full_table_does_not_hand_out_fresh_budgets(self):
+        """Test new users share an overflow bucket while all buckets are in use."""
+        import admission_control as admission
+
+        now = [0.0]
+        gate = admission.AdmissionGate(
+            admission.AdmissionPolicy("reject", user_budget=30.0, window=100.0),
+            clock=lambda: now[0],
+            max_users=2,
+        )
+
+        def submit(user):
+            return gate.admit({"prompt": sampling_prompt(1000, 1000)}, user=user).action
+
+        assert [submit("a"), submit("b")] == ["admit", "admit"]
+        assert [submit("c"), submit("d")] == ["admit", "reject"]
+        assert submit("a") == "reject"  # not evicted and refilled
+        assert admission.OVERFLOW_USER in gate._buckets
+        now[0] = 1000.0  # every bucket refilled: room for new users again
+        assert submit("e") == "admit"
+        assert "e" in gate._buckets
+
+    def test_policy_from_env(self, monkeypatch):
+        """Test the policy is only built when a limit is configured."""
+        from admission_control import policy_from_env
+
+        assert policy_from_env() is None
+
+        monkeypatch.setenv("COMFYASSETS_ADMISSION_USER_BUDGET", "500")
+        monkeypatch.setenv("COMFYASSETS_ADMISSION_BUDGETS", '{"vip": 5000}')
+        monkeypatch.setenv("COMFYASSETS_ADMISSION_ACTION", "downscale")
+        policy = policy_from_env()
+
+        assert policy.action == "downscale"
+        assert policy.budget_for("someone") == 500.0
+        assert policy.budget_for("vip") == 5000.0
+
+
+class TestStandInQueue:
+    """Test admission control in front of a stand-in prompt queue."""
+
+    def test_abusive_client_does_not_delay_others(self):
+        """Test normal clients' queue position is unaffected by a flood."""
+        import admission_control as admission
+
+        def normal_positions(abusive_prompts):
+            server = StandInServer()
+            gate = admission.AdmissionGate(
+                admission.AdmissionPolicy("deprioritize", user_budget=500.0)
+            )
+            admission.install_admission_control(server, gate)
+            for index in range(abusive_prompts):
+                server.post(
+                    {"prompt": sampling_prompt(2048, 2048), "client_id": "bot"},
+                    "10.0.0.66",
+                )
+                if index % 10 == 0 and index < 100:
+                    server.post(
+                        {"prompt": sampling_prompt(), "client_id": "user"}, "10.0.0.7"
+                    )
+            order = server.drain()
+            return [i for i, client in enumerate(order) if client == "user"]
+
+        flood = normal_positions(100)
+
+        # Only the abusive client's in-budget prompts can run ahead of others
+        assert len(flood) == 10
+        assert max(flood) < 10 + 6
+        assert normal_positions(1000) == flood
+
+    def test_rejects_leave_queue_untouched(self):
+        """Test rejected prompts never reach the queue."""
+        import admission_control as admission
+
+        server = StandInServer()
+        admission.install_admission_control(
+            server,
+            admission.AdmissionGate(
+                admission.AdmissionPolicy("reject", max_prompt_cost=30.0)
+            ),
+        )
+
+        assert server.post({"prompt": sampling_prompt(), "client_id": "a"}) == 0
+        assert server.post({"prompt": sampling_prompt(2048, 2048)}) is None
+        assert len(server.queue) == 1
+
+    def test_middleware_returns_429(self):
+        """Test POST /prompt answers rejected prompts before the route runs."""
+        pytest.importorskip("aiohttp")
+        import admission_control as admission
+        from aiohttp import web
+        from aiohttp.test_utils import TestClient, TestServer
+
+        server = StandInServer()
+        server.app = web.Application()
+        admission.install_admission_control(
+            server,
+            admission.AdmissionGate(
+                admission.AdmissionPolicy("reject", max_prompt_cost=30.0)
+            ),
+        )
+
+        async def post_prompt(request):
+            json_data = server.post(await request.json())
+            return web.json_response({"number": json_data})
+
+        server.app.router.add_post("/prompt", post_prompt)
+
+        async def main():
+            async with TestClient(TestServer(server.app)) as client:
+                small = await client.post(
+                    "/prompt", json={"prompt": sampling_prompt(), "client_id": "a"}
+                )
+                large = await client.post(
+                    "/prompt", json={"prompt": sampling_prompt(4096, 4096)}
+                )
+                return small.status, large.status, await large.json()
+
+        small_status, large_status, body = asyncio.run(main())
+
+        assert small_status == 200
+        assert large_status == 429
+        assert body["error"]["type"] == "admission_rejected"
+        assert len(server.queue) == 1
+
+    def test_middleware_charges_the_sender(self):
+        """Test prompts are charged to the remote address, not the client id."""
+        pytest.importorskip("aiohttp")
+        import admission_control as admission
+        from aiohttp import web
+        from aiohttp.test_utils import TestClient, TestServer
+
+        server = StandInServer()
+        server.app = web.Application()
+        gate = admission.AdmissionGate(
+            admission.AdmissionPolicy("reject", user_budget=30.0)
+        )
+        admission.install_admission_control(server, gate)
+
+        async def post_prompt(request):
+            json_data = await request.json()
+            for handler in server.handlers:
+                json_data = handler(json_data)
+            return web.json_response({"queued": "prompt" in json_data})
+
+        server.app.router.add_post("/prompt", post_prompt)
+
+        async def main():
+            async with TestClient(TestServer(server.app)) as client:
+                statuses = []
+                for client_id in ("a", "b"):
+                    response = await client.post(
+                        "/prompt",
+                        json={"prompt": sampling_prompt(), "client_id": client_id},
+                    )
+                    statuses.append(response.status)
+                return statuses
+
+        assert asyncio.run(main()) == [200, 429]
+        assert gate.remaining("127.0.0.1") < 10.0
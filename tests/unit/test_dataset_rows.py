@@ -0,0 +1,169 @@
+"""
+Unit tests for indexed random access to parameter files and the Dataset Parameter Source node.
+"""
+
+import json
+import os
+
+import pytest
+
+
+def write_csv(path, rows, header="sampler_name,scheduler,seed,width,height"):
+    """Write a CSV parameter file with one line per row."""
+    lines = [header] + [",".join(str(value) for value in row) for row in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def sample_rows(count):
+    samplers = ["euler", "dpmpp_2m", "heun"]
+    return [
+        (samplers[index % 3], "karras", index, 512 + 8 * (index % 4), 768)
+        for index in range(count)
+    ]
+
+
+class TestRowIndex:
+    """Test the sparse byte-offset index."""
+
+    def test_random_access_matches_rows(self, tmp_path):
+        """Test every row is read back correctly with a small stride."""
+        from dataset_rows import RowIndex
+
+        rows = sample_rows(50)
+        index = RowIndex(write_csv(tmp_path / "params.csv", rows), stride=8)
+
+        assert index.row_count == 50
+        assert len(index.offsets) == 7
+        for row in (0, 7, 8, 9, 33, 49):
+            values = index.read_row(row)
+            assert values["sampler_name"] == rows[row][0]
+            assert int(values["seed"]) == row
+
+    def test_jsonl_and_blank_lines(self, tmp_path):
+        """Test JSONL rows are read and blank lines are skipped."""
+        from dataset_rows import RowIndex
+
+        path = tmp_path / "params.jsonl"
+        lines = []
+        for seed in range(5):
+            lines.append(json.dumps({"sampler_name": "euler", "seed": seed}))
+            lines.append("")
+        path.write_text("\n".join(lines), encoding="utf-8")
+        index = RowIndex(str(path), stride=2)
+
+        assert index.row_count == 5
+        assert index.read_row(3)["seed"] == 3
+
+    def test_out_of_range_and_formats(self, tmp_path):
+        """Test bad rows and unsupported files are rejected."""
+        from dataset_rows import RowIndex
+
+        index = RowIndex(write_csv(tmp_path / "params.csv", sample_rows(3)))
+        with pytest.raises(ValueError, match="out of range"):
+            index.read_row(3)
+        (tmp_path / "params.txt").write_text("x\n")
+        with pytest.raises(ValueError):
+            RowIndex(str(tmp_path / "params.txt"))
+
+    def test_index_is_cached_by_mtime(self, tmp_path):
+        """Test the index is reused until the file changes."""
+        from dataset_rows import get_row_index
+
+        path = write_csv(tmp_path / "params.csv", sample_rows(3))
+        first = get_row_index(path)
+
+        assert get_row_index(path) is first
+        write_csv(tmp_path / "params.csv", sample_rows(4))
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert get_row_index(path).row_count == 4
+
+
+class TestParseRow:
+    """Test validation against the KSampler lists."""
+
+    def test_valid_row(self):
+        """Test values are converted to the selector output types."""
+        import comfy.samplers
+        from dataset_rows import parse_row
+
+        values = {
+            "sampler_name": "euler",
+            "scheduler": " karras",
+            "seed": "42",
+            "width": "832",
+            "height": 1216,
+        }
+        assert parse_row(
+            values,
+            comfy.samplers.KSampler.SAMPLERS,
+            comfy.samplers.KSampler.SCHEDULERS,
+            8192,
+        ) == ("euler", "karras", 42, 832, 1216)
+
+    @pytest.mark.parametrize(
+        "override, message",
+        [
+            ({"sampler_name": "bogus"}, "unknown sampler"),
+            ({"scheduler": "bogus"}, "unknown scheduler"),
+            ({"seed": "abc"}, "not an integer"),
+            ({"seed": -1}, "out of range"),
+            ({"width": 9000}, "between"),
+        ],
+    )
+    def test_invalid_rows(self, override, message):
+        """Test invalid values name the row and the problem."""
+        import comfy.samplers
+        from dataset_rows import parse_row
+
+        values = {
+            "sampler_name": "euler",
+            "scheduler": "normal",
+            "seed": 1,
+            "width": 512,
+            "height": 512,
+        }
+        values.update(override)
+        with pytest.raises(ValueError, match=message):
+            parse_row(
+                values,
+                comfy.samplers.KSampler.SAMPLERS,
+                comfy.samplers.KSampler.SCHEDULERS,
+                8192,
+                row=5,
+            )
+
+    def test_missing_columns(self):
+        """Test missing columns are listed."""
+        from dataset_rows import parse_row
+
+        with pytest.raises(ValueError, match="seed, width, height"):
+            parse_row({"sampler_name": "euler", "scheduler": "normal"}, [], [], 8192)
+
+
+class TestDatasetParameterSource:
+    """Test the node outputs."""
+
+    def test_read_row(self, tmp_path):
+        """Test the node returns the selector outputs plus the row count."""
+        from dataset_source_node import DatasetParameterSource
+
+        path = write_csv(tmp_path / "params.csv", sample_rows(20))
+
+        assert DatasetParameterSource().read_row(path, 4) == (
+            "dpmpp_2m",
+            "karras",
+            4,
+            512,
+            768,
+            20,
+        )
+
+    def test_return_types_match(self):
+        """Test RETURN_TYPES and RETURN_NAMES line up."""
+        from dataset_source_node import DatasetParameterSource
+
+        assert len(DatasetParameterSource.RETURN_TYPES) == len(
+            DatasetParameterSource.RETURN_NAMES
+        )
@@ -0,0 +1,102 @@
+"""
+Unit tests for kernel-friendly dimension snapping.
+"""
+
+import pytest
+
+
+class TestSnapHelpers:
+    """Test the shared snapping helpers."""
+
+    def test_alignment_lookup(self):
+        """Test snap modes map to their alignment."""
+        import dimension_snapping as snapping
+
+        assert snapping.get_alignment("off") is None
+        assert snapping.SNAP_MODES[0] == "off"
+        for mode, alignment in snapping.SNAP_ALIGNMENTS.items():
+            assert snapping.get_alignment(mode) == alignment
+        assert sorted(snapping.SNAP_ALIGNMENTS.values()) == [8, 16, 64, 128]
+
+    def test_unknown_mode(self):
+        """Test unknown snap modes are rejected."""
+        from dimension_snapping import get_alignment
+
+        with pytest.raises(ValueError):
+            get_alignment("bogus")
+
+    def test_snap_value_rounds_to_nearest(self):
+        """Test single values round to the nearest multiple."""
+        from dimension_snapping import snap_value
+
+        assert snap_value(1000, 64) == 1024
+        assert snap_value(1070, 64) == 1088
+        assert snap_value(1000, 128) == 1024
+        assert snap_value(1024, 128) == 1024
+
+    def test_snap_value_clamps(self):
+        """Test snapped values stay inside the valid range."""
+        from dimension_snapping import snap_value
+
+        assert snap_value(64, 128) == 128
+        assert snap_value(8190, 128, maximum=8192) == 8192
+        assert snap_value(8190, 64, maximum=8100) == 8064
+
+    def test_snap_dimensions_keeps_aspect(self):
+        """Test pairs keep their aspect ratio within tolerance."""
+        from dimension_snapping import snap_dimensions
+
+        width, height = snap_dimensions(1000, 500, 64, 0.02)
+        assert width % 64 == 0 and height % 64 == 0
+        assert abs(width / height - 2.0) / 2.0 <= 0.02
+
+    def test_snap_dimensions_falls_back_to_smallest_error(self):
+        """Test the closest aspect wins when nothing is within tolerance."""
+        from dimension_snapping import snap_dimensions
+
+        width, height = snap_dimensions(1000, 600, 128, 0.0)
+        assert (width, height) == (1024, 640)
+
+    def test_describe_adjustment(self):
+        """Test adjustment reports."""
+        from dimension_snapping import describe_adjustment
+
+        assert "already aligned" in describe_adjustment((1024,), (1024,), 64)
+        report = describe_adjustment((1000, 600), (1024, 640), 128)
+        assert "1000x600 -> 1024x640" in report
+        assert "aspect" in report
+
+
+class TestNodeSnapping:
+    """Test the snap input on the dimension nodes."""
+
+    def test_snap_off_keeps_plain_result(self, width_node, height_node):
+        """Test nodes keep returning plain tuples when snapping is off."""
+        assert width_node.get_width(1000, "custom", "off") == (1000,)
+        assert height_node.get_height(1000, "custom") == (1000,)
+
+    def test_width_snap_reports(self, width_node):
+        """Test WidthNode snaps and reports the adjustment."""
+        result = width_node.get_width(1000, "custom", "torch.compile (128)")
+        assert result["result"] == (1024,)
+        assert result["ui"]["text"] == ["1000 -> 1024 (aligned to 128)"]
+
+    def test_height_snap_applies_to_presets(self, height_node):
+        """Test HeightNode snaps preset values too."""
+        result = height_node.get_height(512, "832", "torch.compile (128)")
+        assert result["result"][0] % 128 == 0
+
+    def test_width_height_snap(self, width_height_node):
+        """Test WidthHeightNode snaps after resolving presets and swaps."""
+        result = width_height_node.get_dimensions(
+            512, 768, "1216x832", True, "sd1.x/sdxl (64)"
+        )
+        width, height = result["result"]
+        assert width % 64 == 0 and height % 64 == 0
+        assert width < height
+
+    def test_optional_inputs_declared(self, all_nodes):
+        """Test all dimension nodes expose the snap input."""
+        for name in ("WidthNode", "HeightNode", "WidthHeightNode"):
+            optional = all_nodes[name].INPUT_TYPES()["optional"]
+            assert optional["snap"][1]["default"] == "off"
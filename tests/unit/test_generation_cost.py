@@ -0,0 +1,91 @@
+"""
+Unit tests for NFE-aware generation cost estimates.
+"""
+
+import pytest
+
+
+class TestGenerationCost:
+    """Test the cost helpers."""
+
+    def test_nfe_table(self):
+        """Test singlestep samplers cost more evaluations per step."""
+        from generation_cost import nfe_per_step
+
+        assert nfe_per_step("euler") == 1
+        assert nfe_per_step("dpmpp_2m_sde") == 1
+        assert nfe_per_step("heun") == 2
+        assert nfe_per_step("dpmpp_sde") == 2
+        assert nfe_per_step("some_new_sampler") == 1
+
+    def test_every_mock_sampler_has_an_entry(self):
+        """Test the table covers the samplers ComfyUI ships."""
+        import comfy.samplers
+        from generation_cost import SAMPLER_NFE
+
+        missing = set(comfy.samplers.KSampler.SAMPLERS) - set(SAMPLER_NFE)
+        assert not missing
+
+    def test_estimate_cost(self):
+        """Test evaluations, pixel-steps and seconds scale as expected."""
+        from generation_cost import estimate_cost
+
+        cost = estimate_cost("heun", 20, 1000, 1000, 0.5, batch_size=2)
+
+        assert cost["evaluations"] == 40
+        assert cost["latent_pixel_steps"] == 125 * 125 * 40 * 2
+        assert cost["seconds"] == pytest.approx(0.5 * 40 * 2)
+
+    def test_cost_exponent(self):
+        """Test the exponent makes larger images disproportionately costly."""
+        from generation_cost import estimate_cost
+
+        small = estimate_cost("euler", 10, 1000, 1000, 1.0, cost_exponent=1.5)
+        large = estimate_cost("euler", 10, 2000, 2000, 1.0, cost_exponent=1.5)
+
+        assert large["seconds"] == pytest.approx(small["seconds"] * 8)
+
+    def test_steps_for_budget(self):
+        """Test the suggested steps fit the time budget."""
+        from generation_cost import estimate_cost, steps_for_budget
+
+        steps = steps_for_budget("heun", 1024, 1024, 0.1, 10.0)
+
+        assert estimate_cost("heun", steps, 1024, 1024, 0.1)["seconds"] <= 10.0
+        assert estimate_cost("heun", steps + 1, 1024, 1024, 0.1)["seconds"] > 10.0
+        assert steps_for_budget("euler", 1024, 1024, 0.0, 10.0) == 0
+
+
+class TestGenerationCostEstimatorNode:
+    """Test the GenerationCostEstimator node."""
+
+    def test_outputs(self):
+        """Test the node outputs match the helper estimate."""
+        from cost_estimator_node import GenerationCostEstimator
+
+        evaluations, pixel_steps, seconds, suggested = (
+            GenerationCostEstimator().estimate("dpm_2", "karras", 30, 1024, 1024, 0.2)
+        )
+
+        assert evaluations == 60
+        assert pixel_steps == 128 * 128 * 60
+        assert seconds > 0
+        assert suggested == 30
+
+    def test_time_budget_suggests_steps(self):
+        """Test a budget changes the suggested step count."""
+        from cost_estimator_node import GenerationCostEstimator
+
+        result = GenerationCostEstimator().estimate(
+            "euler", "normal", 30, 1000, 1000, 1.0, time_budget=12.0
+        )
+
+        assert result[3] == 12
+
+    def test_return_types_match(self):
+        """Test RETURN_TYPES and RETURN_NAMES line up."""
+        from cost_estimator_node import GenerationCostEstimator
+
+        assert len(GenerationCostEstimator.RETURN_TYPES) == len(
+            GenerationCostEstimator.RETURN_NAMES
+        )
@@ -0,0 +1,131 @@
+"""
+Unit tests for the GenerationProfile node and its profile store.
+"""
+
+import json
+import os
+
+import pytest
+
+
+def write_profiles(path, profiles):
+    path.write_text(json.dumps(profiles))
+
+
+PORTRAIT = {
+    "sampler_name": "heun",
+    "scheduler": "karras",
+    "seed": 7,
+    "width": 832,
+    "height": 1216,
+    "steps": 25,
+    "cfg": 5.5,
+}
+
+
+class TestProfileStore:
+    """Test the indexed profile store."""
+
+    def test_defaults_available(self):
+        """Test built-in profiles are loaded without a file."""
+        from profile_store import DEFAULT_PROFILES, ProfileStore
+
+        store = ProfileStore()
+        assert store.names() == sorted(DEFAULT_PROFILES)
+        assert store.get("sdxl-fast")["steps"] == 20
+
+    def test_file_profiles_override_and_extend(self, tmp_path):
+        """Test profiles from the JSON file are merged by name."""
+        from profile_store import ProfileStore
+
+        path = tmp_path / "profiles.json"
+        write_profiles(path, {"portrait": PORTRAIT})
+        store = ProfileStore(str(path))
+
+        assert "portrait" in store.names()
+        assert store.get("portrait")["cfg"] == 5.5
+
+    def test_reload_on_change(self, tmp_path):
+        """Test the store picks up edits to the profile file."""
+        from profile_store import ProfileStore
+
+        path = tmp_path / "profiles.json"
+        write_profiles(path, {"portrait": PORTRAIT})
+        store = ProfileStore(str(path))
+        version = store.version
+
+        write_profiles(path, {"portrait": dict(PORTRAIT, steps=40)})
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert store.get("portrait")["steps"] == 40
+        assert store.version != version
+
+    def test_invalid_profiles_rejected(self, tmp_path):
+        """Test unknown samplers and invalid sizes are rejected."""
+        from profile_store import validate_profile
+
+        with pytest.raises(ValueError, match="sampler"):
+            validate_profile("bad", dict(PORTRAIT, sampler_name="nope"))
+        with pytest.raises(ValueError, match="scheduler"):
+            validate_profile("bad", dict(PORTRAIT, scheduler="nope"))
+        for width in (1000 + 1, 32, 8192 + 8):
+            with pytest.raises(ValueError, match="multiple of 8 from 64 to 8192"):
+                validate_profile("bad", dict(PORTRAIT, width=width))
+        with pytest.raises(ValueError, match="missing"):
+            validate_profile("bad", {"sampler_name": "euler"})
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "{not json",
+            "[1, 2]",
+            json.dumps({"portrait": dict(PORTRAIT, sampler_name="nope")}),
+            json.dumps({"portrait": "euler"}),
+        ],
+    )
+    def test_invalid_file_falls_back_to_defaults(self, tmp_path, caplog, text):
+        """Test a broken profile file is logged and the defaults are kept."""
+        from profile_store import DEFAULT_PROFILES, ProfileStore
+
+        path = tmp_path / "profiles.json"
+        path.write_text(text)
+        store = ProfileStore(str(path))
+
+        assert store.names() == sorted(DEFAULT_PROFILES)
+        assert "Ignoring invalid profile file" in caplog.text
+
+    def test_unknown_profile(self):
+        """Test unknown names raise a clear error."""
+        from profile_store import ProfileStore
+
+        with pytest.raises(ValueError, match="Unknown generation profile"):
+            ProfileStore().get("missing")
+
+
+class TestGenerationProfileNode:
+    """Test the GenerationProfile node."""
+
+    def test_outputs_all_parameters(self):
+        """Test the node outputs every parameter in one execution."""
+        from generation_profile_node import GenerationProfile
+
+        result = GenerationProfile().get_profile("sdxl-quality")
+        assert result == ("dpmpp_2m", "karras", 0, 1024, 1024, 30, 7.0)
+        assert len(result) == len(GenerationProfile.RETURN_TYPES)
+
+    def test_seed_override(self):
+        """Test a non-negative seed input overrides the profile seed."""
+        from generation_profile_node import GenerationProfile
+
+        result = GenerationProfile().get_profile("sdxl-fast", seed=1234)
+        assert result[2] == 1234
+
+    def test_input_types(self):
+        """Test the profile combo lists the store's profiles."""
+        from generation_profile_node import GenerationProfile
+        from profile_store import get_profile_store
+
+        required = GenerationProfile.INPUT_TYPES()["required"]
+        assert required["profile"][0] == get_profile_store().names()
+        assert GenerationProfile.CATEGORY == "comfyassets/Generation"
@@ -0,0 +1,121 @@
+"""
+Unit tests for the hi-res fix resolution ladder planner.
+"""
+
+import pytest
+
+
+class TestPlanLadder:
+    """Test the ladder planning function."""
+
+    def test_direct_jump_when_allowed(self):
+        """Test a single pass is planned when the scale limit allows it."""
+        from hires_ladder_node import pass_cost, plan_ladder
+
+        ladder, total = plan_ladder((832, 1216), (1664, 2432), 1.0, max_scale=2.0)
+        assert ladder == [(1664, 2432)]
+        assert total == pytest.approx(
+            pass_cost((832, 1216), 1.0) + pass_cost((1664, 2432), 1.0)
+        )
+
+    def test_intermediate_passes_respect_limits(self):
+        """Test each pass stays under the scale limit and is snapped."""
+        from hires_ladder_node import plan_ladder
+
+        ladder, _ = plan_ladder((832, 1216), (1664, 2432), 1.0, max_scale=1.5)
+        assert ladder[-1] == (1664, 2432)
+        assert len(ladder) == 2
+
+        previous = (832, 1216)
+        for width, height in ladder:
+            assert width % 8 == 0 and height % 8 == 0
+            assert max(width / previous[0], height / previous[1]) <= 1.5 + 1e-9
+            previous = (width, height)
+
+    def test_cheapest_intermediate_is_chosen(self):
+        """Test the planner keeps intermediate passes as small as possible."""
+        from hires_ladder_node import plan_ladder
+
+        ladder, _ = plan_ladder((832, 1216), (1664, 2432), 1.0, max_scale=1.5)
+        width, height = ladder[0]
+        assert 1664 / width <= 1.5
+        assert 1664 / (width - 8) > 1.5
+
+    def test_overhead_and_alignment(self):
+        """Test per-pass overhead and coarser snapping."""
+        from hires_ladder_node import plan_ladder
+
+        ladder, total = plan_ladder(
+            (1024, 1024), (2048, 2048), 0.0, 1.5, alignment=64, pass_overhead=2.0
+        )
+        assert all(w % 64 == 0 and h % 64 == 0 for w, h in ladder)
+        assert total == pytest.approx(2.0 * (len(ladder) + 1))
+
+    def test_same_size_needs_no_passes(self):
+        """Test planning to the base size yields an empty ladder."""
+        from hires_ladder_node import plan_ladder
+
+        ladder, total = plan_ladder((1024, 1024), (1024, 1024), 2.0)
+        assert ladder == []
+        assert total == pytest.approx(2.0 * 1.048576)
+
+    def test_unreachable_target_raises(self):
+        """Test a scale limit the aligned sizes cannot meet is an error."""
+        from hires_ladder_node import plan_ladder
+
+        with pytest.raises(ValueError, match="within 1.05x per pass"):
+            plan_ladder((832, 1216), (1664, 2432), 1.0, 1.05, 128)
+
+    def test_candidates_are_refined_until_reachable(self, monkeypatch):
+        """Test a coarse candidate grid is refined instead of breaking the limit."""
+        import hires_ladder_node
+        from hires_ladder_node import plan_ladder
+
+        monkeypatch.setattr(hires_ladder_node, "MAX_CANDIDATES", 4)
+        ladder, _ = plan_ladder((832, 1216), (1664, 2432), 1.0, 1.05)
+
+        previous = (832, 1216)
+        for width, height in ladder:
+            assert max(width / previous[0], height / previous[1]) <= 1.05 + 1e-9
+            previous = (width, height)
+        assert previous == (1664, 2432)
+
+    def test_invalid_scale(self):
+        """Test a scale limit of 1 or less is rejected."""
+        from hires_ladder_node import plan_ladder
+
+        with pytest.raises(ValueError):
+            plan_ladder((512, 512), (1024, 1024), 1.0, max_scale=1.0)
+
+
+class TestHiResLadderPlanner:
+    """Test the planner node."""
+
+    def test_node_outputs_lists(self):
+        """Test the node returns list outputs plus cost and pass count."""
+        from hires_ladder_node import HiResLadderPlanner
+
+        node = HiResLadderPlanner()
+        widths, heights, total, passes = node.plan(832, 1216, 1664, 2432, 1.0, 1.5)
+        assert passes == len(widths) == len(heights) == 2
+        assert (widths[-1], heights[-1]) == (1664, 2432)
+        assert total > 0
+        assert HiResLadderPlanner.OUTPUT_IS_LIST == (True, True, False, False)
+
+    def test_node_same_size_is_one_pass(self):
+        """Test planning to the base size still outputs the target once."""
+        from hires_ladder_node import HiResLadderPlanner, pass_cost
+
+        widths, heights, total, passes = HiResLadderPlanner().plan(
+            1024, 1024, 1024, 1024, 2.0, 1.5
+        )
+        assert (widths, heights, passes) == ([1024], [1024], 1)
+        assert total == pytest.approx(2 * pass_cost((1024, 1024), 2.0))
+
+    def test_node_structure(self):
+        """Test node category and inputs."""
+        from hires_ladder_node import HiResLadderPlanner
+
+        assert HiResLadderPlanner.CATEGORY == "comfyassets/Dimensions"
+        required = HiResLadderPlanner.INPUT_TYPES()["required"]
+        assert "cost_per_megapixel" in required
@@ -0,0 +1,151 @@
+"""
+Unit tests for header-only image dimension reading and its node.
+"""
+
+import struct
+import zlib
+
+import pytest
+
+
+def png_bytes(width, height):
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    crc = zlib.crc32(b"IHDR" + header) & 0xFFFFFFFF
+    ihdr = struct.pack(">I", len(header)) + b"IHDR" + header + struct.pack(">I", crc)
+    return b"\x89PNG\r\n\x1a\n" + ihdr + b"\x00" * 64
+
+
+def gif_bytes(width, height):
+    return b"GIF89a" + struct.pack("<HH", width, height) + b"\x00" * 32
+
+
+def webp_bytes(chunk, payload):
+    body = b"WEBP" + chunk + struct.pack("<I", len(payload)) + payload
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def vp8_payload(width, height):
+    return b"\x00\x00\x00" + b"\x9d\x01\x2a" + struct.pack("<HH", width, height)
+
+
+def vp8l_payload(width, height):
+    bits = (width - 1) | ((height - 1) << 14)
+    return b"\x2f" + struct.pack("<I", bits) + b"\x00" * 8
+
+
+def vp8x_payload(width, height):
+    return (
+        b"\x00" * 4
+        + (width - 1).to_bytes(3, "little")
+        + (height - 1).to_bytes(3, "little")
+    )
+
+
+def jpeg_bytes(width, height, orientation=None, padding=0):
+    segments = [b"\xff\xd8"]
+    app0 = b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00" + b"\x00" * padding
+    segments.append(b"\xff\xe0" + struct.pack(">H", len(app0) + 2) + app0)
+    if orientation is not None:
+        entry = struct.pack("<HHIHH", 0x0112, 3, 1, orientation, 0)
+        tiff = b"II*\x00" + struct.pack("<I", 8) + struct.pack("<H", 1) + entry
+        app1 = b"Exif\x00\x00" + tiff + b"\x00\x00\x00\x00"
+        segments.append(b"\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1)
+    sof = struct.pack(">BHHB", 8, height, width, 3) + b"\x00" * 9
+    segments.append(b"\xff\xc0" + struct.pack(">H", len(sof) + 2) + sof)
+    segments.append(b"\xff\xd9")
+    return b"".join(segments)
+
+
+class TestReadImageSize:
+    """Test header parsing for every supported format."""
+
+    @pytest.mark.parametrize(
+        "name, data, expected",
+        [
+            ("a.png", png_bytes(1216, 832), (1216, 832)),
+            ("a.gif", gif_bytes(320, 200), (320, 200)),
+            ("a.webp", webp_bytes(b"VP8 ", vp8_payload(640, 480)), (640, 480)),
+            ("b.webp", webp_bytes(b"VP8L", vp8l_payload(1024, 768)), (1024, 768)),
+            ("c.webp", webp_bytes(b"VP8X", vp8x_payload(4000, 3000)), (4000, 3000)),
+            ("a.jpg", jpeg_bytes(1920, 1080), (1920, 1080)),
+            ("b.jpg", jpeg_bytes(1920, 1080, padding=60000), (1920, 1080)),
+        ],
+    )
+    def test_formats(self, tmp_path, name, data, expected):
+        """Test dimensions are read from each header format."""
+        from image_header import read_image_size
+
+        path = tmp_path / name
+        path.write_bytes(data)
+        assert read_image_size(str(path)) == expected
+
+    def test_jpeg_exif_orientation_swaps(self, tmp_path):
+        """Test rotated JPEGs report their displayed size like LoadImage."""
+        from image_header import read_image_size
+
+        rotated = tmp_path / "rotated.jpg"
+        rotated.write_bytes(jpeg_bytes(1920, 1080, orientation=6))
+        upright = tmp_path / "upright.jpg"
+        upright.write_bytes(jpeg_bytes(1920, 1080, orientation=1))
+
+        assert read_image_size(str(rotated)) == (1080, 1920)
+        assert read_image_size(str(upright)) == (1920, 1080)
+
+    def test_unsupported_file(self, tmp_path):
+        """Test unknown formats raise a clear error."""
+        from image_header import UnsupportedImageError, read_image_size
+
+        path = tmp_path / "a.txt"
+        path.write_bytes(b"hello world")
+        with pytest.raises(UnsupportedImageError):
+            read_image_size(str(path))
+
+    def test_cache_invalidated_on_change(self, tmp_path):
+        """Test a rewritten file is re-read rather than served from cache."""
+        import os
+
+        from image_header import read_image_size
+
+        path = tmp_path / "a.png"
+        path.write_bytes(png_bytes(512, 512))
+        assert read_image_size(str(path)) == (512, 512)
+
+        path.write_bytes(png_bytes(768, 512))
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert read_image_size(str(path)) == (768, 512)
+
+
+class TestDimensionsFromFile:
+    """Test the DimensionsFromFile node."""
+
+    def test_plain_swap_and_snap(self, tmp_path):
+        """Test swap and snapping follow the Width & Height node."""
+        from image_dimensions_node import DimensionsFromFile
+
+        path = tmp_path / "ref.png"
+        path.write_bytes(png_bytes(1000, 600))
+        node = DimensionsFromFile()
+
+        assert node.get_dimensions(str(path), False) == (1000, 600)
+        assert node.get_dimensions(str(path), True) == (600, 1000)
+
+        result = node.get_dimensions(str(path), False, snap="sd1.x/sdxl (64)")
+        width, height = result["result"]
+        assert width % 64 == 0 and height % 64 == 0
+        assert result["ui"]["text"]
+
+    def test_is_changed_tracks_mtime(self, tmp_path):
+        """Test IS_CHANGED changes when the file does."""
+        import os
+
+        from image_dimensions_node import DimensionsFromFile
+
+        path = tmp_path / "ref.png"
+        path.write_bytes(png_bytes(64, 64))
+        before = DimensionsFromFile.IS_CHANGED(str(path))
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert DimensionsFromFile.IS_CHANGED(str(path)) != before
+        assert DimensionsFromFile.IS_CHANGED(str(tmp_path / "missing.png")) == ""
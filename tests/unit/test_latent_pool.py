@@ -0,0 +1,120 @@
+"""
+Unit tests for the pooled empty-latent buffers and the Width & Height Latent node.
+"""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+
+class TestLatentPool:
+    """Test buffer reuse, re-zeroing and eviction."""
+
+    def test_reuses_buffers_per_key(self):
+        """Test equal shapes share a buffer and other shapes do not."""
+        from latent_pool import LatentPool
+
+        pool = LatentPool(1024**2)
+        first = pool.zeros((1, 4, 8, 8))
+        second = pool.zeros((1, 4, 8, 8))
+        other = pool.zeros((1, 4, 8, 16))
+
+        assert first is second
+        assert other is not first
+        assert pool.stats["hits"] == 1
+        assert pool.stats["misses"] == 2
+        assert torch.count_nonzero(second) == 0
+
+    def test_modified_buffer_is_zeroed_again(self):
+        """Test in-place writes by a consumer are undone before reuse."""
+        from latent_pool import LatentPool
+
+        pool = LatentPool(1024**2)
+        tensor = pool.zeros((1, 4, 8, 8))
+        tensor.add_(1.0)
+
+        assert torch.count_nonzero(pool.zeros((1, 4, 8, 8))) == 0
+        assert pool.stats["rezeroed"] == 1
+
+    def test_byte_cap_evicts_least_recently_used(self):
+        """Test the pool stays under its byte cap."""
+        from latent_pool import LatentPool
+
+        size = 4 * 8 * 8 * 4  # one float32 latent
+        pool = LatentPool(2 * size)
+        a = pool.zeros((1, 4, 8, 8))
+        b = pool.zeros((1, 8, 4, 8))
+        pool.zeros((1, 4, 8, 8))  # b is now the least recently used
+        pool.zeros((1, 4, 4, 16))
+
+        assert pool.pooled_bytes == 2 * size
+        assert pool.stats["evictions"] == 1
+        assert pool.zeros((1, 4, 8, 8)) is a
+        assert pool.zeros((1, 8, 4, 8)) is not b
+
+    def test_oversized_buffers_are_not_pooled(self):
+        """Test tensors larger than the cap bypass the pool."""
+        from latent_pool import LatentPool
+
+        pool = LatentPool(16)
+        first = pool.zeros((1, 4, 8, 8))
+
+        assert pool.pooled_bytes == 0
+        assert pool.zeros((1, 4, 8, 8)) is not first
+
+    def test_saved_time_is_reported(self):
+        """Test hits accumulate the estimated allocation time saved."""
+        from latent_pool import LatentPool
+
+        pool = LatentPool(64 * 1024**2)
+        pool.zeros((4, 4, 128, 128))
+        pool.zeros((4, 4, 128, 128))
+
+        assert pool.stats["allocation_seconds"] > 0
+        assert pool.stats["saved_seconds"] > 0
+
+
+class TestWidthHeightLatent:
+    """Test the Width & Height Latent node."""
+
+    def test_latent_matches_dimensions(self, monkeypatch):
+        """Test the latent shape follows the resolved preset and swap."""
+        import latent_pool
+        from width_height_latent_node import WidthHeightLatent
+
+        monkeypatch.setattr(latent_pool, "_pool", latent_pool.LatentPool(64 * 1024**2))
+        result = WidthHeightLatent().get_latent(1024, 1024, "1216x832", True, 2, 16)
+        latent, width, height = result["result"]
+
+        assert (width, height) == (832, 1216)
+        assert latent["samples"].shape == (2, 16, 152, 104)
+        assert "latent allocated" in result["ui"]["text"][0]
+
+        again = WidthHeightLatent().get_latent(1024, 1024, "1216x832", True, 2, 16)
+        assert again["result"][0]["samples"] is latent["samples"]
+        assert "latent pooled" in again["ui"]["text"][0]
+
+    def test_snap_report_is_kept(self, monkeypatch):
+        """Test the snap report is combined with the pool report."""
+        import latent_pool
+        from width_height_latent_node import WidthHeightLatent
+
+        monkeypatch.setattr(latent_pool, "_pool", latent_pool.LatentPool(64 * 1024**2))
+        result = WidthHeightLatent().get_latent(
+            1000, 600, "custom", False, 1, 4, snap="sd1.x/sdxl (64)"
+        )
+        width, height = result["result"][1:]
+
+        assert width % 64 == 0 and height % 64 == 0
+        assert " | latent " in result["ui"]["text"][0]
+
+    def test_inputs_extend_width_height_node(self):
+        """Test the node keeps every Width & Height input."""
+        from width_height_latent_node import WidthHeightLatent
+        from width_height_node import WidthHeightNode
+
+        inputs = WidthHeightLatent.INPUT_TYPES()
+        base = WidthHeightNode.INPUT_TYPES()
+
+        assert set(base["required"]) < set(inputs["required"])
+        assert set(base["optional"]) == set(inputs["optional"])
@@ -0,0 +1,166 @@
+"""
+Unit tests for the seeded noise cache and the Cached Noise node.
+"""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+
+def reference_noise(seed, shape, batch_inds=None):
+    """Noise as comfy.sample.prepare_noise draws it, from the global generator."""
+    generator = torch.manual_seed(seed)
+    if batch_inds is None:
+        return torch.randn(shape, generator=generator, device="cpu")
+    noises = []
+    unique = sorted(set(batch_inds))
+    for index in range(unique[-1] + 1):
+        noise = torch.randn([1] + list(shape)[1:], generator=generator, device="cpu")
+        if index in unique:
+            noises.append(noise)
+    return torch.cat([noises[unique.index(index)] for index in batch_inds], dim=0)
+
+
+class TestGenerateNoise:
+    """Test noise matches ComfyUI's."""
+
+    def test_matches_prepare_noise(self):
+        """Test plain and batch-indexed noise match the reference draws."""
+        from noise_cache import generate_noise
+
+        assert torch.equal(
+            generate_noise(42, (2, 4, 8, 8)), reference_noise(42, (2, 4, 8, 8))
+        )
+        assert torch.equal(
+            generate_noise(7, (3, 4, 8, 8), batch_inds=[2, 0, 2]),
+            reference_noise(7, (3, 4, 8, 8), [2, 0, 2]),
+        )
+
+
+class TestNoiseCache:
+    """Test caching, invalidation and eviction."""
+
+    def test_hits_per_key(self):
+        """Test the same seed and shape reuse one tensor."""
+        from noise_cache import NoiseCache
+
+        cache = NoiseCache(1024**2)
+        first = cache.noise(1, (1, 4, 8, 8))
+        second = cache.noise(1, (1, 4, 8, 8))
+        other_seed = cache.noise(2, (1, 4, 8, 8))
+        other_dtype = cache.noise(1, (1, 4, 8, 8), torch.float16)
+
+        assert first is second
+        assert not torch.equal(first, other_seed)
+        assert other_dtype.dtype == torch.float16
+        assert cache.stats["hits"] == 1
+        assert cache.stats["misses"] == 3
+
+    def test_modified_noise_is_regenerated(self):
+        """Test in-place writes by a consumer are not served again."""
+        from noise_cache import NoiseCache, generate_noise
+
+        cache = NoiseCache(1024**2)
+        cache.noise(3, (1, 4, 8, 8)).mul_(0)
+
+        assert torch.equal(
+            cache.noise(3, (1, 4, 8, 8)), generate_noise(3, (1, 4, 8, 8))
+        )
+        assert cache.stats["regenerated"] == 1
+        assert cache.cached_bytes == 4 * 8 * 8 * 4
+
+    def test_byte_cap_evicts_least_recently_used(self):
+        """Test the cache stays under its byte cap."""
+        from noise_cache import NoiseCache
+
+        size = 4 * 8 * 8 * 4  # one float32 latent
+        cache = NoiseCache(2 * size)
+        a = cache.noise(1, (1, 4, 8, 8))
+        b = cache.noise(2, (1, 4, 8, 8))
+        cache.noise(1, (1, 4, 8, 8))  # seed 2 is now the least recently used
+        cache.noise(3, (1, 4, 8, 8))
+
+        assert cache.cached_bytes == 2 * size
+        assert cache.stats["evictions"] == 1
+        assert cache.noise(1, (1, 4, 8, 8)) is a
+        assert cache.noise(2, (1, 4, 8, 8)) is not b
+
+    def test_unsupported_generator(self):
+        """Test only the CPU generator is accepted."""
+        from noise_cache import NoiseCache
+
+        with pytest.raises(ValueError):
+            NoiseCache(1024).noise(1, (1, 4, 8, 8), generator="cuda")
+
+
+class TestCachedNoiseNode:
+    """Test the NOISE object handed to custom samplers."""
+
+    def test_generate_noise_uses_latent(self):
+        """Test shape, dtype and batch indices come from the input latent."""
+        from cached_noise_node import CachedNoise
+        from noise_cache import NoiseCache
+
+        (noise,) = CachedNoise().get_noise(99)
+        noise.cache = NoiseCache(1024**2)
+        latent = {"samples": torch.zeros((2, 4, 8, 8)), "batch_index": [1, 0]}
+
+        first = noise.generate_noise(latent)
+        second = noise.generate_noise(latent)
+
+        assert noise.seed == 99
+        assert first is second
+        assert torch.equal(first, reference_noise(99, (2, 4, 8, 8), [1, 0]))
+
+
+class TestBatchInvariantNoise:
+    """Test per-item noise is independent of batching."""
+
+    def test_alone_equals_batched(self):
+        """Test every item matches the same seed drawn alone, bit for bit."""
+        from noise_cache import batch_invariant_noise, generate_noise
+
+        seeds = [5, 2**63 + 11, 0, 5] + list(range(100, 112))
+        batch = batch_invariant_noise(seeds, (16, 4, 8, 8))
+
+        for index, seed in enumerate(seeds):
+            alone = batch_invariant_noise([seed], (1, 4, 8, 8))
+            assert torch.equal(batch[index : index + 1], alone)
+            assert torch.equal(alone, generate_noise(seed, (1, 4, 8, 8)))
+
+    def test_split_batches_match(self):
+        """Test splitting a batch does not change any item's noise."""
+        from noise_cache import batch_invariant_noise
+
+        seeds = list(range(8))
+        whole = batch_invariant_noise(seeds, (8, 4, 8, 8), torch.float16)
+        halves = torch.cat(
+            [
+                batch_invariant_noise(seeds[:3], (3, 4, 8, 8), torch.float16),
+                batch_invariant_noise(seeds[3:], (5, 4, 8, 8), torch.float16),
+            ]
+        )
+
+        assert whole.dtype == torch.float16
+        assert torch.equal(whole, halves)
+
+    def test_seed_count_must_match(self):
+        """Test a seed per batch item is required."""
+        from noise_cache import batch_invariant_noise
+
+        with pytest.raises(ValueError):
+            batch_invariant_noise([1, 2], (3, 4, 8, 8))
+
+    def test_per_item_node_mode(self):
+        """Test per_item noise uses seed + batch index for each item."""
+        from cached_noise_node import CachedNoise
+        from noise_cache import generate_noise
+
+        (noise,) = CachedNoise().get_noise(40, batch_mode="per_item")
+        batch = noise.generate_noise({"samples": torch.zeros((3, 4, 8, 8))})
+        single = noise.generate_noise(
+            {"samples": torch.zeros((1, 4, 8, 8)), "batch_index": [2]}
+        )
+
+        assert torch.equal(batch[1:2], generate_noise(41, (1, 4, 8, 8)))
+        assert torch.equal(batch[2:3], single)
@@ -0,0 +1,116 @@
+"""
+Unit tests for the low-discrepancy parameter-space sampler.
+"""
+
+import pytest
+
+
+class TestHalton:
+    """Test the Halton sequence helpers."""
+
+    def test_radical_inverse_base_two(self):
+        """Test the first base-2 points are 1/2, 1/4, 3/4."""
+        from parameter_space_node import radical_inverse
+
+        values = [radical_inverse(index, 2, 3) for index in (1, 2, 3)]
+        assert values == [4, 2, 6]
+
+    def test_choices_cover_every_value_quickly(self):
+        """Test every choice of each axis is hit within a few base-periods."""
+        from parameter_space_node import halton_choice
+
+        for axis, count in enumerate((7, 5, 9, 100)):
+            hits = {halton_choice(index, axis, count) for index in range(1, 4 * count)}
+            assert hits == set(range(count))
+
+    def test_scrambling_is_a_bijection(self):
+        """Test scrambled points still cover every choice exactly once."""
+        from parameter_space_node import _digit_permutations, halton_choice
+
+        permutations = _digit_permutations(1234)
+        values = [halton_choice(index, 2, 25, permutations) for index in range(25)]
+        assert sorted(values) == list(range(25))
+        assert values != [halton_choice(index, 2, 25) for index in range(25)]
+
+    def test_scramble_seeds_change_every_axis(self):
+        """Test every axis' sequence varies with the scramble seed."""
+        from parameter_space_node import _digit_permutations, halton_choice
+
+        for axis, count in enumerate((20, 10, 30, 1000)):
+            sequences = {
+                tuple(
+                    halton_choice(index, axis, count, _digit_permutations(seed))
+                    for index in range(1, 33)
+                )
+                for seed in range(1, 21)
+            }
+            # Base 2 has few digits in play for 20 choices; allow collisions
+            assert len(sequences) >= 16
+
+
+class TestParameterPoint:
+    """Test full parameter-space points."""
+
+    def test_point_is_deterministic_and_in_range(self):
+        """Test points depend only on their index and stay in range."""
+        from parameter_space_node import parameter_point
+
+        samplers = ["euler", "dpmpp_2m"]
+        schedulers = ["normal", "karras", "simple"]
+        presets = ["1024x1024", "832x1216"]
+        for index in range(50):
+            point = parameter_point(index, samplers, schedulers, presets, 10, 20, 7)
+            assert point == parameter_point(
+                index, samplers, schedulers, presets, 10, 20, 7
+            )
+            sampler, scheduler, width, height, seed = point
+            assert sampler in samplers and scheduler in schedulers
+            assert f"{width}x{height}" in presets
+            assert 10 <= seed <= 20
+
+    def test_large_seed_range_and_index(self):
+        """Test 64-bit seed ranges and huge indices are handled exactly."""
+        from parameter_space_node import parameter_point
+
+        _, _, _, _, seed = parameter_point(
+            2**40, ["a"], ["b"], ["64x64"], 0, 0xFFFFFFFFFFFFFFFF
+        )
+        assert 0 <= seed <= 0xFFFFFFFFFFFFFFFF
+
+    def test_invalid_seed_range(self):
+        """Test an inverted seed range raises an error."""
+        from parameter_space_node import parameter_point
+
+        with pytest.raises(ValueError):
+            parameter_point(0, ["a"], ["b"], ["64x64"], 5, 4)
+
+
+class TestParameterSpaceSamplerNode:
+    """Test the ParameterSpaceSampler node."""
+
+    def test_outputs_match_return_types(self):
+        """Test the node outputs one value per declared return type."""
+        from parameter_space_node import ParameterSpaceSampler
+
+        result = ParameterSpaceSampler().sample(3, 0, 1000, 0)
+        assert len(result) == len(ParameterSpaceSampler.RETURN_TYPES)
+        assert result[-1] == 3
+
+    def test_shards_interleave_without_overlap(self):
+        """Test shards partition the sequence between workers."""
+        from parameter_space_node import ParameterSpaceSampler
+
+        node = ParameterSpaceSampler()
+        points = [
+            node.sample(index, 0, 1000, 0, shard_index=shard, shard_count=3)[-1]
+            for shard in range(3)
+            for index in range(4)
+        ]
+        assert sorted(points) == list(range(12))
+
+    def test_invalid_shard(self):
+        """Test a shard index outside the shard count raises an error."""
+        from parameter_space_node import ParameterSpaceSampler
+
+        with pytest.raises(ValueError):
+            ParameterSpaceSampler().sample(0, 0, 10, 0, shard_index=2, shard_count=2)
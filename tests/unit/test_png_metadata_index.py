@@ -0,0 +1,246 @@
+"""
+Unit tests for the PNG metadata indexer.
+"""
+
+import json
+import os
+import struct
+import zlib
+
+import pytest  # noqa: F401
+
+
+def chunk(chunk_type, data):
+    """Encode one PNG chunk with its CRC."""
+    crc = zlib.crc32(chunk_type + data) & 0xFFFFFFFF
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", crc)
+
+
+def write_png(path, text=None, itxt=None, trailing_text=None):
+    """Write a 1x1 PNG with optional tEXt/iTXt chunks before the image data."""
+    header = struct.pack(">IIBBBBB", 1, 1, 8, 0, 0, 0, 0)
+    parts = [b"\x89PNG\r\n\x1a\n", chunk(b"IHDR", header)]
+    for keyword, value in (text or {}).items():
+        parts.append(chunk(b"tEXt", keyword.encode() + b"\x00" + value.encode()))
+    for keyword, value in (itxt or {}).items():
+        body = zlib.compress(value.encode("utf-8"))
+        parts.append(chunk(b"iTXt", keyword.encode() + b"\x00\x01\x00\x00\x00" + body))
+    parts.append(chunk(b"IDAT", zlib.compress(b"\x00\x00")))
+    for keyword, value in (trailing_text or {}).items():
+        parts.append(chunk(b"tEXt", keyword.encode() + b"\x00" + value.encode()))
+    parts.append(chunk(b"IEND", b""))
+    with open(path, "wb") as handle:
+        handle.write(b"".join(parts))
+
+
+def prompt_json(seed=42, sampler="euler", scheduler="karras", size=(1024, 768)):
+    return json.dumps(
+        {
+            "1": {"class_type": "SeedHistory", "inputs": {"seed": seed}},
+            "2": {
+                "class_type": "SamplerSelector",
+                "inputs": {"sampler_name": sampler},
+            },
+            "3": {
+                "class_type": "SchedulerSelector",
+                "inputs": {"scheduler": scheduler},
+            },
+            "4": {
+                "class_type": "WidthHeightNode",
+                "inputs": {
+                    "width": size[0],
+                    "height": size[1],
+                    "preset": "custom",
+                    "swap_dimensions": False,
+                },
+            },
+        }
+    )
+
+
+class TestReadTextChunks:
+    def test_reads_text_and_compressed_itxt(self, tmp_path):
+        from png_metadata_index import read_text_chunks
+
+        path = tmp_path / "a.png"
+        write_png(path, text={"prompt": "{}"}, itxt={"workflow": '{"nodes": []}'})
+
+        assert read_text_chunks(path) == {"prompt": "{}", "workflow": '{"nodes": []}'}
+
+    def test_stops_at_image_data(self, tmp_path):
+        from png_metadata_index import read_text_chunks
+
+        path = tmp_path / "a.png"
+        write_png(path, text={"prompt": "{}"}, trailing_text={"late": "x"})
+
+        assert read_text_chunks(path) == {"prompt": "{}"}
+
+    def test_non_png_and_empty_files(self, tmp_path):
+        from png_metadata_index import read_text_chunks
+
+        (tmp_path / "empty.png").write_bytes(b"")
+        (tmp_path / "text.png").write_bytes(b"not a png")
+
+        assert read_text_chunks(tmp_path / "empty.png") == {}
+        assert read_text_chunks(tmp_path / "text.png") == {}
+
+
+class TestExtraction:
+    def test_extracts_selector_values_from_prompt(self):
+        from png_metadata_index import extract_selector_values
+
+        values = extract_selector_values(json.loads(prompt_json()))
+
+        assert values == [
+            ("sampler", "euler"),
+            ("scheduler", "karras"),
+            ("seed", "42"),
+            ("size", "1024x768"),
+        ]
+
+    def test_ignores_linked_inputs(self):
+        from png_metadata_index import extract_selector_values
+
+        prompt = {"1": {"class_type": "SeedHistory", "inputs": {"seed": ["9", 0]}}}
+
+        assert extract_selector_values(prompt) == []
+
+    def test_workflow_fallback(self):
+        from png_metadata_index import extract_workflow_values
+
+        workflow = {
+            "nodes": [
+                {"type": "SeedHistory", "widgets_values": [7]},
+                {"type": "SamplerSelector", "widgets_values": ["dpmpp_2m"]},
+                {"type": "KSampler", "widgets_values": [1, "fixed"]},
+            ]
+        }
+
+        assert extract_workflow_values(workflow) == [
+            ("sampler", "dpmpp_2m"),
+            ("seed", "7"),
+        ]
+
+    def test_workflow_fallback_sizes(self):
+        from png_metadata_index import extract_workflow_values
+
+        workflow = {
+            "nodes": [
+                {
+                    "id": 1,
+                    "type": "WidthHeightNode",
+                    "widgets_values": [1024, 1024, "custom", True],
+                },
+                {
+                    "id": 2,
+                    "type": "WidthHeightNode",
+                    "inputs": [
+                        {"name": "width", "widget": {"name": "width"}, "link": 5}
+                    ],
+                    "widgets_values": [512, 512, "custom", False],
+                },
+            ]
+        }
+
+        assert extract_workflow_values(workflow) == [("size", "1024x1024")]
+
+
+class TestMetadataIndex:
+    def test_index_and_query(self, tmp_path):
+        from png_metadata_index import MetadataIndex
+
+        images = tmp_path / "out"
+        (images / "nested").mkdir(parents=True)
+        write_png(images / "a.png", text={"prompt": prompt_json(seed=1)})
+        write_png(
+            images / "nested" / "b.png",
+            text={"prompt": prompt_json(seed=2, sampler="dpmpp_2m")},
+        )
+        (images / "notes.txt").write_text("ignored")
+
+        with MetadataIndex(str(tmp_path / "index.sqlite")) as index:
+            stats = index.update([str(images)], workers=1)
+
+            assert stats == {"scanned": 2, "indexed": 2, "skipped": 0, "removed": 0}
+            assert index.query(seed=1) == [str(images / "a.png")]
+            assert index.query(sampler="dpmpp_2m") == [str(images / "nested" / "b.png")]
+            assert len(index.query(scheduler="karras", size="1024x768")) == 2
+            assert index.query(seed=1, sampler="dpmpp_2m") == []
+            assert index.size_counts() == [("1024x768", 2)]
+
+    def test_rerun_skips_unchanged_and_drops_removed(self, tmp_path):
+        from png_metadata_index import MetadataIndex
+
+        images = tmp_path / "out"
+        images.mkdir()
+        write_png(images / "a.png", text={"prompt": prompt_json(seed=1)})
+        write_png(images / "b.png", text={"prompt": prompt_json(seed=2)})
+        db_path = str(tmp_path / "index.sqlite")
+
+        with MetadataIndex(db_path) as index:
+            index.update([str(images)], workers=1)
+
+        os.remove(images / "b.png")
+        write_png(
+            images / "a.png", text={"prompt": prompt_json(seed=3, size=(512, 512))}
+        )
+        stat = os.stat(images / "a.png")
+        os.utime(images / "a.png", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        write_png(images / "c.png", text={"prompt": prompt_json(seed=4)})
+
+        with MetadataIndex(db_path) as index:
+            stats = index.update([str(images)], workers=1)
+            again = index.update([str(images)], workers=1)
+
+            assert stats == {"scanned": 2, "indexed": 2, "skipped": 0, "removed": 1}
+            assert again == {"scanned": 2, "indexed": 0, "skipped": 2, "removed": 0}
+            assert index.query(seed=1) == []
+            assert index.query(seed=3) == [str(images / "a.png")]
+            assert index.query(seed=2) == []
+
+    def test_unparseable_files_are_not_reread(self, tmp_path, monkeypatch):
+        import png_metadata_index
+        from png_metadata_index import MetadataIndex
+
+        images = tmp_path / "out"
+        images.mkdir()
+        write_png(images / "bad.png", text={"prompt": "{not json"})
+        write_png(images / "odd.png", text={"prompt": '{"1": 5}'})
+        db_path = str(tmp_path / "index.sqlite")
+
+        with MetadataIndex(db_path) as index:
+            stats = index.update([str(images)], workers=1)
+            monkeypatch.setattr(png_metadata_index, "index_file", None)
+            again = index.update([str(images)], workers=1)
+
+            assert stats["indexed"] == 2
+            assert again == {"scanned": 2, "indexed": 0, "skipped": 2, "removed": 0}
+            assert index.query() == [str(images / "bad.png"), str(images / "odd.png")]
+            assert index.query(seed=1) == []
+
+    def test_process_pool(self, tmp_path):
+        from png_metadata_index import MetadataIndex
+
+        images = tmp_path / "out"
+        images.mkdir()
+        for seed in range(6):
+            write_png(images / f"{seed}.png", text={"prompt": prompt_json(seed=seed)})
+
+        with MetadataIndex(str(tmp_path / "index.sqlite")) as index:
+            stats = index.update([str(images)], workers=2, chunksize=2)
+
+            assert stats["indexed"] == 6
+            assert index.query(seed=5) == [str(images / "5.png")]
+
+    def test_cli(self, tmp_path, capsys):
+        from png_metadata_index import main
+
+        images = tmp_path / "out"
+        images.mkdir()
+        write_png(images / "a.png", text={"prompt": prompt_json(seed=9)})
+        db_path = str(tmp_path / "index.sqlite")
+
+        assert main(["index", str(images), "--db", db_path, "--workers", "1"]) == 0
+        assert "indexed=1" in capsys.readouterr().out
+        assert main(["query", "--db", db_path, "--seed", "9"]) == 0
+        assert capsys.readouterr().out.strip() == str(images / "a.png")
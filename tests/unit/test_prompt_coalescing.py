@@ -0,0 +1,295 @@
+"""
+Unit tests for in-flight duplicate prompt coalescing.
+"""
+
+import asyncio
+import copy
+import threading
+
+import pytest
+
+
+def base_prompt():
+    """Build an API-format prompt with every fingerprinted selector node."""
+    return {
+        "1": {"class_type": "SamplerSelector", "inputs": {"sampler_name": "euler"}},
+        "2": {"class_type": "SchedulerSelector", "inputs": {"scheduler": "karras"}},
+        "3": {
+            "class_type": "WidthHeightNode",
+            "inputs": {
+                "width": 512,
+                "height": 512,
+                "preset": "832x1216",
+                "swap_dimensions": False,
+            },
+        },
+        "4": {"class_type": "SeedHistory", "inputs": {"seed": 7}},
+        "5": {
+            "class_type": "KSampler",
+            "inputs": {
+                "sampler_name": ["1", 0],
+                "scheduler": ["2", 0],
+                "seed": ["4", 0],
+            },
+        },
+        "6": {
+            "class_type": "EmptyLatentImage",
+            "inputs": {"width": ["3", 0], "height": ["3", 1]},
+        },
+    }
+
+
+class TestFingerprint:
+    """Test canonical fingerprints."""
+
+    def test_cosmetic_differences_match(self):
+        """Test a preset equals the same custom size and titles are ignored."""
+        from prompt_coalescing import prompt_fingerprint
+
+        custom = base_prompt()
+        custom["3"]["inputs"].update(width=832, height=1216, preset="custom")
+        custom["5"]["_meta"] = {"title": "My sampler"}
+
+        assert prompt_fingerprint(base_prompt()) == prompt_fingerprint(custom)
+
+    def test_resolved_values_differ(self):
+        """Test a different seed, sampler or swap changes the fingerprint."""
+        from prompt_coalescing import prompt_fingerprint
+
+        reference = prompt_fingerprint(base_prompt())
+        for node_id, name, value in [
+            ("4", "seed", 8),
+            ("1", "sampler_name", "heun"),
+            ("3", "swap_dimensions", True),
+        ]:
+            prompt = base_prompt()
+            prompt[node_id]["inputs"][name] = value
+            assert prompt_fingerprint(prompt) != reference
+
+    def test_seed_history_is_not_recorded(self, monkeypatch):
+        """Test fingerprinting does not append to server-side seed history."""
+        import seed_history_store
+        from prompt_coalescing import prompt_fingerprint
+
+        calls = []
+        monkeypatch.setattr(
+            seed_history_store, "get_seed_history_store", lambda: calls.append(1)
+        )
+        prompt_fingerprint(base_prompt())
+
+        assert calls == []
+
+    def test_targets_are_part_of_fingerprint(self):
+        """Test partial executions of the same prompt are distinct."""
+        from prompt_coalescing import prompt_fingerprint
+
+        assert prompt_fingerprint(base_prompt(), ["5"]) != prompt_fingerprint(
+            base_prompt()
+        )
+
+
+class TestCoalescingTable:
+    """Test the bounded in-flight table."""
+
+    def test_claim_activate_finish(self):
+        """Test the life cycle of an in-flight prompt."""
+        from prompt_coalescing import CoalescingTable
+
+        table = CoalescingTable()
+        entry, created = table.claim("fp", "alice")
+        table.activate("fp", "pid", 3)
+        again, created_again = table.claim("fp", "bob")
+        table.subscribe(again, "bob")
+
+        assert created and not created_again
+        assert again is entry
+        assert table.subscribers("pid") == ("bob",)
+        table.finish("pid")
+        assert len(table) == 0
+        assert table.claim("fp", "bob")[1]
+
+    def test_bounded_and_expiring(self):
+        """Test the oldest entries are evicted and stale ones expire."""
+        from prompt_coalescing import CoalescingTable
+
+        now = [0.0]
+        table = CoalescingTable(max_entries=2, ttl=10.0, clock=lambda: now[0])
+        for fingerprint in ("a", "b", "c"):
+            table.claim(fingerprint, None)
+
+        assert len(table) == 2
+        assert table.stats["evictions"] == 1
+        assert table.claim("a", None)[1]
+        now[0] = 20.0
+        assert table.claim("b", None)[1]
+
+
+class StandInQueue:
+    """Stand-in for the deletion API of ComfyUI's PromptQueue."""
+
+    def __init__(self):
+        self.mutex = threading.RLock()
+        self.queue = []
+
+    def delete_queue_item(self, function):
+        with self.mutex:
+            for index, item in enumerate(self.queue):
+                if function(item):
+                    self.queue.pop(index)
+                    return True
+            return False
+
+    def wipe_queue(self):
+        with self.mutex:
+            self.queue = []
+
+
+class StandInServer:
+    """Stand-in PromptServer with a /prompt route and recorded messages."""
+
+    def __init__(self):
+        from aiohttp import web
+
+        self.app = web.Application()
+        self.prompt_queue = StandInQueue()
+        self.messages = []
+        self.queued = []
+
+    def send_sync(self, event, data, sid=None):
+        self.messages.append((event, data.get("prompt_id"), sid))
+
+
+class TestMiddleware:
+    """Test coalescing of concurrent and repeated submissions."""
+
+    def test_duplicates_attach_to_in_flight_prompt(self):
+        """Test duplicates get the original prompt id and its messages."""
+        pytest.importorskip("aiohttp")
+        import prompt_coalescing as coalescing
+        from aiohttp import web
+        from aiohttp.test_utils import TestClient, TestServer
+
+        server = StandInServer()
+        table = coalescing.CoalescingTable()
+        coalescing.install_prompt_coalescing(server, table)
+
+        async def post_prompt(request):
+            json_data = await request.json()
+            await asyncio.sleep(0.01)  # validation
+            server.queued.append(json_data["client_id"])
+            number = len(server.queued)
+            return web.json_response(
+                {"prompt_id": f"pid-{number}", "number": number, "node_errors": {}}
+            )
+
+        server.app.router.add_post("/prompt", post_prompt)
+
+        async def main():
+            async with TestClient(TestServer(server.app)) as client:
+
+                async def submit(client_id, prompt):
+                    response = await client.post(
+                        "/prompt", json={"prompt": prompt, "client_id": client_id}
+                    )
+                    return await response.json()
+
+                custom = copy.deepcopy(base_prompt())
+                custom["3"]["inputs"].update(width=832, height=1216, preset="custom")
+                first, second, third = await asyncio.gather(
+                    submit("alice", base_prompt()),
+                    submit("bob", base_prompt()),
+                    submit("carol", custom),
+                )
+                server.send_sync("executed", {"prompt_id": "pid-1"}, "alice")
+                server.send_sync(
+                    "executing", {"node": None, "prompt_id": "pid-1"}, "alice"
+                )
+                after = await submit("dave", base_prompt())
+                return first, second, third, after
+
+        first, second, third, after = asyncio.run(main())
+
+        assert server.queued == ["alice", "dave"]
+        assert (
+            first["prompt_id"] == second["prompt_id"] == third["prompt_id"] == "pid-1"
+        )
+        assert second["coalesced"] and third["coalesced"]
+        assert ("executed", "pid-1", "bob") in server.messages
+        assert ("executed", "pid-1", "carol") in server.messages
+        assert after["prompt_id"] == "pid-2"
+        assert table.stats["coalesced"] == 2
+
+    def test_failed_prompt_is_not_coalesced(self):
+        """Test a prompt that fails validation is not remembered."""
+        pytest.importorskip("aiohttp")
+        import prompt_coalescing as coalescing
+        from aiohttp import web
+        from aiohttp.test_utils import TestClient, TestServer
+
+        server = StandInServer()
+        table = coalescing.CoalescingTable()
+        coalescing.install_prompt_coalescing(server, table)
+
+        async def post_prompt(request):
+            return web.json_response(
+                {"error": "invalid", "node_errors": {}}, status=400
+            )
+
+        server.app.router.add_post("/prompt", post_prompt)
+
+        async def main():
+            async with TestClient(TestServer(server.app)) as client:
+                response = await client.post("/prompt", json={"prompt": base_prompt()})
+                return response.status
+
+        assert asyncio.run(main()) == 400
+        assert len(table) == 0
+
+    def test_deleted_prompt_is_queued_again(self):
+        """Test a prompt deleted from the queue is not coalesced onto."""
+        pytest.importorskip("aiohttp")
+        import prompt_coalescing as coalescing
+        from aiohttp import web
+        from aiohttp.test_utils import TestClient, TestServer
+
+        server = StandInServer()
+        table = coalescing.CoalescingTable()
+        coalescing.install_prompt_coalescing(server, table)
+
+        async def post_prompt(request):
+            json_data = await request.json()
+            server.queued.append(json_data["client_id"])
+            prompt_id = f"pid-{len(server.queued)}"
+            server.prompt_queue.queue.append((0, prompt_id, json_data["prompt"]))
+            return web.json_response({"prompt_id": prompt_id, "node_errors": {}})
+
+        server.app.router.add_post("/prompt", post_prompt)
+
+        async def main():
+            async with TestClient(TestServer(server.app)) as client:
+
+                async def submit(client_id):
+                    response = await client.post(
+                        "/prompt",
+                        json={"prompt": base_prompt(), "client_id": client_id},
+                    )
+                    return await response.json()
+
+                first = await submit("alice")
+                server.prompt_queue.delete_queue_item(
+                    lambda item: item[1] == first["prompt_id"]
+                )
+                second = await submit("alice")
+                server.prompt_queue.wipe_queue()
+                third = await submit("alice")
+                return first, second, third
+
+        first, second, third = asyncio.run(main())
+
+        assert [first["prompt_id"], second["prompt_id"], third["prompt_id"]] == [
+            "pid-1",
+            "pid-2",
+            "pid-3",
+        ]
+        assert "coalesced" not in second and "coalesced" not in third
+        assert len(table) == 1
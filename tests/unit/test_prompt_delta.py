@@ -0,0 +1,316 @@
+"""
+Unit tests for seed-only (and other selector) delta resubmission.
+"""
+
+import asyncio
+import contextvars
+import sys
+import types
+
+import pytest
+
+
+def base_prompt():
+    """Build an API-format prompt with every patchable selector node."""
+    return {
+        "1": {"class_type": "SamplerSelector", "inputs": {"sampler_name": "euler"}},
+        "2": {"class_type": "SchedulerSelector", "inputs": {"scheduler": "normal"}},
+        "3": {
+            "class_type": "WidthHeightNode",
+            "inputs": {
+                "width": 1024,
+                "height": 1024,
+                "preset": "1024x1024",
+                "swap_dimensions": False,
+            },
+        },
+        "4": {"class_type": "SeedHistory", "inputs": {"seed": 1}},
+        "5": {"class_type": "KSampler", "inputs": {"seed": ["4", 0], "steps": 20}},
+    }
+
+
+class TestApplyPatch:
+    """Test patching and validation."""
+
+    def test_only_patched_nodes_are_copied(self):
+        """Test unpatched nodes are shared and the original is untouched."""
+        from prompt_delta import apply_patch
+
+        prompt = base_prompt()
+        patched = apply_patch(prompt, {"seed": 99, "sampler_name": "heun"})
+
+        assert patched["4"]["inputs"]["seed"] == 99
+        assert patched["1"]["inputs"]["sampler_name"] == "heun"
+        assert prompt["4"]["inputs"]["seed"] == 1
+        assert patched["5"] is prompt["5"]
+        assert patched["3"] is prompt["3"]
+
+    def test_size_patch_switches_to_custom(self):
+        """Test width/height patches override the preset."""
+        from prompt_delta import apply_patch
+
+        patched = apply_patch(base_prompt(), {"width": 832, "height": 1216})
+
+        assert patched["3"]["inputs"]["preset"] == "custom"
+        assert patched["3"]["inputs"]["width"] == 832
+
+    @pytest.mark.parametrize(
+        "patch, message",
+        [
+            ({}, "non-empty"),
+            ({"cfg": 7}, "Unknown patch keys"),
+            ({"sampler_name": "bogus"}, "not a valid"),
+            ({"seed": -5}, "out of range"),
+            ({"seed": "5"}, "integer"),
+            ({"preset": "1x1"}, "not a valid"),
+        ],
+    )
+    def test_invalid_patches(self, patch, message):
+        """Test invalid values are rejected before queueing."""
+        from prompt_delta import apply_patch
+
+        with pytest.raises(ValueError, match=message):
+            apply_patch(base_prompt(), patch)
+
+    def test_missing_node(self):
+        """Test patching a selector the prompt does not have is rejected."""
+        from prompt_delta import apply_patch
+
+        prompt = base_prompt()
+        del prompt["4"]
+        with pytest.raises(ValueError, match="SeedHistory"):
+            apply_patch(prompt, {"seed": 2})
+
+
+class TestPromptCache:
+    """Test the bounded, expiring prompt cache."""
+
+    def test_bound_and_ttl(self):
+        """Test old entries are dropped by count and by age."""
+        from prompt_delta import PromptCache
+
+        now = [0.0]
+        cache = PromptCache(max_entries=2, ttl=10.0, clock=lambda: now[0])
+        for prompt_id in ("a", "b", "c"):
+            cache.put(prompt_id, {}, "alice")
+
+        assert cache.get("a") is None
+        assert cache.get("c") == ({}, "alice")
+        now[0] = 11.0
+        assert cache.get("c") is None
+
+
+class StandInQueue:
+    def __init__(self):
+        self.items = []
+
+    def put(self, item):
+        self.items.append(item)
+
+
+@pytest.fixture
+def execution(monkeypatch):
+    """Stand-in for ComfyUI's ``execution`` module; every prompt is valid."""
+    module = types.ModuleType("execution")
+    module.validate_prompt = lambda prompt_id, prompt, targets: (True, None, ["5"], {})
+    monkeypatch.setitem(sys.modules, "execution", module)
+    return module
+
+
+class StandInServer:
+    """Runs on-prompt handlers and queues prompts the way ComfyUI does."""
+
+    def __init__(self):
+        from aiohttp import web
+
+        self.app = web.Application()
+        self.routes = web.RouteTableDef()
+        self.prompt_queue = StandInQueue()
+        self.number = 5
+        self.handlers = []
+
+    def add_on_prompt_handler(self, handler):
+        self.handlers.append(handler)
+
+    def trigger_on_prompt(self, json_data):
+        for handler in self.handlers:
+            json_data = handler(json_data)
+        return json_data
+
+    def post(self, prompt_id, json_data, outputs, user="127.0.0.1"):
+        """Queue ``json_data`` as if ``user`` had sent it to ``POST /prompt``."""
+        import server_hooks
+
+        def queue():
+            data = self.trigger_on_prompt(json_data)
+            item = (self.number, prompt_id, data["prompt"])
+            self.prompt_queue.put(item + (data.get("extra_data", {}), outputs))
+            self.number += 1
+
+        context = contextvars.copy_context()
+        context.run(server_hooks._requester.set, user)
+        context.run(queue)
+
+
+async def post_deltas(server, bodies):
+    """Send each body to the delta route; returns ``[(status, json)]``."""
+    from aiohttp.test_utils import TestClient, TestServer
+
+    server.app.add_routes(server.routes)
+    results = []
+    async with TestClient(TestServer(server.app)) as client:
+        for body in bodies:
+            response = await client.post("/comfyassets/prompt_delta", json=body)
+            results.append((response.status, await response.json()))
+    return results
+
+
+class TestDeltaRoute:
+    """Test the route against a stand-in server."""
+
+    def test_delta_resubmission(self, execution):
+        """Test a patched copy of a queued prompt is queued under a new id."""
+        pytest.importorskip("aiohttp")
+        from prompt_delta import PromptCache, install_prompt_delta
+
+        server = StandInServer()
+        cache = PromptCache()
+        install_prompt_delta(server, cache)
+        server.post("first", {"prompt": base_prompt(), "client_id": "c1"}, ["5"])
+
+        ok, unknown, invalid = asyncio.run(
+            post_deltas(
+                server,
+                [
+                    {"prompt_id": "first", "patch": {"seed": 42}},
+                    {"prompt_id": "nope", "patch": {"seed": 1}},
+                    {"prompt_id": "first", "patch": {"seed": -1}},
+                ],
+            )
+        )
+
+        assert ok[0] == 200
+        number, prompt_id, prompt, extra_data, queued_outputs = (
+            server.prompt_queue.items[1][:5]
+        )
+        assert number == 6
+        assert prompt_id == ok[1]["prompt_id"]
+        assert prompt["4"]["inputs"]["seed"] == 42
+        assert queued_outputs == ["5"]
+        assert unknown[0] == 404
+        assert invalid[0] == 400
+        assert len(server.prompt_queue.items) == 2
+
+    def test_patched_prompts_can_be_chained(self, execution):
+        """Test a delta's own prompt is cached for its sender."""
+        pytest.importorskip("aiohttp")
+        from aiohttp.test_utils import TestClient, TestServer
+        from prompt_delta import PromptCache, install_prompt_delta
+
+        server = StandInServer()
+        install_prompt_delta(server, PromptCache())
+        server.post("first", {"prompt": base_prompt()}, ["5"])
+
+        async def main():
+            server.app.add_routes(server.routes)
+            async with TestClient(TestServer(server.app)) as client:
+
+                async def delta(body):
+                    response = await client.post("/comfyassets/prompt_delta", json=body)
+                    return response.status, await response.json()
+
+                ok = await delta({"prompt_id": "first", "patch": {"seed": 42}})
+                chained = await delta(
+                    {"prompt_id": ok[1]["prompt_id"], "patch": {"scheduler": "karras"}}
+                )
+                return ok, chained
+
+        ok, chained = asyncio.run(main())
+
+        assert chained[0] == 200
+        third = server.prompt_queue.items[2][2]
+        assert third["4"]["inputs"]["seed"] == 42
+        assert third["2"]["inputs"]["scheduler"] == "karras"
+
+    def test_other_users_prompts_are_refused(self, execution):
+        """Test only the submitter may patch a prompt, and ids are not inherited."""
+        pytest.importorskip("aiohttp")
+        from prompt_delta import PromptCache, install_prompt_delta
+
+        server = StandInServer()
+        install_prompt_delta(server, PromptCache())
+        server.post(
+            "theirs", {"prompt": base_prompt(), "client_id": "c1"}, ["5"], "10.0.0.9"
+        )
+        server.post("mine", {"prompt": base_prompt(), "client_id": "c1"}, ["5"])
+        server.post("unknown", {"prompt": base_prompt()}, ["5"], None)
+
+        theirs, unknown, mine = asyncio.run(
+            post_deltas(
+                server,
+                [
+                    {"prompt_id": "theirs", "patch": {"seed": 2}},
+                    {"prompt_id": "unknown", "patch": {"seed": 2}},
+                    {"prompt_id": "mine", "patch": {"seed": 2}},
+                ],
+            )
+        )
+
+        assert theirs[0] == 403
+        assert unknown[0] == 403
+        assert mine[0] == 200
+        assert len(server.prompt_queue.items) == 4
+        assert "client_id" not in server.prompt_queue.items[3][3]
+
+    def test_rejected_prompts(self):
+        """Test admission refusals answer 429 and invalid prompts 400."""
+        pytest.importorskip("aiohttp")
+        from prompt_delta import PromptCache, install_prompt_delta
+        from prompt_sweep import AdmissionRejected
+
+        errors = [AdmissionRejected("over budget"), ValueError("bad prompt")]
+
+        def make_submitter(prompt_server, client_id):
+            async def submit(prompt):
+                raise errors.pop(0)
+
+            return submit
+
+        server = StandInServer()
+        install_prompt_delta(server, PromptCache(), make_submitter)
+        server.post("first", {"prompt": base_prompt()}, ["5"])
+        body = {"prompt_id": "first", "patch": {"seed": 2}}
+
+        rejected, invalid = asyncio.run(post_deltas(server, [body, body]))
+
+        assert rejected == (429, {"error": "over budget"})
+        assert invalid == (400, {"error": "bad prompt"})
+
+    def test_folded_prompts_can_be_patched(self, execution):
+        """Test the unfolded prompt is cached when folding is enabled."""
+        pytest.importorskip("aiohttp")
+        from prompt_delta import PromptCache, install_prompt_delta
+        from prompt_folding import install_prompt_folding
+
+        server = StandInServer()
+        cache = PromptCache()
+        install_prompt_delta(server, cache)
+        install_prompt_folding(server)
+        prompt = base_prompt()
+        prompt["5"]["inputs"]["sampler_name"] = ["1", 0]
+        server.post("first", {"prompt": prompt}, ["5"])
+
+        (ok,) = asyncio.run(
+            post_deltas(
+                server, [{"prompt_id": "first", "patch": {"sampler_name": "heun"}}]
+            )
+        )
+
+        assert ok[0] == 200
+        queued = server.prompt_queue.items[1]
+        assert "1" not in queued[2]
+        assert queued[2]["5"]["inputs"]["sampler_name"] == "heun"
+        assert list(queued[3]) == ["comfyassets_folded"]
+        cached = cache.get(ok[1]["prompt_id"])[0]
+        assert cached["1"]["inputs"]["sampler_name"] == "heun"
+        assert cache.get("first")[0] == prompt
@@ -0,0 +1,145 @@
+"""
+Unit tests for constant-folding selector nodes out of prompts.
+"""
+
+import json
+
+import pytest  # noqa: F401
+
+
+def sample_prompt():
+    """Build an API-format prompt with selector nodes feeding a KSampler."""
+    return {
+        "1": {"class_type": "SamplerSelector", "inputs": {"sampler_name": "euler"}},
+        "2": {"class_type": "SchedulerSelector", "inputs": {"scheduler": "karras"}},
+        "3": {
+            "class_type": "WidthHeightNode",
+            "inputs": {
+                "width": 512,
+                "height": 512,
+                "preset": "1216x832",
+                "swap_dimensions": True,
+            },
+        },
+        "4": {
+            "class_type": "EmptyLatentImage",
+            "inputs": {"width": ["3", 0], "height": ["3", 1], "batch_size": 1},
+        },
+        "5": {
+            "class_type": "KSampler",
+            "inputs": {
+                "sampler_name": ["1", 0],
+                "scheduler": ["2", 0],
+                "latent_image": ["4", 0],
+                "seed": ["6", 0],
+            },
+        },
+        "6": {"class_type": "SeedHistory", "inputs": {"seed": 42}},
+    }
+
+
+class TestFoldPrompt:
+    """Test the folding API."""
+
+    def test_selectors_are_inlined(self):
+        """Test selector outputs replace links and the nodes are dropped."""
+        from prompt_folding import fold_prompt
+
+        folded = fold_prompt(sample_prompt())
+
+        assert set(folded) == {"4", "5", "6"}
+        assert folded["4"]["inputs"]["width"] == 832
+        assert folded["4"]["inputs"]["height"] == 1216
+        assert folded["5"]["inputs"]["sampler_name"] == "euler"
+        assert folded["5"]["inputs"]["scheduler"] == "karras"
+        assert folded["5"]["inputs"]["seed"] == ["6", 0]
+        assert folded["5"]["inputs"]["latent_image"] == ["4", 0]
+
+    def test_original_prompt_untouched(self):
+        """Test folding works on a copy."""
+        from prompt_folding import fold_prompt
+
+        prompt = sample_prompt()
+        fold_prompt(prompt)
+        assert prompt == sample_prompt()
+
+    def test_chained_selectors_fold(self):
+        """Test selectors fed by other selectors are folded too."""
+        from prompt_folding import fold_prompt
+
+        prompt = {
+            "1": {
+                "class_type": "WidthNode",
+                "inputs": {"width": 640, "preset": "custom"},
+            },
+            "2": {
+                "class_type": "WidthNode",
+                "inputs": {"width": ["1", 0], "preset": "custom"},
+            },
+            "3": {"class_type": "EmptyLatentImage", "inputs": {"width": ["2", 0]}},
+        }
+        folded = fold_prompt(prompt)
+        assert folded == {
+            "3": {"class_type": "EmptyLatentImage", "inputs": {"width": 640}}
+        }
+
+    def test_unresolvable_nodes_are_kept(self):
+        """Test selectors fed by other nodes stay in the prompt."""
+        from prompt_folding import fold_prompt
+
+        prompt = {
+            "1": {"class_type": "PrimitiveInt", "inputs": {"value": 512}},
+            "2": {
+                "class_type": "WidthNode",
+                "inputs": {"width": ["1", 0], "preset": "custom"},
+            },
+        }
+        assert fold_prompt(prompt) == prompt
+
+    def test_class_types_can_be_extended(self):
+        """Test callers can fold extra pure nodes such as SeedHistory."""
+        from prompt_folding import fold_prompt
+        from prompt_resolution import SELECTOR_NODES
+
+        folded = fold_prompt(sample_prompt(), SELECTOR_NODES + ("SeedHistory",))
+        assert folded["5"]["inputs"]["seed"] == 42
+        assert "6" not in folded
+
+
+class TestFoldingIntegration:
+    """Test the CLI and server hook."""
+
+    def test_cli_accepts_request_body(self, tmp_path, capsys):
+        """Test the CLI folds a /prompt request body."""
+        from prompt_folding import main
+
+        source = tmp_path / "request.json"
+        target = tmp_path / "folded.json"
+        source.write_text(json.dumps({"prompt": sample_prompt(), "client_id": "x"}))
+
+        assert main([str(source), "-o", str(target)]) == 0
+        data = json.loads(target.read_text())
+        assert data["client_id"] == "x"
+        assert set(data["prompt"]) == {"4", "5", "6"}
+        assert "Folded 3 of 6 nodes" in capsys.readouterr().err
+
+    def test_on_prompt_handler(self):
+        """Test the server hook folds submitted prompts."""
+        from prompt_folding import install_prompt_folding
+
+        class StandInServer:
+            def __init__(self):
+                self.handlers = []
+
+            def add_on_prompt_handler(self, handler):
+                self.handlers.append(handler)
+
+        server = StandInServer()
+        install_prompt_folding(server)
+        json_data = server.handlers[0]({"prompt": sample_prompt()})
+        assert "3" not in json_data["prompt"]
+        record = json_data["extra_data"]["comfyassets_folded"]
+        assert record["shapes"] == [[832, 1216]]
+        assert record["class_types"] == sorted(
+            {sample_prompt()[node_id]["class_type"] for node_id in ("1", "2", "3")}
+        )
@@ -0,0 +1,128 @@
+"""
+Unit tests for sampled prompt profiling.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+
+class StandInQueue:
+    """Stand-in for ComfyUI's PromptQueue, driven from the test thread."""
+
+    def __init__(self, prompts):
+        self.items = [(number, f"id-{number}", prompt) for number, prompt in prompts]
+        self.done = []
+
+    def get(self, timeout=None):
+        if not self.items:
+            return None
+        return self.items.pop(0), len(self.done)
+
+    def task_done(self, item_id, history_result, status=None):
+        self.done.append(item_id)
+
+
+def busy_selector_work():
+    """Something recognisable to find in the profile."""
+    return sum(index * index for index in range(2000))
+
+
+def run_worker(queue):
+    """Drain the queue the way ComfyUI's prompt worker does."""
+    while True:
+        result = queue.get(timeout=0)
+        if result is None:
+            return
+        busy_selector_work()
+        queue.task_done(result[1], {})
+
+
+SELECTOR_PROMPT = {"1": {"class_type": "SamplerSelector", "inputs": {}}}
+OTHER_PROMPT = {"1": {"class_type": "KSampler", "inputs": {}}}
+
+
+class TestPromptProfiler:
+    """Test sampling, rotation and the aggregated summary."""
+
+    def test_only_package_prompts_are_sampled(self):
+        """Test prompts without package nodes are never profiled."""
+        from prompt_profiling import PromptProfiler
+
+        profiler = PromptProfiler("unused", {"SamplerSelector"}, 1.0)
+
+        assert profiler.should_profile(SELECTOR_PROMPT)
+        assert not profiler.should_profile(OTHER_PROMPT)
+        profiler.fraction = 0.0
+        assert not profiler.should_profile(SELECTOR_PROMPT)
+
+    def test_fraction_uses_random_draw(self):
+        """Test the sampled fraction follows the random source."""
+        from prompt_profiling import PromptProfiler
+
+        draws = iter([0.05, 0.5])
+        profiler = PromptProfiler(
+            "unused", {"SamplerSelector"}, 0.1, rng=lambda: next(draws)
+        )
+
+        assert profiler.should_profile(SELECTOR_PROMPT)
+        assert not profiler.should_profile(SELECTOR_PROMPT)
+
+    def test_queue_hook_writes_and_rotates(self, tmp_path):
+        """Test sampled executions are written, rotated and summarized."""
+        from prompt_profiling import PromptProfiler, install_prompt_profiling
+
+        profiler = PromptProfiler(str(tmp_path), {"SamplerSelector"}, 1.0, keep=2)
+        queue = StandInQueue(
+            [
+                (0, SELECTOR_PROMPT),
+                (1, OTHER_PROMPT),
+                (2, SELECTOR_PROMPT),
+                (3, SELECTOR_PROMPT),
+            ]
+        )
+        install_prompt_profiling(queue, profiler)
+
+        run_worker(queue)
+        summary = profiler.summary(limit=50, sort="cumtime")
+
+        assert queue.done == [0, 1, 2, 3]
+        assert profiler.profiled == 3
+        assert len(os.listdir(tmp_path)) == 2
+        assert summary["files"] == sorted(os.listdir(tmp_path))
+        assert any(
+            "busy_selector_work" in row["function"] for row in summary["functions"]
+        )
+        with pytest.raises(ValueError):
+            profiler.summary(sort="name")
+
+    def test_routes(self, tmp_path):
+        """Test the summary route and switching sampling on through POST."""
+        pytest.importorskip("aiohttp")
+        from aiohttp import web
+        from aiohttp.test_utils import TestClient, TestServer
+        from prompt_profiling import PromptProfiler, install_profile_routes
+
+        profiler = PromptProfiler(str(tmp_path), {"SamplerSelector"})
+        server = type("StandInServer", (), {})()
+        server.routes = web.RouteTableDef()
+        install_profile_routes(server, profiler)
+
+        async def main():
+            app = web.Application()
+            app.add_routes(server.routes)
+            async with TestClient(TestServer(app)) as client:
+                enabled = await client.post(
+                    "/comfyassets/profiles", json={"fraction": 2}
+                )
+                summary = await client.get("/comfyassets/profiles?limit=5")
+                invalid = await client.get("/comfyassets/profiles?sort=name")
+                return await enabled.json(), await summary.json(), invalid.status
+
+        enabled, summary, invalid_status = asyncio.run(main())
+
+        assert enabled == {"fraction": 1.0}
+        assert summary["profiled"] == 0
+        assert summary["functions"] == []
+        assert invalid_status == 400
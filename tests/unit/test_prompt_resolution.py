@@ -0,0 +1,63 @@
+"""
+Unit tests for resolving selector nodes inside API-format prompts.
+"""
+
+import pytest  # noqa: F401
+
+
+class TestPromptResolution:
+    """Test prompt resolution helpers."""
+
+    def test_is_link(self):
+        """Test link detection."""
+        from prompt_resolution import is_link
+
+        assert is_link(["4", 0])
+        assert not is_link([4, 0])
+        assert not is_link("4")
+        assert not is_link([1024, 1024, 3])
+
+    def test_evaluate_node_uses_node_logic(self):
+        """Test nodes are evaluated with their own function."""
+        from prompt_resolution import evaluate_node
+
+        node = {
+            "class_type": "WidthHeightNode",
+            "inputs": {
+                "width": 512,
+                "height": 512,
+                "preset": "1216x832",
+                "swap_dimensions": True,
+            },
+        }
+        assert evaluate_node(node) == (832, 1216)
+
+    def test_evaluate_node_skips_links_and_unknown(self):
+        """Test linked or foreign nodes are not evaluated."""
+        from prompt_resolution import evaluate_node
+
+        linked = {"class_type": "WidthNode", "inputs": {"width": ["1", 0]}}
+        assert evaluate_node(linked) is None
+        assert evaluate_node({"class_type": "KSampler", "inputs": {}}) is None
+
+    def test_resolve_dimensions_pairs_width_and_height(self):
+        """Test WidthNode and HeightNode outputs are paired."""
+        from prompt_resolution import resolve_dimensions
+
+        prompt = {
+            "1": {
+                "class_type": "WidthNode",
+                "inputs": {"width": 640, "preset": "custom"},
+            },
+            "2": {
+                "class_type": "HeightNode",
+                "inputs": {"height": 512, "preset": "1536"},
+            },
+        }
+        assert resolve_dimensions(prompt) == ((640, 1536),)
+
+    def test_resolve_dimensions_without_nodes(self):
+        """Test prompts without dimension nodes resolve to None."""
+        from prompt_resolution import resolve_dimensions
+
+        assert resolve_dimensions({}) is None
@@ -0,0 +1,224 @@
+"""
+Unit tests for server-side sweep expansion and backpressured enqueueing.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+
+def sweep_prompt():
+    """Build an API-format prompt with every sweepable selector node."""
+    return {
+        "1": {"class_type": "SamplerSelector", "inputs": {"sampler_name": "euler"}},
+        "2": {"class_type": "SchedulerSelector", "inputs": {"scheduler": "normal"}},
+        "3": {
+            "class_type": "WidthHeightNode",
+            "inputs": {
+                "width": 1024,
+                "height": 1024,
+                "preset": "custom",
+                "swap_dimensions": False,
+            },
+        },
+        "4": {"class_type": "SeedHistory", "inputs": {"seed": 0}},
+        "5": {"class_type": "KSampler", "inputs": {"seed": ["4", 0]}},
+    }
+
+
+class StandInQueue:
+    """Stand-in for ComfyUI's PromptQueue that a test worker drains."""
+
+    def __init__(self):
+        self.items = []
+        self.max_depth = 0
+
+    def put(self, item):
+        self.items.append(item)
+        self.max_depth = max(self.max_depth, len(self.items))
+
+    def get_tasks_remaining(self):
+        return len(self.items)
+
+
+class TestExpandSweep:
+    """Test lazy sweep expansion."""
+
+    def test_cartesian_product(self):
+        """Test every combination is produced with inputs overridden."""
+        from prompt_sweep import expand_sweep, sweep_axes, sweep_size
+
+        prompt = sweep_prompt()
+        axes = sweep_axes(
+            prompt,
+            {
+                "samplers": ["euler", "dpmpp_2m"],
+                "presets": ["1024x1024", "832x1216"],
+                "seeds": {"start": 10, "count": 3},
+            },
+        )
+        items = list(expand_sweep(prompt, axes))
+
+        assert sweep_size(axes) == 12
+        assert len(items) == 12
+        index, values, first = items[0]
+        assert index == 0
+        assert values == {"samplers": "euler", "presets": "1024x1024", "seeds": 10}
+        assert first["4"]["inputs"]["seed"] == 10
+        assert items[-1][2]["1"]["inputs"]["sampler_name"] == "dpmpp_2m"
+        assert items[-1][2]["3"]["inputs"]["preset"] == "832x1216"
+        assert prompt["4"]["inputs"]["seed"] == 0  # original untouched
+
+    def test_expansion_is_lazy(self):
+        """Test huge sweeps are not materialized."""
+        from prompt_sweep import expand_sweep, sweep_axes, sweep_size
+
+        axes = sweep_axes(sweep_prompt(), {"seeds": {"start": 0, "count": 10**12}})
+        items = expand_sweep(sweep_prompt(), axes)
+
+        assert sweep_size(axes) == 10**12
+        assert next(items)[1] == {"seeds": 0}
+
+    @pytest.mark.parametrize(
+        "spec",
+        [{}, {"colors": ["red"]}, {"samplers": []}, {"samplers": "euler"}],
+    )
+    def test_invalid_specs(self, spec):
+        """Test malformed sweep specs are rejected."""
+        from prompt_sweep import sweep_axes
+
+        with pytest.raises(ValueError):
+            sweep_axes(sweep_prompt(), spec)
+
+    def test_missing_selector_node(self):
+        """Test sweeping an axis without its selector node is rejected."""
+        from prompt_sweep import sweep_axes
+
+        prompt = sweep_prompt()
+        del prompt["2"]
+        with pytest.raises(ValueError, match="SchedulerSelector"):
+            sweep_axes(prompt, {"schedulers": ["karras"]})
+
+
+class TestRunSweep:
+    """Test bounded, backpressured submission."""
+
+    def test_backpressure_bounds_queue_depth(self):
+        """Test the queue never grows past the configured depth."""
+        from prompt_sweep import expand_sweep, run_sweep, sweep_axes
+
+        queue = StandInQueue()
+        in_flight = {"now": 0, "max": 0}
+
+        async def submit(prompt):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0)
+            queue.put(prompt)
+            in_flight["now"] -= 1
+            return f"id-{prompt['4']['inputs']['seed']}"
+
+        async def worker():
+            while True:
+                await asyncio.sleep(0.001)
+                if queue.items:
+                    queue.items.pop(0)
+
+        async def main():
+            drain = asyncio.ensure_future(worker())
+            axes = sweep_axes(sweep_prompt(), {"seeds": {"start": 0, "count": 40}})
+            events = [
+                event
+                async for event in run_sweep(
+                    expand_sweep(sweep_prompt(), axes),
+                    submit,
+                    queue.get_tasks_remaining,
+                    max_queue_depth=5,
+                    concurrency=3,
+                    poll_interval=0.001,
+                )
+            ]
+            drain.cancel()
+            return events
+
+        events = asyncio.run(main())
+
+        assert len(events) == 40
+        assert sorted(event["index"] for event in events) == list(range(40))
+        assert queue.max_depth <= 5
+        assert in_flight["max"] <= 3
+
+    def test_errors_are_reported_per_prompt(self):
+        """Test a rejected prompt is reported without stopping the sweep."""
+        from prompt_sweep import expand_sweep, run_sweep, sweep_axes
+
+        async def submit(prompt):
+            if prompt["1"]["inputs"]["sampler_name"] == "bogus":
+                raise ValueError("Value not in list")
+            return "ok"
+
+        async def main():
+            axes = sweep_axes(sweep_prompt(), {"samplers": ["euler", "bogus"]})
+            return [
+                event
+                async for event in run_sweep(
+                    expand_sweep(sweep_prompt(), axes), submit, lambda: 0
+                )
+            ]
+
+        events = sorted(asyncio.run(main()), key=lambda event: event["index"])
+
+        assert events[0]["prompt_id"] == "ok"
+        assert events[1]["error"] == "Value not in list"
+
+
+class TestSweepRoute:
+    """Test the streaming HTTP route against a stand-in server."""
+
+    def test_route_streams_progress(self):
+        """Test the route queues every prompt and streams NDJSON progress."""
+        pytest.importorskip("aiohttp")
+        from aiohttp import web
+        from aiohttp.test_utils import TestClient, TestServer
+        from prompt_sweep import install_sweep_route
+
+        queue = StandInQueue()
+        server = type("StandInServer", (), {})()
+        server.routes = web.RouteTableDef()
+        server.prompt_queue = queue
+
+        def make_submitter(prompt_server, client_id):
+            async def submit(prompt):
+                prompt_server.prompt_queue.put(prompt)
+                return f"{client_id}-{len(queue.items)}"
+
+            return submit
+
+        install_sweep_route(server, max_queue_depth=100, make_submitter=make_submitter)
+
+        async def main():
+            app = web.Application()
+            app.add_routes(server.routes)
+            async with TestClient(TestServer(app)) as client:
+                response = await client.post(
+                    "/comfyassets/sweep",
+                    json={
+                        "prompt": sweep_prompt(),
+                        "client_id": "abc",
+                        "sweep": {"samplers": ["euler", "lcm"], "schedulers": ["beta"]},
+                    },
+                )
+                lines = (await response.text()).splitlines()
+                invalid = await client.post("/comfyassets/sweep", json={"sweep": {}})
+                return response.status, lines, invalid.status
+
+        status, lines, invalid_status = asyncio.run(main())
+        events = [json.loads(line) for line in lines]
+
+        assert status == 200
+        assert events[0] == {"total": 2}
+        assert events[-1] == {"finished": True, "queued": 2, "errors": 0}
+        assert {event["prompt_id"] for event in events[1:-1]} == {"abc-1", "abc-2"}
+        assert len(queue.items) == 2
+        assert invalid_status == 400
@@ -0,0 +1,81 @@
+"""
+Unit tests for the shared server hook helpers.
+"""
+
+import asyncio
+
+import pytest
+
+
+class Request:
+    def __init__(self, user):
+        self.headers = {"comfy-user": user}
+        self.remote = "192.0.2.1"
+
+
+class UserManager:
+    def get_request_user_id(self, request):
+        user = request.headers.get("comfy-user", "default")
+        if user not in ("default", "alice"):
+            raise KeyError("Unknown user: " + user)
+        return user
+
+
+class Server:
+    user_manager = UserManager()
+
+
+class TestRequester:
+    """Test requests are attributed to one user definition."""
+
+    def test_request_user(self):
+        """Test users come from ComfyUI's user manager or the remote address."""
+        from server_hooks import request_user
+
+        assert request_user(Request("alice"), Server()) == "alice"
+        assert request_user(Request("default"), Server()) == "192.0.2.1"
+        assert request_user(Request("alice")) == "192.0.2.1"
+
+    def test_unknown_user_is_not_attributed(self):
+        """Test users rejected by ComfyUI do not fall back to the address."""
+        from server_hooks import request_user
+
+        assert request_user(Request("mallory"), Server()) is None
+
+    def test_middleware_sets_requester(self):
+        """Test handlers see the sender, once per server, parsing the body once."""
+        pytest.importorskip("aiohttp")
+        import server_hooks
+        from aiohttp import web
+        from aiohttp.test_utils import TestClient, TestServer
+
+        server = Server()
+        server.app = web.Application()
+        assert server_hooks.install_requester_middleware(server)
+        assert server_hooks.install_requester_middleware(server)
+        assert len(server.app.middlewares) == 1
+
+        async def post_prompt(request):
+            first = await server_hooks.prompt_json(request)
+            second = await server_hooks.prompt_json(request)
+            return web.json_response(
+                {"user": server_hooks.current_requester(), "same": first is second}
+            )
+
+        server.app.router.add_post("/prompt", post_prompt)
+
+        async def main():
+            async with TestClient(TestServer(server.app)) as client:
+                response = await client.post(
+                    "/prompt", json={"prompt": {}}, headers={"comfy-user": "alice"}
+                )
+                return await response.json()
+
+        assert asyncio.run(main()) == {"user": "alice", "same": True}
+        assert server_hooks.current_requester() is None
+
+    def test_install_without_app(self):
+        """Test servers without an app are reported, not patched."""
+        from server_hooks import install_requester_middleware
+
+        assert install_requester_middleware(Server()) is False
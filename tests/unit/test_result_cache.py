@@ -0,0 +1,158 @@
+"""
+Unit tests for the content-addressed result cache and its nodes.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Point the shared result cache at a temporary directory."""
+    import result_cache
+
+    instance = result_cache.ResultCache(str(tmp_path / "cache"), 1024**2)
+    monkeypatch.setattr(result_cache, "_cache", instance)
+    return instance
+
+
+class TestCacheKey:
+    """Test cache key hashing."""
+
+    def test_key_is_stable_and_order_independent(self):
+        """Test equal parameters hash equally regardless of dict order."""
+        from result_cache import cache_key
+
+        first = cache_key({"seed": 1, "width": 512}, {"model": "a"})
+        second = cache_key({"width": 512, "seed": 1}, {"model": "a"})
+        assert first == second
+        assert len(first) == 64
+
+    def test_extra_keys_change_the_key(self):
+        """Test declared extra keys are part of the hash."""
+        from result_cache import cache_key
+
+        assert cache_key({"seed": 1}, {"model": "a"}) != cache_key(
+            {"seed": 1}, {"model": "b"}
+        )
+
+
+class TestResultCache:
+    """Test the on-disk LRU store."""
+
+    def test_put_and_get(self, cache):
+        """Test stored bytes are returned for their key."""
+        cache.put("ab" * 32, b"payload")
+
+        assert cache.contains("ab" * 32)
+        assert cache.get("ab" * 32) == b"payload"
+        assert cache.get("cd" * 32) is None
+        assert not cache.contains("cd" * 32)
+
+    def test_index_survives_restart(self, cache):
+        """Test a new cache on the same directory sees earlier entries."""
+        from result_cache import ResultCache
+
+        cache.put("ab" * 32, b"payload")
+        reopened = ResultCache(cache.root, cache.max_bytes)
+
+        assert reopened.get("ab" * 32) == b"payload"
+        assert reopened.total_bytes() == len(b"payload")
+
+    def test_least_recently_used_is_evicted(self, tmp_path):
+        """Test eviction keeps the cache under its size bound."""
+        from result_cache import ResultCache
+
+        cache = ResultCache(str(tmp_path / "cache"), 25)
+        keys = [f"{index:02d}" * 32 for index in range(3)]
+        cache.put(keys[0], b"a" * 10)
+        cache.put(keys[1], b"b" * 10)
+        cache.get(keys[0])  # key 1 is now the least recently used
+        cache.put(keys[2], b"c" * 10)
+
+        assert cache.contains(keys[0])
+        assert not cache.contains(keys[1])
+        assert cache.contains(keys[2])
+        assert cache.total_bytes() == 20
+
+    def test_missing_file_is_forgotten(self, cache):
+        """Test an entry whose file was deleted behaves as a miss."""
+        import os
+
+        cache.put("ab" * 32, b"payload")
+        os.remove(cache.path_for("ab" * 32))
+
+        assert not cache.contains("ab" * 32)
+        assert cache.get("ab" * 32) is None
+        assert cache.total_bytes() == 0
+
+    def test_failed_write_leaves_no_temp_file(self, cache, monkeypatch):
+        """Test a failed write removes its temporary file and stores nothing."""
+        import os
+
+        def fail(source, destination):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(os, "replace", fail)
+        with pytest.raises(OSError):
+            cache.put("ab" * 32, b"payload")
+
+        assert os.listdir(os.path.dirname(cache.path_for("ab" * 32))) == []
+        assert not cache.contains("ab" * 32)
+
+
+class TestResultCacheNodes:
+    """Test the ResultCacheKey and CachedImage nodes."""
+
+    def test_key_node_hashes_selector_values(self):
+        """Test the key node changes with any selector value."""
+        from result_cache_node import ResultCacheKey
+
+        node = ResultCacheKey()
+        key = node.make_key("euler", "normal", 1, 1024, 1024)
+        assert key == node.make_key("euler", "normal", 1, 1024, 1024)
+        assert key != node.make_key("euler", "normal", 2, 1024, 1024)
+        assert key != node.make_key("euler", "normal", 1, 1024, 1024, positive="cat")
+        required = ResultCacheKey.INPUT_TYPES()["required"]
+        assert required["width"][1]["max"] == required["height"][1]["max"] == 8192
+
+    def test_lazy_image_requested_only_on_miss(self, cache):
+        """Test the image input is only evaluated on a cache miss."""
+        from result_cache_node import CachedImage
+
+        node = CachedImage()
+        assert node.check_lazy_status("ab" * 32) == ["image"]
+
+        cache.put("ab" * 32, b"payload")
+        assert node.check_lazy_status("ab" * 32) == []
+
+    def test_image_round_trip(self, cache):
+        """Test a generated image is cached and returned on the next run."""
+        torch = pytest.importorskip("torch")
+        from result_cache_node import CachedImage
+
+        node = CachedImage()
+        image = torch.rand(1, 8, 8, 3)
+        assert node.get_image("ab" * 32, image)[0] is image
+
+        cached = node.get_image("ab" * 32)[0]
+        assert torch.equal(cached, image)
+
+    def test_hit_survives_eviction_before_execution(self, cache):
+        """Test a hit seen by check_lazy_status is served even if evicted."""
+        import io
+        import os
+
+        torch = pytest.importorskip("torch")
+        from result_cache_node import CachedImage
+
+        image = torch.rand(1, 8, 8, 3)
+        buffer = io.BytesIO()
+        torch.save(image, buffer)
+        cache.put("ab" * 32, buffer.getvalue())
+
+        node = CachedImage()
+        assert node.check_lazy_status("ab" * 32) == []
+        os.remove(cache.path_for("ab" * 32))
+
+        assert torch.equal(node.get_image("ab" * 32)[0], image)
+        assert node.check_lazy_status("ab" * 32) == ["image"]
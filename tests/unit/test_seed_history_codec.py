@@ -0,0 +1,125 @@
+"""
+Unit tests for the compact seed history codec.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+HISTORY = [
+    {"seed": 0xFFFFFFFFFFFFFFFF, "timestamp": 1760900000123},
+    {"seed": 42, "timestamp": 1760800000000},
+    {"seed": 0, "timestamp": 1760900000999},
+]
+
+# (history, encoding) pairs both codecs must agree on
+SHARED_VECTORS = [
+    (
+        [
+            {"seed": 9007199254740991, "timestamp": 1760900000123},
+            {"seed": 42, "timestamp": 1760800000000},
+            {"seed": 0, "timestamp": 1760900000999},
+        ],
+        "sh1:A_________8P9qWN3b9mKvWFr18AzpOvXw",
+    ),
+    (
+        [
+            {"seed": -1, "timestamp": 1760900000123},
+            {"seed": -42, "timestamp": 1760800000000},
+            {"seed": 7, "timestamp": 1760900000999},
+        ],
+        "sh1:A____________wH2pY3dv2bW__________8B9YWvXwfOk69f",
+    ),
+]
+
+FRONTEND = os.path.join(
+    os.path.dirname(__file__), "..", "..", "web", "seed_history_ui.js"
+)
+
+
+class TestSeedHistoryCodec:
+    """Test encoding and decoding seed history."""
+
+    def test_round_trip(self):
+        """Test entries survive an encode/decode round trip."""
+        from seed_history_codec import decode_history, encode_history
+
+        encoded = encode_history(HISTORY)
+        assert encoded.startswith("sh1:")
+        assert decode_history(encoded) == HISTORY
+
+    @pytest.mark.parametrize("history, encoded", SHARED_VECTORS)
+    def test_matches_frontend_encoding(self, history, encoded):
+        """Test the encoding matches the JavaScript implementation."""
+        from seed_history_codec import encode_history
+
+        assert encode_history(history) == encoded
+
+    def test_negative_seeds_wrap_to_64_bits(self):
+        """Test negative seeds are stored like the frontend stores them."""
+        from seed_history_codec import decode_history, encode_history
+
+        decoded = decode_history(encode_history([{"seed": -1, "timestamp": 5}]))
+        assert decoded == [{"seed": 2**64 - 1, "timestamp": 5}]
+
+    @pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+    def test_frontend_encodes_shared_vectors(self):
+        """Test the JavaScript encoder produces the shared vectors."""
+        with open(FRONTEND, "r", encoding="utf-8") as handle:
+            source = handle.read()
+        codec = source[
+            source.index("const HISTORY_CODEC_PREFIX") : source.index(
+                "// SeedHistory nodes are tracked"
+            )
+        ]
+        script = codec + (
+            "const vectors = JSON.parse(require('fs').readFileSync(0, 'utf8'));"
+            "console.log(JSON.stringify(vectors.map(encodeSeedHistory)));"
+        )
+        result = subprocess.run(
+            ["node", "-e", script],
+            input=json.dumps([history for history, _ in SHARED_VECTORS]),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert json.loads(result.stdout) == [encoded for _, encoded in SHARED_VECTORS]
+
+    def test_much_smaller_than_legacy_json(self):
+        """Test the compact form is far smaller than the legacy JSON array."""
+        from seed_history_codec import encode_history
+
+        history = [
+            {"seed": 123456789 + i, "timestamp": 1760900000000 - i * 5000}
+            for i in range(1000)
+        ]
+        legacy = json.dumps(
+            [dict(entry, dateString="10/19/2026, 6:00:00 PM") for entry in history]
+        )
+        assert len(encode_history(history)) * 4 < len(legacy)
+
+    def test_decodes_legacy_arrays(self):
+        """Test existing workflows with JSON arrays still decode."""
+        from seed_history_codec import decode_history
+
+        legacy = [dict(entry, dateString="whenever") for entry in HISTORY]
+        assert decode_history(legacy) == HISTORY
+        assert decode_history(None) == []
+
+    def test_empty_history(self):
+        """Test an empty history round trips."""
+        from seed_history_codec import decode_history, encode_history
+
+        assert decode_history(encode_history([])) == []
+
+    def test_invalid_data(self):
+        """Test unknown formats and truncated data are rejected."""
+        from seed_history_codec import decode_history, encode_history
+
+        with pytest.raises(ValueError):
+            decode_history("not-a-history")
+        with pytest.raises(ValueError):
+            decode_history(encode_history(HISTORY)[:-6])
@@ -0,0 +1,233 @@
+"""
+Unit tests for the namespaced server-side seed history store.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a small store in a temporary directory."""
+    from seed_history_store import SeedHistoryStore
+
+    return SeedHistoryStore(str(tmp_path / "history"), namespace_cap=3, max_entries=5)
+
+
+class TestSeedHistoryStore:
+    """Test per-namespace history and global memory bounds."""
+
+    def test_namespaces_are_isolated(self, store):
+        """Test each namespace only sees its own seeds."""
+        store.append("alice", 1, timestamp=10)
+        store.append("bob", 2, timestamp=20)
+
+        assert store.history("alice") == [{"seed": 1, "timestamp": 10}]
+        assert store.history("bob") == [{"seed": 2, "timestamp": 20}]
+        assert store.history("carol") == []
+
+    def test_reused_seed_moves_to_front(self, store):
+        """Test a repeated seed is moved to the front instead of duplicated."""
+        store.append("alice", 1, timestamp=10)
+        store.append("alice", 2, timestamp=20)
+        store.append("alice", 1, timestamp=30)
+
+        assert [entry["seed"] for entry in store.history("alice")] == [1, 2]
+        assert store.entries_in_memory == 2
+
+    def test_namespace_cap_drops_oldest(self, store):
+        """Test each namespace is trimmed to its cap."""
+        for seed in range(5):
+            store.append("alice", seed, timestamp=seed)
+
+        assert [entry["seed"] for entry in store.history("alice")] == [4, 3, 2]
+        assert store.history("alice", limit=1) == [{"seed": 4, "timestamp": 4}]
+
+    def test_cold_namespaces_spill_to_disk(self, store):
+        """Test the global bound evicts cold namespaces and reloads them."""
+        for seed in range(3):
+            store.append("alice", seed, timestamp=seed)
+        for seed in range(3):
+            store.append("bob", seed + 10, timestamp=seed)
+
+        assert store.entries_in_memory <= 5
+        assert store.namespaces_in_memory == 1
+
+        assert [entry["seed"] for entry in store.history("alice")] == [2, 1, 0]
+        assert store.entries_in_memory <= 5
+
+    def test_flush_persists_across_instances(self, store):
+        """Test flushed history is visible to a new store."""
+        from seed_history_store import SeedHistoryStore
+
+        store.append("alice", 7, timestamp=70)
+        store.flush()
+
+        reopened = SeedHistoryStore(store.directory)
+        assert reopened.history("alice") == [{"seed": 7, "timestamp": 70}]
+
+    def test_clear(self, store):
+        """Test clearing one namespace leaves the others."""
+        store.append("alice", 1)
+        store.append("bob", 2)
+        store.clear("alice")
+
+        assert store.history("alice") == []
+        assert len(store.history("bob")) == 1
+
+    def test_many_tenants_stay_bounded(self, tmp_path):
+        """Test thousands of namespaces keep memory under the entry bound."""
+        from seed_history_store import SeedHistoryStore
+
+        store = SeedHistoryStore(str(tmp_path), namespace_cap=10, max_entries=100)
+        for tenant in range(2000):
+            store.append(f"user-{tenant}", tenant)
+
+        assert store.entries_in_memory <= 100
+        assert [entry["seed"] for entry in store.history("user-0")] == [0]
+
+
+class TestSeedHistoryNodeRecording:
+    """Test the SeedHistory node records into the configured store."""
+
+    def test_node_records_current_client(self, store, monkeypatch):
+        """Test executed seeds land in the executing client's namespace."""
+        import seed_history_store
+        from random_value_tracker import SeedHistory
+
+        monkeypatch.setattr(seed_history_store, "_store", store)
+        monkeypatch.setattr(seed_history_store, "current_namespace", lambda: "client-a")
+
+        assert SeedHistory().output_seed(42) == (42,)
+        assert store.history("client-a")[0]["seed"] == 42
+
+    def test_store_disabled_by_default(self, monkeypatch):
+        """Test no store exists without a configured directory."""
+        import seed_history_store
+
+        monkeypatch.delenv("COMFYASSETS_SEED_HISTORY_DIR", raising=False)
+        monkeypatch.setattr(seed_history_store, "_store", None)
+
+        assert seed_history_store.get_seed_history_store() is None
+
+
+class StandInUserManager:
+    """Resolves the ``comfy-user`` header like ComfyUI with ``--multi-user``."""
+
+    def get_request_user_id(self, request):
+        user = request.headers.get("comfy-user", "default")
+        if user not in ("alice", "bob"):
+            raise KeyError("Unknown user")
+        return user
+
+
+class StandInQueue:
+    """Queue items as ComfyUI builds them: ``(number, id, prompt, extra_data, outputs)``."""
+
+    def __init__(self):
+        self.items = []
+
+    def put(self, json_data):
+        extra_data = dict(json_data.get("extra_data", {}))
+        extra_data["client_id"] = json_data.get("client_id")
+        self.items.append((len(self.items), str(len(self.items)), {}, extra_data, []))
+
+    def get(self, timeout=None):
+        return (self.items.pop(0), 0) if self.items else None
+
+
+class TestSeedHistoryRoutes:
+    """Test the routes only serve the requesting user's namespaces."""
+
+    def test_history_is_scoped_to_the_submitting_user(self, store, monkeypatch):
+        """Test another user cannot read or clear a client id's history."""
+        pytest.importorskip("aiohttp")
+        import asyncio
+
+        import seed_history_store
+        from aiohttp import web
+        from aiohttp.test_utils import TestClient, TestServer
+
+        monkeypatch.setattr(
+            seed_history_store, "_executing", {"user": None, "client_id": None}
+        )
+        server = type("StandInServer", (), {})()
+        server.app = web.Application()
+        server.routes = web.RouteTableDef()
+        server.user_manager = StandInUserManager()
+        server.prompt_queue = StandInQueue()
+        server.handlers = []
+        server.add_on_prompt_handler = server.handlers.append
+        seed_history_store.install_seed_history_routes(server, store)
+
+        @server.routes.post("/prompt")
+        async def post_prompt(request):
+            json_data = await request.json()
+            for handler in server.handlers:
+                json_data = handler(json_data)
+            server.prompt_queue.put(json_data)
+            return web.json_response({})
+
+        async def main():
+            server.app.add_routes(server.routes)
+            async with TestClient(TestServer(server.app)) as client:
+
+                async def call(method, user, client_id="c1"):
+                    response = await client.request(
+                        method,
+                        "/comfyassets/seed_history",
+                        params={"client_id": client_id},
+                        headers={"comfy-user": user},
+                    )
+                    body = await response.json() if response.status == 200 else None
+                    return response.status, body
+
+                await client.post(
+                    "/prompt", json={"client_id": "c1"}, headers={"comfy-user": "alice"}
+                )
+                await client.post(
+                    "/prompt", json={"client_id": "c1"}, headers={"comfy-user": "bob"}
+                )
+                for seed in (42, 7):
+                    server.prompt_queue.get()
+                    store.append(seed_history_store.current_namespace(), seed)
+                return [
+                    await call("GET", "bob"),
+                    await call("DELETE", "bob"),
+                    await call("GET", "mallory"),
+                    await call("GET", "alice"),
+                ]
+
+        bob_get, bob_delete, unknown, alice_get = asyncio.run(main())
+
+        assert [entry["seed"] for entry in bob_get[1]["history"]] == [7]
+        assert bob_delete[0] == 200
+        assert unknown[0] == 403
+        assert [entry["seed"] for entry in alice_get[1]["history"]] == [42]
+
+    def test_unknown_submitter_is_not_recorded(self, monkeypatch):
+        """Test prompts of unknown users, or with a forged user, are skipped."""
+        pytest.importorskip("aiohttp")
+        import seed_history_store
+        from aiohttp import web
+
+        monkeypatch.setattr(
+            seed_history_store, "_executing", {"user": None, "client_id": None}
+        )
+        server = type("StandInServer", (), {})()
+        server.routes = web.RouteTableDef()
+        server.prompt_queue = StandInQueue()
+        server.handlers = []
+        server.add_on_prompt_handler = server.handlers.append
+        seed_history_store.install_seed_history_routes(server, object())
+
+        json_data = {
+            "client_id": "c1",
+            "extra_data": {seed_history_store.USER_KEY: "alice"},
+        }
+        for handler in server.handlers:
+            json_data = handler(json_data)
+        server.prompt_queue.put(json_data)
+        server.prompt_queue.get()
+
+        assert seed_history_store.USER_KEY not in json_data["extra_data"]
+        assert seed_history_store.current_namespace() is None
@@ -0,0 +1,155 @@
+"""
+Unit tests for shape-bucketed queue reordering.
+"""
+
+import heapq
+import threading
+
+import pytest
+
+
+def make_prompt(width, height):
+    """Build a minimal API-format prompt with a WidthHeightNode."""
+    return {
+        "1": {
+            "class_type": "WidthHeightNode",
+            "inputs": {
+                "width": width,
+                "height": height,
+                "preset": "custom",
+                "swap_dimensions": False,
+            },
+        },
+        "2": {"class_type": "EmptyLatentImage", "inputs": {"width": ["1", 0]}},
+    }
+
+
+class StandInQueue:
+    """Minimal stand-in for ComfyUI's PromptQueue."""
+
+    def __init__(self):
+        self.mutex = threading.RLock()
+        self.queue = []
+
+    def put(self, item):
+        with self.mutex:
+            heapq.heappush(self.queue, item)
+
+    def get(self, timeout=None):
+        with self.mutex:
+            if not self.queue:
+                return None
+            return (heapq.heappop(self.queue), 0)
+
+
+class TestShapeBucketPolicy:
+    """Test the reorder policy."""
+
+    def test_prefers_current_shape_within_window(self):
+        """Test matching shapes jump ahead inside the window."""
+        from shape_bucketing import ShapeBucketPolicy
+
+        policy = ShapeBucketPolicy(window=3, max_skips=2)
+        pending = [("a", (512, 512)), ("b", (512, 512)), ("c", (1024, 1024))]
+        assert policy.select(pending, (1024, 1024)) == 2
+
+    def test_window_bounds_lookahead(self):
+        """Test items beyond the window are not considered."""
+        from shape_bucketing import ShapeBucketPolicy
+
+        policy = ShapeBucketPolicy(window=2, max_skips=2)
+        pending = [("a", (512, 512)), ("b", (512, 512)), ("c", (1024, 1024))]
+        assert policy.select(pending, (1024, 1024)) == 0
+
+    def test_max_skips_prevents_starvation(self):
+        """Test an item is never bypassed more than max_skips times."""
+        from shape_bucketing import ShapeBucketPolicy
+
+        policy = ShapeBucketPolicy(window=4, max_skips=1)
+        pending = [("a", (512, 512)), ("b", (1024, 1024)), ("c", (1024, 1024))]
+        assert policy.select(pending, (1024, 1024)) == 1
+        pending.pop(1)
+        assert policy.select(pending, (1024, 1024)) == 0
+
+    def test_invalid_arguments(self):
+        """Test invalid policy settings are rejected."""
+        from shape_bucketing import ShapeBucketPolicy
+
+        with pytest.raises(ValueError):
+            ShapeBucketPolicy(window=0)
+        with pytest.raises(ValueError):
+            ShapeBucketPolicy(max_skips=-1)
+
+
+class TestQueueHook:
+    """Test the PromptQueue wrapper."""
+
+    def test_reorders_same_shape_first(self):
+        """Test the hook serves same-shape prompts back to back."""
+        from shape_bucketing import ShapeBucketPolicy, install_queue_reordering
+
+        queue = StandInQueue()
+        install_queue_reordering(queue, ShapeBucketPolicy(window=4, max_skips=4))
+        shapes = [(1024, 1024), (512, 512), (1024, 1024), (512, 512)]
+        for number, (width, height) in enumerate(shapes):
+            queue.put((number, f"p{number}", make_prompt(width, height), {}, []))
+
+        served = []
+        while True:
+            result = queue.get()
+            if result is None:
+                break
+            served.append(result[0][1])
+
+        assert served == ["p0", "p2", "p1", "p3"]
+
+    def test_numbers_stay_ordered(self):
+        """Test reordered items keep the original set of numbers."""
+        from shape_bucketing import ShapeBucketPolicy, install_queue_reordering
+
+        queue = StandInQueue()
+        install_queue_reordering(queue, ShapeBucketPolicy(window=4, max_skips=4))
+        for number, size in enumerate([512, 768, 512]):
+            queue.put((number, f"p{number}", make_prompt(size, size), {}, []))
+
+        first = queue.get()[0]
+        second = queue.get()[0]
+        assert (first[0], first[1]) == (0, "p0")
+        assert (second[0], second[1]) == (1, "p2")
+
+
+class TestSimulator:
+    """Test the queue trace simulator."""
+
+    def test_bucketing_reduces_switches(self):
+        """Test bucketed replay switches shapes less often than FIFO."""
+        from shape_bucketing import ShapeBucketPolicy, simulate
+
+        trace = [(0.0, (512, 512) if i % 2 else (1024, 1024)) for i in range(12)]
+        fifo = simulate(trace, None, switch_penalty=1.0)
+        bucketed = simulate(trace, ShapeBucketPolicy(8, 8), switch_penalty=1.0)
+
+        assert bucketed["switches"] < fifo["switches"]
+        assert bucketed["makespan"] < fifo["makespan"]
+        assert sorted(bucketed["order"]) == list(range(12))
+
+    def test_idle_worker_jumps_to_next_arrival(self):
+        """Test the clock skips idle time between arrivals."""
+        from shape_bucketing import simulate
+
+        result = simulate([(0.0, (512, 512)), (10.0, (512, 512))])
+        assert result["makespan"] == 11.0
+        assert result["max_wait"] == 0.0
+
+    def test_cli_replays_trace(self, tmp_path, capsys):
+        """Test the script entry point compares FIFO and bucketed order."""
+        from shape_bucketing import main
+
+        trace = tmp_path / "trace.jsonl"
+        trace.write_text(
+            '{"arrival": 0, "width": 512, "height": 512}\n'
+            '{"arrival": 0, "width": 1024, "height": 1024}\n'
+        )
+        assert main([str(trace)]) == 0
+        output = capsys.readouterr().out
+        assert "fifo" in output and "bucketed" in output
@@ -0,0 +1,221 @@
+"""
+Unit tests for the background per-shape warm-up runs.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPresetShapes:
+    """Test where warm-up shapes come from."""
+
+    def test_presets_in_order(self):
+        """Test the WidthHeightNode presets are parsed and limited."""
+        from shape_warmup import preset_shapes
+
+        shapes = preset_shapes()
+
+        assert shapes[0] == (1024, 1024)
+        assert len(shapes) == 9
+        assert preset_shapes(limit=2) == [(1024, 1024), (1152, 896)]
+
+    def test_ranked_by_output_index(self, tmp_path):
+        """Test presets used most in the output index come first."""
+        from png_metadata_index import MetadataIndex
+        from shape_warmup import preset_shapes
+
+        db_path = str(tmp_path / "index.sqlite")
+        with MetadataIndex(db_path) as index, index.connection:
+            index.connection.executemany(
+                "INSERT INTO params VALUES (?, 'size', ?)",
+                [("a.png", "832x1216"), ("b.png", "832x1216"), ("c.png", "640x1536")],
+            )
+
+        assert preset_shapes(db_path, limit=3) == [
+            (832, 1216),
+            (640, 1536),
+            (1024, 1024),
+        ]
+
+    def test_missing_index_keeps_preset_order(self, tmp_path):
+        """Test a missing index falls back to the preset order."""
+        from shape_warmup import preset_shapes
+
+        assert preset_shapes(str(tmp_path / "missing.sqlite")) == preset_shapes()
+
+
+class TestWarmupRun:
+    """Test runs with stand-in callbacks on CPU."""
+
+    def test_runs_every_callback_per_shape(self):
+        """Test callbacks run per shape and progress is reported."""
+        from shape_warmup import WarmupRun
+
+        calls = []
+        reports = []
+        run = WarmupRun(
+            [(512, 512), (832, 1216)],
+            [
+                ("a", lambda w, h: calls.append(("a", w, h))),
+                ("b", lambda w, h: calls.append(("b", w, h))),
+            ],
+            on_progress=reports.append,
+        )
+        run.run()
+
+        assert calls == [
+            ("a", 512, 512),
+            ("b", 512, 512),
+            ("a", 832, 1216),
+            ("b", 832, 1216),
+        ]
+        assert run.progress()["state"] == "finished"
+        assert run.progress()["done"] == 4
+        assert reports[0]["state"] == "running"
+        assert {"name": "b", "width": 832, "height": 1216} in [
+            report["current"] for report in reports
+        ]
+
+    def test_budget_stops_the_run(self):
+        """Test no callback starts once the time budget is spent."""
+        from shape_warmup import WarmupRun
+
+        clock = FakeClock()
+
+        def slow(width, height):
+            clock.now += 4
+
+        run = WarmupRun([(512, 512)] * 5, [("slow", slow)], budget=10, clock=clock)
+        run.run()
+
+        assert run.progress()["state"] == "out_of_budget"
+        assert run.progress()["done"] == 3
+
+    def test_cancel(self):
+        """Test cancelling stops a background run between callbacks."""
+        from shape_warmup import WarmupRun
+
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking(width, height):
+            started.set()
+            release.wait(5)
+
+        run = WarmupRun([(512, 512)] * 3, [("block", blocking)], budget=0).start()
+        assert started.wait(5)
+        run.cancel()
+        release.set()
+
+        assert run.wait(5)
+        assert run.progress()["state"] == "cancelled"
+        assert run.progress()["done"] == 1
+
+    def test_errors_are_collected(self):
+        """Test a failing callback does not stop the run."""
+        from shape_warmup import WarmupRun
+
+        def broken(width, height):
+            raise RuntimeError("no device")
+
+        run = WarmupRun([(512, 512), (640, 640)], [("broken", broken)])
+        run.run()
+
+        progress = run.progress()
+        assert progress["state"] == "finished"
+        assert progress["errors"] == [
+            "broken 512x512: no device",
+            "broken 640x640: no device",
+        ]
+
+
+class TestWarmupController:
+    """Test one run at a time and registered callbacks."""
+
+    def test_single_active_run(self):
+        """Test a second start while running returns the active run."""
+        import shape_warmup as warmup
+
+        release = threading.Event()
+        warmup.register_warmup("test_block", lambda w, h: release.wait(5))
+        controller = warmup.WarmupController(limit=1)
+        try:
+            run, started = controller.start()
+            again, started_again = controller.start()
+
+            assert started and not started_again
+            assert again is run
+            assert [name for name, _ in run.callbacks][-1] == "test_block"
+            release.set()
+            assert run.wait(5)
+            assert controller.start([(512, 512)], budget=1)[1]
+        finally:
+            release.set()
+            warmup.unregister_warmup("test_block")
+            controller.cancel()
+            controller.run.wait(5)
+
+    def test_latent_pool_warmup(self):
+        """Test the built-in callback fills the latent pool."""
+        torch = pytest.importorskip("torch")
+        from latent_pool import get_latent_pool
+        from shape_warmup import warm_latent_pool
+
+        warm_latent_pool(512, 768)
+        hits = get_latent_pool().stats["hits"]
+        latent = get_latent_pool().zeros((1, 4, 96, 64), device="cpu")
+
+        assert get_latent_pool().stats["hits"] == hits + 1
+        assert latent.dtype == torch.float32
+
+    def test_shapes_are_checked(self):
+        """Test sizes outside WidthHeightNode's range or step are refused."""
+        from shape_warmup import parse_size, warm_latent_pool
+
+        assert parse_size("832X1216") == (832, 1216)
+        for size in ("32x1024", "1024x1020", "16384x1024", "-64x64"):
+            with pytest.raises(ValueError):
+                parse_size(size)
+        with pytest.raises(ValueError, match="multiple of 8 from 64 to 8192"):
+            warm_latent_pool(100000, 1024)
+
+    def test_route_rejects_bad_requests(self):
+        """Test invalid shapes and negative limits answer 400 without a run."""
+        pytest.importorskip("aiohttp")
+        import shape_warmup as warmup
+        from aiohttp import web
+        from aiohttp.test_utils import TestClient, TestServer
+
+        server = type("StandInServer", (), {})()
+        server.routes = web.RouteTableDef()
+        controller = warmup.WarmupController()
+        warmup.install_warmup_routes(server, controller)
+
+        async def main():
+            app = web.Application()
+            app.add_routes(server.routes)
+            statuses = []
+            async with TestClient(TestServer(app)) as client:
+                for body in (
+                    {"shapes": ["100000x100000"]},
+                    {"shapes": ["1004x1000"]},
+                    {"limit": -1},
+                    {"budget": -5},
+                    {"shapes": "1024x1024x"},
+                ):
+                    response = await client.post("/comfyassets/warmup", json=body)
+                    statuses.append(response.status)
+            return statuses
+
+        assert asyncio.run(main()) == [400] * 5
+        assert controller.run is None
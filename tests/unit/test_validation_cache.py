@@ -0,0 +1,233 @@
+"""
+Unit tests for the incremental prompt validation cache.
+"""
+
+import asyncio
+
+
+def counting_validator(node_classes, calls):
+    """Wrap the reference validator to record the targets of each call."""
+    import validation_cache
+
+    full = validation_cache.reference_validate(node_classes)
+
+    def validate_prompt(prompt_id, prompt, partial_execution_targets=None):
+        calls.append(partial_execution_targets)
+        return full(prompt_id, prompt, partial_execution_targets)
+
+    return validate_prompt
+
+
+def workflow(branches=3):
+    import validation_cache
+
+    return validation_cache.benchmark_workflow(branches)
+
+
+def with_input(prompt, node_id, name, value):
+    """Return a copy of ``prompt`` with one input of one node changed."""
+    node = prompt[node_id]
+    changed = dict(prompt)
+    changed[node_id] = dict(node, inputs=dict(node["inputs"], **{name: value}))
+    return changed
+
+
+class TestStructureHashes:
+    """Test the per-node subgraph hashes."""
+
+    def test_selector_literals_are_ignored(self):
+        """Test a new seed or sampler keeps every hash."""
+        from validation_cache import structure_hashes
+
+        _, prompt = workflow(1)
+        before = structure_hashes(prompt)
+        reseeded = structure_hashes(with_input(prompt, "4", "seed", 12345))
+        resampled = structure_hashes(with_input(prompt, "1", "sampler_name", "heun"))
+
+        assert reseeded == before
+        assert resampled == before
+
+    def test_changes_propagate_downstream(self):
+        """Test a changed literal changes the node and its dependents only."""
+        from validation_cache import structure_hashes
+
+        _, prompt = workflow(2)
+        before = structure_hashes(prompt)
+        after = structure_hashes(with_input(prompt, "5", "steps", 30))
+
+        assert after["5"] != before["5"]
+        assert after["6"] != before["6"]
+        assert after["0"] == before["0"]
+        assert after["13"] == before["13"]
+
+    def test_dangling_links_and_cycles(self):
+        """Test broken graphs hash to None."""
+        from validation_cache import structure_hashes
+
+        prompt = {
+            "1": {"class_type": "A", "inputs": {"x": ["2", 0]}},
+            "2": {"class_type": "A", "inputs": {"x": ["1", 0]}},
+            "3": {"class_type": "A", "inputs": {"x": ["9", 0]}},
+        }
+        assert structure_hashes(prompt) == {"1": None, "2": None, "3": None}
+
+
+class TestLiteralChecks:
+    """Test the precomputed selector checks."""
+
+    def test_checks_use_node_lists(self):
+        """Test sampler names and ranges are checked against INPUT_TYPES."""
+        import validation_cache as cache
+
+        classes = cache.checked_classes()
+        sampler = cache.input_checks(classes["SamplerSelector"])
+        size = cache.input_checks(classes["WidthHeightNode"])
+
+        assert cache.literals_valid({"inputs": {"sampler_name": "euler"}}, sampler)
+        assert not cache.literals_valid({"inputs": {"sampler_name": "bogus"}}, sampler)
+        assert not cache.literals_valid({"inputs": {}}, sampler)
+        node = {
+            "inputs": {
+                "preset": "custom",
+                "width": 99999,
+                "height": 512,
+                "swap_dimensions": False,
+            }
+        }
+        assert not cache.literals_valid(node, size)
+        node["inputs"]["width"] = ["7", 0]
+        assert cache.literals_valid(node, size)
+
+
+class TestIncrementalValidator:
+    """Test cached validation around a ComfyUI-style validator."""
+
+    def test_seed_change_skips_validation(self):
+        """Test resubmitting with a new seed does not call the validator."""
+        from validation_cache import IncrementalValidator, ValidationCache
+
+        node_classes, prompt = workflow()
+        calls = []
+        validate = IncrementalValidator(
+            counting_validator(node_classes, calls), ValidationCache(), node_classes
+        ).wrap()
+
+        first = validate("a", prompt, None)
+        second = validate("b", with_input(prompt, "4", "seed", 77), None)
+
+        assert first[0] and second[0]
+        assert sorted(second[2]) == ["13", "20", "6"]
+        assert len(calls) == 1
+
+    def test_only_changed_outputs_are_revalidated(self):
+        """Test a changed branch is validated as a partial target."""
+        from validation_cache import IncrementalValidator, ValidationCache
+
+        node_classes, prompt = workflow()
+        calls = []
+        validate = IncrementalValidator(
+            counting_validator(node_classes, calls), ValidationCache(), node_classes
+        ).wrap()
+
+        validate("a", prompt, None)
+        result = validate("b", with_input(prompt, "12", "steps", 40), None)
+
+        assert calls[-1] == ["13"]
+        assert result[0] and sorted(result[2]) == ["13", "20", "6"]
+
+    def test_invalid_selector_goes_to_full_validation(self):
+        """Test a bad selector value is reported by the real validator."""
+        from validation_cache import IncrementalValidator, ValidationCache
+
+        node_classes, prompt = workflow(1)
+        calls = []
+        validate = IncrementalValidator(
+            counting_validator(node_classes, calls), ValidationCache(), node_classes
+        ).wrap()
+
+        validate("a", prompt, None)
+        result = validate("b", with_input(prompt, "2", "scheduler", "bogus"), None)
+
+        assert calls == [None, None]
+        assert not result[0]
+
+    def test_failed_outputs_are_not_cached(self):
+        """Test invalid subgraphs are validated again on every submission."""
+        from validation_cache import IncrementalValidator, ValidationCache
+
+        node_classes, prompt = workflow(1)
+        broken = with_input(prompt, "0", "ckpt_name", "missing.safetensors")
+        calls = []
+        cache = ValidationCache()
+        validate = IncrementalValidator(
+            counting_validator(node_classes, calls), cache, node_classes
+        ).wrap()
+
+        assert not validate("a", broken, None)[0]
+        assert not validate("b", broken, None)[0]
+        assert len(calls) == 2 and len(cache) == 0
+
+    def test_async_validator(self):
+        """Test coroutine validators stay coroutines."""
+        from validation_cache import IncrementalValidator, ValidationCache
+
+        node_classes, prompt = workflow(1)
+        calls = []
+        sync_validate = counting_validator(node_classes, calls)
+
+        async def validate_prompt(prompt_id, prompt, partial_execution_targets):
+            return sync_validate(prompt_id, prompt, partial_execution_targets)
+
+        validate = IncrementalValidator(
+            validate_prompt, ValidationCache(), node_classes
+        ).wrap()
+
+        assert asyncio.run(validate("a", prompt, None))[0]
+        assert asyncio.run(validate("b", prompt, None)) == (True, None, ["6"], {})
+        assert len(calls) == 1
+
+
+class TestValidationCache:
+    """Test the bounded, expiring cache."""
+
+    def test_eviction_and_expiry(self):
+        """Test least recently used hashes are dropped and old ones expire."""
+        from validation_cache import ValidationCache
+
+        now = [0.0]
+        cache = ValidationCache(max_entries=2, ttl=10, clock=lambda: now[0])
+        cache.add("a")
+        cache.add("b")
+        assert "a" in cache
+        cache.add("c")
+
+        assert "b" not in cache
+        assert cache.stats["evictions"] == 1
+        now[0] = 11
+        assert "a" not in cache
+
+    def test_install_wraps_module_once(self):
+        """Test install replaces validate_prompt and is idempotent."""
+        import types
+
+        from validation_cache import ValidationCache, install_validation_cache
+
+        node_classes, _ = workflow(1)
+        module = types.SimpleNamespace(
+            validate_prompt=counting_validator(node_classes, [])
+        )
+        cache = install_validation_cache(ValidationCache(), module, node_classes)
+
+        assert module.validate_prompt.validation_cache is cache
+        assert (
+            install_validation_cache(ValidationCache(), module, node_classes) is cache
+        )
+
+
+def test_benchmark_cached_is_faster():
+    """Test the cached path beats full validation on a large workflow."""
+    from validation_cache import benchmark
+
+    timings = benchmark(branches=150, submissions=10)
+
+    assert timings["cached"] < timings["full"]
@@ -0,0 +1,251 @@
+// ComfyUI_Selectors - Dimension nodes (presets, swap button, snap report)
+import { app } from "../../scripts/app.js";
+
+const DIMENSION_NODES = [
+  "WidthNode",
+  "HeightNode",
+  "WidthHeightNode",
+  "WidthHeightLatent",
+];
+const PAIR_NODES = ["WidthHeightNode", "WidthHeightLatent"];
+const SWAP_BUTTON_SIZE = 24;
+const SWAP_BUTTON_MARGIN = 6;
+
+// Preset tables come from the Python node definitions (/object_info), so
+// the frontend never carries its own copy of the preset list.
+function getPresetOptions(nodeData) {
+  const preset = nodeData.input?.required?.preset;
+  return Array.isArray(preset?.[0]) ? preset[0] : [];
+}
+
+function parsePresetSize(preset) {
+  const match = /^(\d+)x(\d+)/.exec(preset);
+  return match ? { width: Number(match[1]), height: Number(match[2]) } : null;
+}
+
+function findWidget(node, name) {
+  return node.widgets?.find((w) => w.name === name);
+}
+
+function setWidgetValue(node, widget, value) {
+  widget.value = value;
+  widget.callback?.(value, node, widget);
+}
+
+// The swap icon is drawn once per pixel ratio into an offscreen bitmap and
+// blitted on every frame afterwards.
+const swapButtonBitmaps = new Map();
+
+function getSwapButtonBitmap() {
+  const ratio = window.devicePixelRatio || 1;
+  let bitmap = swapButtonBitmaps.get(ratio);
+  if (bitmap) return bitmap;
+
+  const pixels = Math.ceil(SWAP_BUTTON_SIZE * ratio);
+  if (typeof OffscreenCanvas !== "undefined") {
+    bitmap = new OffscreenCanvas(pixels, pixels);
+  } else {
+    bitmap = document.createElement("canvas");
+    bitmap.width = pixels;
+    bitmap.height = pixels;
+  }
+
+  const ctx = bitmap.getContext("2d");
+  ctx.scale(ratio, ratio);
+
+  // Button background and border
+  ctx.fillStyle = "rgba(100,100,100,0.8)";
+  ctx.strokeStyle = "rgba(200,200,200,0.9)";
+  ctx.lineWidth = 1;
+  ctx.beginPath();
+  ctx.roundRect(0.5, 0.5, SWAP_BUTTON_SIZE - 1, SWAP_BUTTON_SIZE - 1, 2);
+  ctx.fill();
+  ctx.stroke();
+
+  // Stacked arrows: top pointing right, bottom pointing left
+  const center = SWAP_BUTTON_SIZE / 2;
+  ctx.strokeStyle = "rgba(255,255,255,0.9)";
+  ctx.lineWidth = 2;
+  ctx.lineCap = "round";
+  ctx.beginPath();
+  ctx.moveTo(center - 6, center - 3);
+  ctx.lineTo(center + 6, center - 3);
+  ctx.moveTo(center + 6, center - 3);
+  ctx.lineTo(center + 3, center - 5);
+  ctx.moveTo(center + 6, center - 3);
+  ctx.lineTo(center + 3, center - 1);
+  ctx.moveTo(center + 6, center + 3);
+  ctx.lineTo(center - 6, center + 3);
+  ctx.moveTo(center - 6, center + 3);
+  ctx.lineTo(center - 3, center + 1);
+  ctx.moveTo(center - 6, center + 3);
+  ctx.lineTo(center - 3, center + 5);
+  ctx.stroke();
+
+  swapButtonBitmaps.set(ratio, bitmap);
+  return bitmap;
+}
+
+function swapButtonBounds(node) {
+  return {
+    x: node.size[0] - SWAP_BUTTON_SIZE - SWAP_BUTTON_MARGIN,
+    y: node.size[1] - SWAP_BUTTON_SIZE - SWAP_BUTTON_MARGIN,
+  };
+}
+
+function setupWidthHeightNode(nodeType, nodeData) {
+  const presets = getPresetOptions(nodeData);
+  const presetSizes = new Map();
+  for (const preset of presets) {
+    const size = parsePresetSize(preset);
+    if (size) presetSizes.set(preset, size);
+  }
+
+  const onNodeCreated = nodeType.prototype.onNodeCreated;
+  nodeType.prototype.onNodeCreated = function () {
+    const result = onNodeCreated?.apply(this, arguments);
+
+    // The swap button replaces the swap_dimensions toggle
+    const swapWidget = findWidget(this, "swap_dimensions");
+    if (swapWidget) {
+      swapWidget.type = "hidden";
+      swapWidget.hidden = true;
+    }
+
+    const presetWidget = findWidget(this, "preset");
+    const widthWidget = findWidget(this, "width");
+    const heightWidget = findWidget(this, "height");
+    if (presetWidget && widthWidget && heightWidget) {
+      const originalCallback = presetWidget.callback;
+      presetWidget.callback = function (value) {
+        const size = presetSizes.get(value);
+        if (size) {
+          widthWidget.value = size.width;
+          heightWidget.value = size.height;
+        }
+        return originalCallback?.apply(this, arguments);
+      };
+    }
+
+    return result;
+  };
+
+  nodeType.prototype.swapDimensions = function () {
+    const presetWidget = findWidget(this, "preset");
+    const widthWidget = findWidget(this, "width");
+    const heightWidget = findWidget(this, "height");
+    if (!presetWidget || !widthWidget || !heightWidget) return;
+
+    const size = presetSizes.get(presetWidget.value);
+    if (size) {
+      const swappedPreset = `${size.height}x${size.width}`;
+      if (presetSizes.has(swappedPreset)) {
+        setWidgetValue(this, presetWidget, swappedPreset);
+      } else {
+        // No transposed preset, fall back to custom dimensions
+        setWidgetValue(this, presetWidget, "custom");
+        setWidgetValue(this, widthWidget, size.height);
+        setWidgetValue(this, heightWidget, size.width);
+      }
+    } else {
+      const width = widthWidget.value;
+      setWidgetValue(this, widthWidget, heightWidget.value);
+      setWidgetValue(this, heightWidget, width);
+    }
+
+    this.graph?.setDirtyCanvas(true, true);
+  };
+
+  const onDrawForeground = nodeType.prototype.onDrawForeground;
+  nodeType.prototype.onDrawForeground = function (ctx) {
+    onDrawForeground?.apply(this, arguments);
+    if (this.flags.collapsed) return;
+
+    const { x, y } = swapButtonBounds(this);
+    ctx.drawImage(getSwapButtonBitmap(), x, y, SWAP_BUTTON_SIZE, SWAP_BUTTON_SIZE);
+  };
+
+  const onMouseDown = nodeType.prototype.onMouseDown;
+  nodeType.prototype.onMouseDown = function (e, localPos) {
+    const { x, y } = swapButtonBounds(this);
+    const px = localPos ? localPos[0] : e.canvasX - this.pos[0];
+    const py = localPos ? localPos[1] : e.canvasY - this.pos[1];
+    if (
+      px >= x &&
+      px <= x + SWAP_BUTTON_SIZE &&
+      py >= y &&
+      py <= y + SWAP_BUTTON_SIZE
+    ) {
+      this.swapDimensions();
+      return true;
+    }
+    return onMouseDown?.apply(this, arguments);
+  };
+}
+
+function setupSingleDimensionNode(nodeType, nodeData) {
+  const valueName = nodeData.name === "WidthNode" ? "width" : "height";
+  const presets = new Set(getPresetOptions(nodeData));
+
+  const onNodeCreated = nodeType.prototype.onNodeCreated;
+  nodeType.prototype.onNodeCreated = function () {
+    const result = onNodeCreated?.apply(this, arguments);
+
+    const presetWidget = findWidget(this, "preset");
+    const valueWidget = findWidget(this, valueName);
+    if (presetWidget && valueWidget) {
+      const originalCallback = presetWidget.callback;
+      presetWidget.callback = function (value) {
+        if (value !== "custom" && presets.has(value)) {
+          valueWidget.value = parseInt(value, 10);
+        }
+        return originalCallback?.apply(this, arguments);
+      };
+    }
+
+    return result;
+  };
+}
+
+function setupSnapReport(nodeType) {
+  const onExecuted = nodeType.prototype.onExecuted;
+  nodeType.prototype.onExecuted = function (message) {
+    onExecuted?.apply(this, arguments);
+
+    // Snap adjustments (and latent pool usage) reported by the Python side
+    this.snapReport = message?.text?.[0] ?? null;
+    this.setDirtyCanvas(true, false);
+  };
+
+  const onDrawForeground = nodeType.prototype.onDrawForeground;
+  nodeType.prototype.onDrawForeground = function (ctx) {
+    onDrawForeground?.apply(this, arguments);
+    if (!this.snapReport || this.flags.collapsed) return;
+
+    ctx.save();
+    ctx.font = "10px monospace";
+    ctx.fillStyle = "rgba(160,200,255,0.9)";
+    ctx.textAlign = "left";
+    ctx.fillText(this.snapReport, 8, this.size[1] - 10);
+    ctx.restore();
+  };
+}
+
+app.registerExtension({
+  name: "comfyassets.DimensionSelectors",
+
+  async beforeRegisterNodeDef(nodeType, nodeData, _app) {
+    if (!DIMENSION_NODES.includes(nodeData.name)) return;
+
+    // Guard against wrapping the same prototype twice
+    if (nodeType.prototype.comfyassetsDimensionSetup) return;
+    nodeType.prototype.comfyassetsDimensionSetup = true;
+
+    if (PAIR_NODES.includes(nodeData.name)) {
+      setupWidthHeightNode(nodeType, nodeData);
+    } else {
+      setupSingleDimensionNode(nodeType, nodeData);
+    }
+    setupSnapReport(nodeType);
+  },
+});
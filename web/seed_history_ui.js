@@ -1,14 +1,209 @@
 // ComfyUI_Selectors - Seed History with Tracking UI
 import { app } from "../../scripts/app.js";
 
+const STORAGE_KEY = "comfyui_seed_history_tracker";
+// The history is saved into every workflow and PNG, so keep it short by
+// default; the "Seed history size" setting raises it up to the hard limit
+const MAX_HISTORY_SETTING = "comfyassets.SeedHistory.MaxEntries";
+const DEFAULT_MAX_HISTORY = 200;
+const MAX_HISTORY_LIMIT = 5000;
+const ROW_HEIGHT = 30;
+const OVERSCAN_ROWS = 4;
+
+// Compact seed history encoding, mirrored by nodes/seed_history_codec.py:
+// "sh1:" + base64url(varint count, then per entry varint seed and zigzag
+// varint timestamp delta). Seeds are wrapped to unsigned 64 bits. Legacy JSON
+// arrays are still accepted on decode. Both codecs are checked against the
+// shared vectors in tests/unit/test_seed_history_codec.py.
+const HISTORY_CODEC_PREFIX = "sh1:";
+
+function writeVarint(bytes, value) {
+  let rest = BigInt(value);
+  do {
+    let byte = Number(rest & 0x7fn);
+    rest >>= 7n;
+    if (rest > 0n) byte |= 0x80;
+    bytes.push(byte);
+  } while (rest > 0n);
+}
+
+function readVarint(bytes, state) {
+  let value = 0n;
+  let shift = 0n;
+  while (true) {
+    if (state.offset >= bytes.length) throw new Error("truncated seed history data");
+    const byte = bytes[state.offset++];
+    value |= BigInt(byte & 0x7f) << shift;
+    if (!(byte & 0x80)) return value;
+    shift += 7n;
+  }
+}
+
+function encodeSeedHistory(history) {
+  const bytes = [];
+  writeVarint(bytes, history.length);
+  let previous = 0n;
+  for (const item of history) {
+    const timestamp = BigInt(Math.trunc(item.timestamp || 0));
+    const delta = timestamp - previous;
+    writeVarint(bytes, BigInt.asUintN(64, BigInt(item.seed)));
+    writeVarint(bytes, delta >= 0n ? delta * 2n : -delta * 2n - 1n);
+    previous = timestamp;
+  }
+
+  let binary = "";
+  for (let i = 0; i < bytes.length; i += 0x8000) {
+    binary += String.fromCharCode.apply(null, bytes.slice(i, i + 0x8000));
+  }
+  const base64 = btoa(binary).replace(/\+/g, "-").replace(/\//g, "_").replace(/=+$/, "");
+  return HISTORY_CODEC_PREFIX + base64;
+}
+
+function decodeSeedHistory(data) {
+  if (!data) return [];
+  if (Array.isArray(data)) return data;
+  if (typeof data !== "string" || !data.startsWith(HISTORY_CODEC_PREFIX)) {
+    throw new Error("unrecognized seed history format");
+  }
+
+  const base64 = data.slice(HISTORY_CODEC_PREFIX.length).replace(/-/g, "+").replace(/_/g, "/");
+  const binary = atob(base64 + "=".repeat((4 - (base64.length % 4)) % 4));
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+
+  const state = { offset: 0 };
+  const count = Number(readVarint(bytes, state));
+  const history = new Array(count);
+  let timestamp = 0n;
+  for (let i = 0; i < count; i++) {
+    const seed = readVarint(bytes, state);
+    const delta = readVarint(bytes, state);
+    timestamp += delta & 1n ? -(delta + 1n) / 2n : delta / 2n;
+    history[i] = { seed: Number(seed), timestamp: Number(timestamp) };
+  }
+  return history;
+}
+
+function maxHistory() {
+  const value =
+    app.extensionManager?.setting?.get(MAX_HISTORY_SETTING) ??
+    app.ui?.settings?.getSettingValue?.(MAX_HISTORY_SETTING, DEFAULT_MAX_HISTORY);
+  const entries = Math.trunc(Number(value));
+  if (!Number.isFinite(entries) || entries < 1) return DEFAULT_MAX_HISTORY;
+  return Math.min(entries, MAX_HISTORY_LIMIT);
+}
+
+// SeedHistory nodes are tracked weakly so removed nodes can be collected
+const seedHistoryNodeRefs = new Set();
+
+function registerSeedHistoryNode(node) {
+  seedHistoryNodeRefs.add(new WeakRef(node));
+}
+
+function unregisterSeedHistoryNode(node) {
+  for (const ref of seedHistoryNodeRefs) {
+    const target = ref.deref();
+    if (!target || target === node) seedHistoryNodeRefs.delete(ref);
+  }
+}
+
+function getSeedHistoryNodes() {
+  const nodes = [];
+  for (const ref of seedHistoryNodeRefs) {
+    const node = ref.deref();
+    if (node) {
+      nodes.push(node);
+    } else {
+      seedHistoryNodeRefs.delete(ref);
+    }
+  }
+  return nodes;
+}
+
+// Shared stylesheet instead of per-element inline styles
+function ensureSeedHistoryStyles() {
+  if (document.getElementById("comfyassets-seed-history-styles")) return;
+
+  const style = document.createElement("style");
+  style.id = "comfyassets-seed-history-styles";
+  style.textContent = `
+    .comfyassets-seed-history {
+      position: relative;
+      height: 180px;
+      overflow-y: auto;
+      border: 1px solid #333;
+      border-radius: 4px;
+      background-color: #2a2a2a;
+      font-size: 10px;
+      font-family: monospace;
+    }
+    .comfyassets-seed-history-spacer {
+      position: relative;
+      width: 100%;
+    }
+    .comfyassets-seed-history-row {
+      position: absolute;
+      left: 6px;
+      right: 6px;
+      height: ${ROW_HEIGHT - 3}px;
+      box-sizing: border-box;
+      padding: 3px 4px;
+      background-color: #333;
+      border: 1px solid transparent;
+      border-radius: 2px;
+      cursor: pointer;
+      line-height: 1.2;
+      overflow: hidden;
+    }
+    .comfyassets-seed-history-row:hover {
+      background-color: #444;
+      border-color: #555;
+    }
+    .comfyassets-seed-history-row.selected {
+      background-color: #006600;
+      border-color: #00aa00;
+    }
+    .comfyassets-seed-history-seed {
+      color: #fff;
+      font-weight: bold;
+    }
+    .comfyassets-seed-history-time {
+      color: #999;
+      font-size: 8px;
+    }
+    .comfyassets-seed-history-empty {
+      color: #888;
+      text-align: center;
+      padding: 15px;
+    }
+  `;
+  document.head.appendChild(style);
+}
+
 app.registerExtension({
   name: "comfyassets.SeedHistory",
 
+  settings: [
+    {
+      id: MAX_HISTORY_SETTING,
+      name: "Seed history size (entries saved in workflows and PNGs)",
+      type: "number",
+      defaultValue: DEFAULT_MAX_HISTORY,
+      attrs: { min: 1, max: MAX_HISTORY_LIMIT, step: 1 },
+    },
+  ],
+
   async setup() {
     console.log("[SeedHistory] Setting up global widget monitoring");
     
-    // Store reference to all SeedHistory nodes
-    window.seedHistoryNodes = window.seedHistoryNodes || [];
+    // Live SeedHistory nodes, resolved from weak references on access
+    if (!Object.getOwnPropertyDescriptor(window, "seedHistoryNodes")?.get) {
+      Object.defineProperty(window, "seedHistoryNodes", {
+        get: getSeedHistoryNodes,
+        configurable: true,
+      });
+    }
+    ensureSeedHistoryStyles();
 
     // Note: Removed global app/graph widget hooks to prevent multiple triggers
     // Node-level monitoring should be sufficient
@@ -33,9 +228,12 @@ app.registerExtension({
         this.hideTimer = null;
         this.mouseOverHistory = false;
         
+        this.selectedHistoryIndex = -1;
+        this.historyRenderFrame = null;
+        this.historySaveNeeded = false;
+
         // Register this node in global registry
-        window.seedHistoryNodes = window.seedHistoryNodes || [];
-        window.seedHistoryNodes.push(this);
+        registerSeedHistoryNode(this);
         
         // Create UI container
         const uiContainer = document.createElement("div");
@@ -93,7 +291,7 @@ app.registerExtension({
         this.serialize = function () {
           const data = originalSerialize ? originalSerialize.call(this) : {};
           data.hasBeenResized = this.hasBeenResized;
-          data.seedHistory = this.seedHistory;
+          data.seedHistory = encodeSeedHistory(this.seedHistory.slice(0, maxHistory()));
           return data;
         };
 
@@ -106,7 +304,13 @@ app.registerExtension({
             this.hasBeenResized = data.hasBeenResized;
           }
           if (data.seedHistory) {
-            this.seedHistory = data.seedHistory;
+            try {
+              this.seedHistory = decodeSeedHistory(data.seedHistory).slice(0, maxHistory());
+            } catch (error) {
+              console.warn("[SeedHistory] Could not decode history:", error);
+              this.seedHistory = [];
+            }
+            this.selectedHistoryIndex = -1;
             this.refreshHistoryDisplay();
           }
         };
@@ -124,13 +328,16 @@ app.registerExtension({
             this.lastAddedSeed = null;
           }
           
-          // Remove from global registry
-          if (window.seedHistoryNodes) {
-            const index = window.seedHistoryNodes.indexOf(this);
-            if (index !== -1) {
-              window.seedHistoryNodes.splice(index, 1);
-            }
+          if (this.historyRenderFrame) {
+            cancelAnimationFrame(this.historyRenderFrame);
+            this.historyRenderFrame = null;
+          }
+          if (this.historySaveNeeded) {
+            this.saveSeedHistory();
           }
+
+          // Remove from global registry
+          unregisterSeedHistoryNode(this);
           
           if (originalOnRemoved) {
             originalOnRemoved.call(this);
@@ -226,16 +433,36 @@ app.registerExtension({
         headerDiv.appendChild(buttonDiv);
         container.appendChild(headerDiv);
 
-        // History display
+        // History display: a fixed-height viewport over a spacer sized for
+        // the whole history, with a small pool of absolutely positioned rows
         const historyDiv = document.createElement("div");
-        historyDiv.style.maxHeight = "180px";
-        historyDiv.style.overflowY = "auto";
-        historyDiv.style.border = "1px solid #333";
-        historyDiv.style.borderRadius = "4px";
-        historyDiv.style.backgroundColor = "#2a2a2a";
-        historyDiv.style.padding = "6px";
-        historyDiv.style.fontSize = "10px";
-        historyDiv.style.fontFamily = "monospace";
+        historyDiv.className = "comfyassets-seed-history";
+
+        const spacerDiv = document.createElement("div");
+        spacerDiv.className = "comfyassets-seed-history-spacer";
+        historyDiv.appendChild(spacerDiv);
+
+        const emptyDiv = document.createElement("div");
+        emptyDiv.className = "comfyassets-seed-history-empty";
+        emptyDiv.innerHTML = "No seeds tracked<br><small>Generate seeds to build history</small>";
+        historyDiv.appendChild(emptyDiv);
+
+        this.historySpacer = spacerDiv;
+        this.historyEmpty = emptyDiv;
+        this.historyRows = [];
+
+        historyDiv.addEventListener("scroll", () => this.scheduleHistoryRender(), {
+          passive: true,
+        });
+
+        // One delegated click handler instead of a listener per entry
+        historyDiv.addEventListener("click", (event) => {
+          const row = event.target.closest(".comfyassets-seed-history-row");
+          if (!row) return;
+          const index = Number(row.dataset.index);
+          const item = this.seedHistory[index];
+          if (item) this.useSeedFromHistory(item, index);
+        });
 
         // Mouse events for auto-hide
         historyDiv.addEventListener("mouseenter", () => {
@@ -257,8 +484,12 @@ app.registerExtension({
       // Load history from storage
       nodeType.prototype.loadSeedHistory = function () {
         try {
-          const stored = localStorage.getItem('comfyui_seed_history_tracker');
-          return stored ? JSON.parse(stored) : [];
+          const stored = localStorage.getItem(STORAGE_KEY);
+          if (!stored) return [];
+          const history = stored.startsWith(HISTORY_CODEC_PREFIX)
+            ? decodeSeedHistory(stored)
+            : JSON.parse(stored);
+          return history.slice(0, maxHistory());
         } catch (error) {
           console.warn("[SeedHistory] Could not load history:", error);
           return [];
@@ -268,7 +499,8 @@ app.registerExtension({
       // Save history to storage
       nodeType.prototype.saveSeedHistory = function () {
         try {
-          localStorage.setItem('comfyui_seed_history_tracker', JSON.stringify(this.seedHistory));
+          localStorage.setItem(STORAGE_KEY, encodeSeedHistory(this.seedHistory));
+          this.historySaveNeeded = false;
         } catch (error) {
           console.warn("[SeedHistory] Could not save history:", error);
         }
@@ -301,7 +533,10 @@ app.registerExtension({
         this.lastAddedSeed = { seed: numSeed, timestamp: now };
         
         // Remove if already exists in history
-        this.seedHistory = this.seedHistory.filter(item => item.seed !== numSeed);
+        const existing = this.seedHistory.findIndex(item => item.seed === numSeed);
+        if (existing !== -1) {
+          this.seedHistory.splice(existing, 1);
+        }
         
         // Add to front
         this.seedHistory.unshift({
@@ -310,13 +545,15 @@ app.registerExtension({
           dateString: new Date().toLocaleString()
         });
         
-        // Keep only last 10
-        if (this.seedHistory.length > 10) {
-          this.seedHistory = this.seedHistory.slice(0, 10);
+        // Keep only the newest entries, up to the configured size
+        const limit = maxHistory();
+        if (this.seedHistory.length > limit) {
+          this.seedHistory.length = limit;
         }
         
-        this.saveSeedHistory();
-        this.refreshHistoryDisplay();
+        this.selectedHistoryIndex = -1;
+        this.historySaveNeeded = true;
+        this.scheduleHistoryRender();
         this.startAutoHide();
       };
 
@@ -356,6 +593,7 @@ app.registerExtension({
       // Clear history
       nodeType.prototype.clearSeedHistory = function () {
         this.seedHistory = [];
+        this.selectedHistoryIndex = -1;
         this.saveSeedHistory();
         this.refreshHistoryDisplay();
         this.showMessage("History cleared", "info");
@@ -363,67 +601,74 @@ app.registerExtension({
 
       // Refresh history display
       nodeType.prototype.refreshHistoryDisplay = function () {
+        this.scheduleHistoryRender();
+        this.startAutoHide();
+      };
+
+      // Batch history updates into a single render per animation frame
+      nodeType.prototype.scheduleHistoryRender = function () {
+        if (this.historyRenderFrame) return;
+        this.historyRenderFrame = requestAnimationFrame(() => {
+          this.historyRenderFrame = null;
+          this.renderHistoryRows();
+          if (this.historySaveNeeded) {
+            this.saveSeedHistory();
+          }
+        });
+      };
+
+      // Render only the rows inside the visible window, reusing pooled rows
+      nodeType.prototype.renderHistoryRows = function () {
         if (!this.historyDisplay) return;
 
-        if (!this.seedHistory || this.seedHistory.length === 0) {
-          this.historyDisplay.innerHTML = 
-            '<div style="color: #888; text-align: center; padding: 15px;">No seeds tracked<br><small>Generate seeds to build history</small></div>';
-          return;
+        const history = this.seedHistory || [];
+        const count = history.length;
+        this.historyEmpty.style.display = count === 0 ? "block" : "none";
+        this.historySpacer.style.height = `${count * ROW_HEIGHT + 8}px`;
+
+        const viewportHeight = this.historyDisplay.clientHeight || 180;
+        const scrollTop = this.historyDisplay.scrollTop;
+        const first = Math.max(0, Math.floor(scrollTop / ROW_HEIGHT) - OVERSCAN_ROWS);
+        const visible = Math.ceil(viewportHeight / ROW_HEIGHT) + 2 * OVERSCAN_ROWS;
+        const last = Math.min(count, first + visible);
+
+        while (this.historyRows.length < visible) {
+          const row = document.createElement("div");
+          row.className = "comfyassets-seed-history-row";
+          const seedDiv = document.createElement("div");
+          seedDiv.className = "comfyassets-seed-history-seed";
+          const timeDiv = document.createElement("div");
+          timeDiv.className = "comfyassets-seed-history-time";
+          row.append(seedDiv, timeDiv);
+          row.seedDiv = seedDiv;
+          row.timeDiv = timeDiv;
+          this.historySpacer.appendChild(row);
+          this.historyRows.push(row);
         }
 
-        this.historyDisplay.innerHTML = "";
-
-        this.seedHistory.forEach((item, index) => {
-          const entryDiv = document.createElement("div");
-          entryDiv.style.padding = "4px";
-          entryDiv.style.marginBottom = "3px";
-          entryDiv.style.backgroundColor = "#333";
-          entryDiv.style.borderRadius = "2px";
-          entryDiv.style.cursor = "pointer";
-          entryDiv.style.border = "1px solid transparent";
-          entryDiv.style.lineHeight = "1.2";
-
-          entryDiv.addEventListener("mouseenter", () => {
-            entryDiv.style.backgroundColor = "#444";
-            entryDiv.style.border = "1px solid #555";
-          });
-          entryDiv.addEventListener("mouseleave", () => {
-            entryDiv.style.backgroundColor = "#333";
-            entryDiv.style.border = "1px solid transparent";
-          });
-
-          entryDiv.addEventListener("click", () => {
-            this.useSeedFromHistory(item, index);
-          });
-
-          const timeAgo = this.formatTimeAgo(item.timestamp);
-          entryDiv.innerHTML = `
-            <div style="color: #fff; font-weight: bold; margin-bottom: 1px;">
-              🎲 ${item.seed}
-            </div>
-            <div style="color: #999; font-size: 8px;">
-              ⏰ ${timeAgo}
-            </div>
-          `;
-
-          this.historyDisplay.appendChild(entryDiv);
+        this.historyRows.forEach((row, offset) => {
+          const index = first + offset;
+          if (index >= last) {
+            row.style.display = "none";
+            return;
+          }
+
+          const item = history[index];
+          const seedText = `🎲 ${item.seed}`;
+          const timeText = `⏰ ${this.formatTimeAgo(item.timestamp)}`;
+          row.style.display = "block";
+          row.style.transform = `translateY(${index * ROW_HEIGHT + 4}px)`;
+          row.dataset.index = String(index);
+          if (row.seedDiv.textContent !== seedText) row.seedDiv.textContent = seedText;
+          if (row.timeDiv.textContent !== timeText) row.timeDiv.textContent = timeText;
+          row.classList.toggle("selected", index === this.selectedHistoryIndex);
         });
-        
-        this.startAutoHide();
       };
 
       // Highlight selected entry
       nodeType.prototype.highlightHistoryEntry = function (index) {
-        const entries = this.historyDisplay.querySelectorAll('div[style*="cursor: pointer"]');
-        entries.forEach((entry, i) => {
-          if (i === index) {
-            entry.style.backgroundColor = "#006600";
-            entry.style.border = "1px solid #00aa00";
-          } else {
-            entry.style.backgroundColor = "#333";
-            entry.style.border = "1px solid transparent";
-          }
-        });
+        this.selectedHistoryIndex = index;
+        this.scheduleHistoryRender();
       };
 
       // Auto-hide functionality
@@ -484,6 +729,7 @@ app.registerExtension({
       nodeType.prototype.showHistorySection = function () {
         if (this.historyDisplay) {
           this.historyDisplay.style.display = "block";
+          this.scheduleHistoryRender();
           
           if (this.restoreButton && this.restoreButton.parentNode) {
             this.restoreButton.parentNode.removeChild(this.restoreButton);